@@ -1,14 +1,19 @@
 # app/api/v1/dependencies.py
-from fastapi import Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from app.db import database, models
-from app.services import user_service
+# Authentication lives in app.core.auth; routes keep importing it from here.
+from fastapi import Depends, Request
+from app.core.auth import oauth2_scheme, authenticate_connection, get_current_user, get_current_admin_user, Principal
+from app.core.read_routing import reads_from_primary
+from app.db import database
 
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(database.get_db)):
-    user = user_service.verify_token(db, token)
-    if not user:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
-    return user
+async def get_read_session(
+    request: Request,
+    principal: Principal = Depends(get_current_user),
+    primary=Depends(database.get_session),
+    replica=Depends(database.get_replica_session)
+):
+    """
+    Session for read-only routes: the replica, unless the caller wrote recently.
+    Sessions connect lazily, so the one not chosen costs no connection.
+    """
+    return primary if reads_from_primary(request, principal.id) else replica
@@ -0,0 +1,149 @@
+# app/api/v1/idempotency.py
+import asyncio
+import hashlib
+import itertools
+import json
+import time
+import uuid
+from fastapi import HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.db.database import run_sync
+from app.services import idempotency
+
+# (user_id, key) -> (route, request_hash, status_code, body) for completed
+# requests, so most retries are answered without touching the database.
+response_cache = TTLCache(settings.IDEMPOTENCY_CACHE_SIZE, settings.IDEMPOTENCY_TTL_SECONDS)
+# (user_id, key) -> future resolved when the in-process first execution finishes
+_in_flight = {}
+_claims = itertools.count(1)
+
+POLL_INTERVAL = 0.05
+
+
+def request_fingerprint(route: str, payload) -> str:
+    body = json.dumps(jsonable_encoder(payload), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(f"{route}:{body}".encode()).hexdigest()
+
+
+def _replay(stored, route: str, request_hash: str):
+    stored_route, stored_hash, status_code, body = stored
+    if stored_route != route or stored_hash != request_hash:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Idempotency-Key was already used with a different request"
+        )
+    return JSONResponse(status_code=status_code, content=json.loads(body), headers={"Idempotent-Replayed": "true"})
+
+
+def _still_processing():
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="A request with this Idempotency-Key is still being processed"
+    )
+
+
+async def _wait_for_other_worker(db, user_id: int, key: str):
+    deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+    while time.monotonic() < deadline:
+        await asyncio.sleep(POLL_INTERVAL)
+        row = await run_sync(db, idempotency.get_key, user_id, key)
+        await run_sync(db, Session.commit)  # end the read so the next poll sees fresh data
+        if row is None:
+            return None
+        if row.status == "completed":
+            return row
+    raise _still_processing()
+
+
+async def idempotent(db, user_id: int, key, route: str, payload, response_model, execute):
+    """
+    Run `execute(before_commit)` at most once per (user, Idempotency-Key).
+
+    - execute passes before_commit to the money move it runs; the move calls
+      before_commit(db, result) in its own transaction, just before committing,
+      and the response is stored there. Money and stored response commit
+      together, so a key is never left pending by a move that committed.
+    - Completed keys are answered from the in-process cache, or from the
+      idempotency_keys table, without running the write path again.
+    - A duplicate arriving while the first is still running waits for it:
+      on a future in this worker, or by polling the table for other workers.
+    - Client errors (HTTPException, e.g. insufficient balance) move no money;
+      they are stored as the outcome afterwards. Unexpected errors release the
+      key so it can be retried.
+    """
+    if key is None:
+        return await execute(None)
+
+    request_hash = request_fingerprint(route, payload)
+    cache_key = (user_id, key)
+    while True:
+        stored = response_cache.get(cache_key)
+        if stored:
+            return _replay(stored, route, request_hash)
+        waiter = _in_flight.get(cache_key)
+        if waiter is None:
+            break
+        await asyncio.shield(waiter)
+
+    waiter = _in_flight[cache_key] = asyncio.get_running_loop().create_future()
+    token = uuid.uuid4().hex
+    try:
+        existing = await run_sync(db, idempotency.claim_key, user_id, key, route, request_hash, token)
+        if existing is not None and existing.status != "completed":
+            existing = await _wait_for_other_worker(db, user_id, key)
+            if existing is None:
+                # The other execution failed and released the key; try to take it over
+                existing = await run_sync(db, idempotency.claim_key, user_id, key, route, request_hash, token)
+                if existing is not None and existing.status != "completed":
+                    raise _still_processing()
+        if existing is not None:
+            stored = (existing.route, existing.request_hash, existing.status_code, existing.response_body)
+            response_cache.set(cache_key, stored)
+            return _replay(stored, route, request_hash)
+
+        outcome = {}
+
+        def before_commit(session, result):
+            content = response_model.model_validate(result, from_attributes=True).model_dump(mode="json")
+            body = json.dumps(content)
+            idempotency.complete_key(session, user_id, key, token, status.HTTP_200_OK, body)
+            outcome.update(status_code=status.HTTP_200_OK, content=content, body=body)
+
+        try:
+            await execute(before_commit)
+            if not outcome:
+                raise RuntimeError(f"{route}: execute() committed without calling before_commit")
+        except HTTPException as e:
+            # Whatever the service left half-done must not ride along with the key's commit
+            await run_sync(db, Session.rollback)
+            if e.status_code >= 500:
+                await run_sync(db, idempotency.release_key, user_id, key, token)
+                raise
+            content = {"detail": e.detail}
+            outcome.update(status_code=e.status_code, content=content, body=json.dumps(content))
+            try:
+                await run_sync(
+                    db, idempotency.store_outcome, user_id, key, token, outcome["status_code"], outcome["body"]
+                )
+            except idempotency.ClaimLost:
+                raise _still_processing()
+        except idempotency.ClaimLost:
+            # A retry took the key over; our move was rolled back, theirs counts
+            await run_sync(db, Session.rollback)
+            raise _still_processing()
+        except BaseException:
+            await run_sync(db, Session.rollback)
+            await run_sync(db, idempotency.release_key, user_id, key, token)
+            raise
+
+        response_cache.set(cache_key, (route, request_hash, outcome["status_code"], outcome["body"]))
+        if next(_claims) % settings.IDEMPOTENCY_PURGE_EVERY == 0:
+            await run_sync(db, idempotency.purge_expired)
+        return JSONResponse(status_code=outcome["status_code"], content=outcome["content"])
+    finally:
+        del _in_flight[cache_key]
+        waiter.set_result(None)
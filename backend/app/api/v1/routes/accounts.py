@@ -1,63 +1,271 @@
 # app/api/v1/routes/accounts.py
-from sqlalchemy.orm import Session
+import asyncio
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Literal, Optional
+from app.core import events
+from app.core.config import settings
+from app.core.money import to_major
+from app.core.read_routing import reads_from_primary
 from app.db import database, schemas
-from app.services import account_service
-from app.api.v1.dependencies import get_current_user
-from fastapi import APIRouter, Depends, HTTPException, status
+from app.services import async_account_service as account_service
+from app.api.v1.dependencies import authenticate_connection, get_current_user, get_read_session
+from app.api.v1.idempotency import idempotent
+from app.api.v1 import serialization
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
 
 router = APIRouter(prefix="/accounts", tags=["Accounts"])
 
 @router.post("/", response_model=schemas.AccountOut)
-def create_user_account(
+async def create_user_account(
     account: schemas.AccountCreate,
-    db: Session = Depends(database.get_db),
+    db=Depends(database.get_session),
     current_user: int = Depends(get_current_user)
 ):
-    return account_service.create_account(db, current_user.id, account)
+    return await account_service.create_account(db, current_user.id, account)
 
 # ------------------- GET API -------------------
 @router.get("/", response_model=list[schemas.AccountOut])
-def get_user_accounts(
-    db: Session = Depends(database.get_db),
+async def get_user_accounts(
+    db=Depends(get_read_session),
     current_user: int = Depends(get_current_user)
 ):
-    return account_service.get_accounts_by_user(db, current_user.id)
+    rows = await account_service.get_accounts_by_user(db, current_user.id)
+    if settings.FAST_SERIALIZATION:
+        return serialization.render(serialization.account_list, serialization.as_dicts(rows))
+    return rows
+
+
+# Money-moving routes accept an optional Idempotency-Key header: a retry with
+# the same key gets the stored response instead of moving money again.
+IdempotencyKey = Header(None, alias="Idempotency-Key", max_length=255)
 
 
 @router.post("/withdraw", response_model=schemas.AccountOut)
-def withdraw(request: schemas.WithdrawRequest, db: Session = Depends(database.get_db), current_user: int = Depends(get_current_user)):
-    try:
-        account = account_service.withdraw_money(db, current_user.id, request.account_id, request.amount)
-        return account
-    except ValueError as e:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+async def withdraw(
+    request: schemas.WithdrawRequest,
+    db=Depends(database.get_session),
+    current_user: int = Depends(get_current_user),
+    idempotency_key: Optional[str] = IdempotencyKey
+):
+    async def execute(before_commit):
+        try:
+            return await account_service.withdraw_money(
+                db, current_user.id, request.account_id, request.amount, before_commit
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return await idempotent(db, current_user.id, idempotency_key, "withdraw", request, schemas.AccountOut, execute)
     
 
 @router.post("/deposit", response_model=schemas.AccountOut)
-def deposit_money(
+async def deposit_money(
     request: schemas.MoneyRequest,  # We'll define this schema
-    db: Session = Depends(database.get_db),
-    current_user: int = Depends(get_current_user)
+    db=Depends(database.get_session),
+    current_user: int = Depends(get_current_user),
+    idempotency_key: Optional[str] = IdempotencyKey
 ):
-    try:
-        account = account_service.deposit_money(db, current_user.id, request.account_id, request.amount)
-        return account
-    except ValueError as e:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    async def execute(before_commit):
+        try:
+            return await account_service.deposit_money(
+                db, current_user.id, request.account_id, request.amount, before_commit
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return await idempotent(db, current_user.id, idempotency_key, "deposit", request, schemas.AccountOut, execute)
     
 
 @router.post("/transfer", response_model=schemas.AccountOut)
-def transfer_money_endpoint(
+async def transfer_money_endpoint(
     request: schemas.TransferRequest,
-    db: Session = Depends(database.get_db),
+    db=Depends(database.get_session),
+    current_user: int = Depends(get_current_user),
+    idempotency_key: Optional[str] = IdempotencyKey
+):
+    async def execute(before_commit):
+        try:
+            return await account_service.transfer_money(
+                db, current_user.id,
+                request.from_account_id,
+                request.to_account_number,
+                request.amount,
+                before_commit
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return await idempotent(db, current_user.id, idempotency_key, "transfer", request, schemas.AccountOut, execute)
+
+
+@router.post("/transfers/batch", response_model=schemas.BatchTransferOut)
+async def batch_transfer_endpoint(
+    request: schemas.BatchTransferRequest,
+    db=Depends(database.get_session),
+    current_user: int = Depends(get_current_user),
+    idempotency_key: Optional[str] = IdempotencyKey
+):
+    """
+    Pay many recipients from one account in one transaction. Every item gets a
+    result; in all_or_nothing mode a failing item rejects the batch (400).
+    """
+    async def execute(before_commit):
+        def store_with_mode(session, result):
+            before_commit(session, {"mode": request.mode, **result})
+
+        try:
+            result = await account_service.transfer_batch(
+                db, current_user.id, request.from_account_id, request.transfers,
+                all_or_nothing=request.mode == schemas.BatchTransferMode.all_or_nothing,
+                before_commit=store_with_mode if before_commit else None
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        result = schemas.BatchTransferOut.model_validate({"mode": request.mode, **result}, from_attributes=True)
+        if not result.applied:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=result.model_dump(mode="json"))
+        return result
+
+    return await idempotent(db, current_user.id, idempotency_key, "transfers/batch", request, schemas.BatchTransferOut, execute)
+
+
+# ------------------- Transaction History -------------------
+@router.get("/{account_id}/transactions", response_model=schemas.TransactionPage)
+async def get_account_transactions(
+    account_id: int,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    type: Optional[schemas.TransactionType] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    db=Depends(get_read_session),
     current_user: int = Depends(get_current_user)
 ):
+    if not await account_service.get_user_account(db, current_user.id, account_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Account not found")
     try:
-        return account_service.transfer_money(
-            db, current_user.id,
-            request.from_account_id,
-            request.to_account_number,
-            request.amount
+        page = await account_service.get_transactions_page(
+            db, account_id, limit=limit, cursor=cursor,
+            tx_type=type.value if type else None, start=start, end=end
         )
     except ValueError as e:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if settings.FAST_SERIALIZATION:
+        page["items"] = serialization.as_dicts(page["items"])
+        return serialization.render(serialization.transaction_page, page)
+    return page
+
+
+EXPORT_FIELDS = ("id", "account_id", "type", "amount", "created_at")
+
+
+async def _ndjson_lines(chunks):
+    async for chunk in chunks:
+        yield "".join(
+            json.dumps({
+                "id": row.id, "account_id": row.account_id, "type": row.type,
+                "amount": to_major(row.amount), "created_at": row.created_at.isoformat()
+            }) + "\n"
+            for row in chunk
+        )
+
+
+async def _csv_lines(chunks):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    async for chunk in chunks:
+        writer.writerows((row.id, row.account_id, row.type, to_major(row.amount), row.created_at.isoformat()) for row in chunk)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+@router.get("/{account_id}/transactions/export")
+async def export_account_transactions(
+    account_id: int,
+    request: Request,
+    format: Literal["ndjson", "csv"] = "ndjson",
+    type: Optional[schemas.TransactionType] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    db=Depends(get_read_session),
+    current_user: int = Depends(get_current_user)
+):
+    """
+    Full history, oldest first, streamed in chunks straight from a database
+    cursor: bytes start flowing immediately and memory use does not grow
+    with the size of the history.
+    """
+    if not await account_service.get_user_account(db, current_user.id, account_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Account not found")
+
+    chunks = account_service.stream_transaction_chunks(
+        account_id, tx_type=type.value if type else None, start=start, end=end,
+        from_replica=not reads_from_primary(request, current_user.id)
+    )
+    if format == "csv":
+        return StreamingResponse(
+            _csv_lines(chunks), media_type="text/csv",
+            headers={"Content-Disposition": f'attachment; filename="account-{account_id}-transactions.csv"'}
+        )
+    return StreamingResponse(_ndjson_lines(chunks), media_type="application/x-ndjson")
+
+
+# ------------------- Push Updates -------------------
+def _render_event(event: dict) -> str:
+    # Events carry minor units; the API speaks major units
+    rendered = {**event, "amount": to_major(event["amount"])}
+    if "balance" in event:
+        rendered["balance"] = to_major(event["balance"])
+    return json.dumps(rendered)
+
+
+@router.websocket("/events")
+async def account_events(websocket: WebSocket, token: Optional[str] = None):
+    """
+    One JSON message per ledger entry on the caller's accounts, sent once its
+    transaction has committed. Authenticate with ?token=<JWT> (browsers cannot
+    set WebSocket headers) or an Authorization: Bearer header. Client messages
+    are ignored.
+    """
+    if token is None:
+        scheme, _, credentials = websocket.headers.get("authorization", "").partition(" ")
+        token = credentials if scheme.lower() == "bearer" else ""
+    try:
+        principal = await authenticate_connection(token)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    subscription = events.broker.subscribe(principal.id)
+
+    async def watch_client():
+        # Only here to notice the client leaving while no events are flowing
+        try:
+            while (await websocket.receive())["type"] != "websocket.disconnect":
+                pass
+        finally:
+            subscription.close()
+
+    watcher = asyncio.create_task(watch_client())
+    try:
+        while True:
+            event = await subscription.get()
+            if event is events.CLOSED:
+                break
+            if event is events.OVERFLOW:
+                await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER, reason="Too far behind")
+                break
+            await websocket.send_text(_render_event(event))
+    except WebSocketDisconnect:
+        pass  # left between two events
+    finally:
+        events.broker.unsubscribe(subscription)
+        watcher.cancel()
@@ -1,9 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.db.database import get_db
-from app.db.models import User
-from app.services.user_service import get_all_users, get_user_by_id
-from app.core.auth import get_current_admin_user
+from datetime import date, datetime, timedelta
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from app.core import events
+from app.core.config import settings
+from app.db import schemas
+from app.db.database import get_session, pool_metrics
+from app.services.async_user_service import list_users, search_users, get_user_by_id, set_admin
+from app.services import async_account_service, async_reporting
+from app.core.auth import get_current_admin_user, auth_stats
+from app.api.v1 import serialization
+from app.api.v1.dependencies import get_read_session
 
 router = APIRouter(
     prefix="/admin",
@@ -13,14 +19,104 @@ router = APIRouter(
 
 # ---------------- Admin Endpoints ----------------
 
-@router.get("/users")
-def read_all_users(db: Session = Depends(get_db)):
-    users = get_all_users(db)
-    return users
+@router.get("/users", response_model=schemas.AdminUserPage, response_model_exclude_none=True)
+async def read_all_users(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[int] = None,
+    is_admin: Optional[bool] = None,
+    email_prefix: Optional[str] = None,
+    name_prefix: Optional[str] = None,
+    include_count: bool = False,
+    include_accounts: bool = False,
+    db=Depends(get_read_session)
+):
+    page = await list_users(
+        db, limit=limit, cursor=cursor, is_admin=is_admin,
+        email_prefix=email_prefix, name_prefix=name_prefix,
+        include_count=include_count, include_accounts=include_accounts
+    )
+    if settings.FAST_SERIALIZATION:
+        return serialization.render(serialization.admin_user_page, page, exclude_none=True)
+    return page
 
-@router.get("/users/{user_id}")
-def read_user(user_id: int, db: Session = Depends(get_db)):
-    user = get_user_by_id(db, user_id)
+@router.get("/users/search", response_model=list[schemas.AdminUserOut], response_model_exclude_none=True)
+async def search_all_users(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(20, ge=1, le=100),
+    db=Depends(get_read_session)
+):
+    return await search_users(db, q, limit)
+
+@router.get("/users/{user_id}", response_model=schemas.UserOut)
+async def read_user(user_id: int, db=Depends(get_read_session)):
+    user = await get_user_by_id(db, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
+
+@router.post("/users/{user_id}/toggle-admin")
+async def toggle_admin(user_id: int, db=Depends(get_session)):
+    user = await get_user_by_id(db, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    user = await set_admin(db, user_id, not user.is_admin)
+    return {"id": user.id, "is_admin": user.is_admin}
+
+# ---------------- Hot Accounts ----------------
+
+@router.put("/accounts/{account_id}/balance-slots", response_model=schemas.BalanceSlotsOut)
+async def update_balance_slots(account_id: int, request: schemas.BalanceSlotsUpdate, db=Depends(get_session)):
+    account = await async_account_service.set_balance_slots(db, account_id, request.slots)
+    if not account:
+        raise HTTPException(status_code=404, detail="Account not found")
+    return account
+
+# ---------------- Reports ----------------
+# Served from the rollup tables only, so cost depends on the date range, not on
+# the size of the ledger.
+MAX_REPORT_DAYS = 366
+
+
+def _report_range(start: Optional[date], end: Optional[date]):
+    end = end or datetime.utcnow().date()
+    start = start or end - timedelta(days=29)
+    if start > end or (end - start).days >= MAX_REPORT_DAYS:
+        raise HTTPException(status_code=400, detail=f"Report range must be 1 to {MAX_REPORT_DAYS} days")
+    return start, end
+
+
+@router.get("/reports/daily", response_model=schemas.DailyReport)
+async def read_daily_report(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    account_type: Optional[schemas.AccountType] = None,
+    db=Depends(get_read_session)
+):
+    start, end = _report_range(start, end)
+    rows = await async_reporting.daily_totals(db, start, end, account_type.value if account_type else None)
+    return {"start": start, "end": end, "rows": rows}
+
+
+@router.get("/reports/accounts/{account_id}/flows", response_model=schemas.AccountFlowReport)
+async def read_account_flows(
+    account_id: int,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    db=Depends(get_read_session)
+):
+    start, end = _report_range(start, end)
+    return {"account_id": account_id, "start": start, "end": end, "days": await async_reporting.account_flows(db, account_id, start, end)}
+
+# ---------------- Metrics ----------------
+
+@router.get("/metrics/auth")
+async def read_auth_metrics():
+    return auth_stats()
+
+@router.get("/metrics/events")
+async def read_event_metrics():
+    return events.broker.stats()
+
+@router.get("/metrics/pool")
+async def read_pool_metrics():
+    return {name: metrics.snapshot() for name, metrics in pool_metrics.items()}
@@ -1,21 +1,21 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
 from app.db import schemas, database
-from app.services import user_service
+from app.services import user_service, async_user_service
 from app.schemas.auth import TokenResponse
+from app.api.v1.dependencies import get_current_user, Principal
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 @router.post("/register", response_model=schemas.UserOut)
-def register(user: schemas.UserCreate, db: Session = Depends(database.get_db)):
-    existing_user = db.query(user_service.models.User).filter(user_service.models.User.email == user.email).first()
+async def register(user: schemas.UserCreate, db=Depends(database.get_session)):
+    existing_user = await async_user_service.get_user_by_email(db, user.email)
     if existing_user:
         raise HTTPException(status_code=400, detail="Email already registered")
-    return user_service.create_user(db, user)
+    return await async_user_service.create_user(db, user)
 
 @router.post("/login", response_model=TokenResponse)
-def login(user: schemas.UserLogin, db: Session = Depends(database.get_db)):
-    auth_user = user_service.authenticate_user(db, user.email, user.password)
+async def login(user: schemas.UserLogin, db=Depends(database.get_session)):
+    auth_user = await async_user_service.authenticate_user(db, user.email, user.password)
     if not auth_user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -23,3 +23,16 @@ def login(user: schemas.UserLogin, db: Session = Depends(database.get_db)):
         )
     token = user_service.create_token(auth_user)  # make sure this uses user.email or id
     return {"access_token": token, "token_type": "bearer"}
+
+@router.post("/change-password", response_model=TokenResponse)
+async def change_password(
+    request: schemas.PasswordChange,
+    db=Depends(database.get_session),
+    current_user: Principal = Depends(get_current_user)
+):
+    user = await async_user_service.get_user_by_id(db, current_user.id)
+    if not await async_user_service.verify_password(request.current_password, user.hashed_password):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+    user = await async_user_service.change_password(db, user, request.new_password)
+    # Older tokens are now rejected, so hand back a fresh one
+    return {"access_token": user_service.create_token(user), "token_type": "bearer"}
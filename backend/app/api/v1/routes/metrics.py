@@ -0,0 +1,13 @@
+# app/api/v1/routes/metrics.py
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.core.request_metrics import render_prometheus
+from app.db.database import pool_metrics
+
+# Only mounted when METRICS_ENABLED is set; keep it off the public network
+router = APIRouter(tags=["Metrics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def read_metrics():
+    return PlainTextResponse(render_prometheus(pool_metrics), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,95 @@
+# app/api/v1/serialization.py
+"""
+Fast response path, enabled with FAST_SERIALIZATION.
+
+By default a route's return value is validated against its response_model and
+then encoded again by the response class. The list endpoints here already hold
+rows from column selects, so instead prebuilt TypeAdapters over TypedDict row
+shapes dump them straight to JSON bytes in pydantic-core, and the handler
+returns those bytes as a Response, which FastAPI sends without touching the
+response_model. The row shapes mirror the response schemas field for field
+(MoneyOut included), so both paths produce the same body.
+
+json_response_class() is the app's default response class: ORJSONResponse when
+the mode is on and orjson is installed, FastAPI's JSONResponse otherwise.
+"""
+from datetime import datetime
+from typing import Optional
+from typing_extensions import NotRequired, TypedDict
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
+from pydantic import TypeAdapter
+from app.core.config import settings
+from app.db.schemas import MoneyOut
+
+try:
+    import orjson
+except ImportError:  # optional: the TypeAdapter path does not need it
+    orjson = None
+
+
+class PreSerializedJSONResponse(Response):
+    """A JSON response whose body is already encoded bytes."""
+    media_type = "application/json"
+
+
+def json_response_class():
+    if settings.FAST_SERIALIZATION and orjson is not None:
+        return ORJSONResponse
+    return JSONResponse
+
+
+# ---------------- Row shapes ----------------
+class AccountRow(TypedDict):
+    id: int
+    account_number: str
+    balance: MoneyOut
+    account_type: str
+    user_id: int
+
+
+class TransactionRow(TypedDict):
+    id: int
+    account_id: int
+    type: str
+    amount: MoneyOut
+    created_at: datetime
+
+
+class TransactionPageRow(TypedDict):
+    items: list[TransactionRow]
+    next_cursor: Optional[str]
+
+
+class AccountSummaryRow(TypedDict):
+    count: int
+    total_balance: MoneyOut
+
+
+class AdminUserRow(TypedDict):
+    id: int
+    name: str
+    email: str
+    is_admin: bool
+    accounts: NotRequired[AccountSummaryRow]
+
+
+class AdminUserPageRow(TypedDict):
+    items: list[AdminUserRow]
+    next_cursor: Optional[int]
+    total: NotRequired[int]
+
+
+account_list = TypeAdapter(list[AccountRow])
+transaction_page = TypeAdapter(TransactionPageRow)
+admin_user_page = TypeAdapter(AdminUserPageRow)
+
+
+# ---------------- Rendering ----------------
+def as_dicts(rows) -> list:
+    """Result rows (column selects) as the plain dicts the TypedDict serializers take."""
+    return [row._asdict() for row in rows]
+
+
+def render(adapter: TypeAdapter, content, **dump_options) -> PreSerializedJSONResponse:
+    """Dump already-shaped content with a prebuilt adapter; no validation pass."""
+    return PreSerializedJSONResponse(adapter.dump_json(content, **dump_options))
@@ -1,24 +1,122 @@
-from fastapi import Depends, HTTPException, status
+# app/core/auth.py
+import time
+from dataclasses import dataclass
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
-from app.db.models import User
-from app.db.database import get_db
-from sqlalchemy.orm import Session
-import jwt
+from sqlalchemy import select
+from app.core import events
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.core.metrics import Histogram
+from app.core.read_routing import note_request
+from app.core.security import decode_access_token
+from app.db import database
+from app.db.database import get_session, run_sync
+from app.db.models import User
+
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
+
+
+@dataclass(frozen=True)
+class Principal:
+    """What a route needs to know about the caller, without a full ORM User."""
+    id: int
+    is_admin: bool
+    token_version: int
+
+
+# user id -> Principal. Role and password changes stage an invalidation that
+# drops the entry in every worker once they commit (through the events broker;
+# with EVENTS_BACKEND=local only in the worker that made the change). Entries
+# otherwise expire after AUTH_CACHE_TTL_SECONDS, which bounds how stale a copy
+# can be when an invalidation is missed.
+principal_cache = TTLCache(settings.AUTH_CACHE_SIZE, settings.AUTH_CACHE_TTL_SECONDS)
+auth_latency = Histogram()
+
+
+def invalidate_principal(user_id: int):
+    principal_cache.pop(user_id)
+
+
+def _on_invalidate(user_id):
+    if user_id is None:
+        principal_cache.clear()
+    else:
+        invalidate_principal(user_id)
+
+
+events.broker.on_invalidate(_on_invalidate)
 
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
-async def get_current_admin_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+def fetch_principal(db, user_id: int):
+    row = db.execute(
+        select(User.id, User.is_admin, User.token_version).where(User.id == user_id)
+    ).first()
+    if not row:
+        return None
+    return Principal(id=row.id, is_admin=bool(row.is_admin), token_version=row.token_version)
+
+
+async def load_principal(db, user_id: int):
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        # Receive other workers' invalidations before caching anything
+        events.broker.listen()
+        principal = await run_sync(db, fetch_principal, user_id)
+        if principal:
+            principal_cache.set(user_id, principal)
+    return principal
+
+
+async def authenticate(db, token: str) -> Principal:
+    """
+    Decode the token once, then resolve the principal from the cache, touching
+    the database only on a miss.
+    """
+    started = time.perf_counter()
     try:
-        payload = jwt.decode(token, settings.JWT_SECRET, algorithms=["HS256"])
+        payload = decode_access_token(token)
         user_id = payload.get("user_id")
-        if not user_id:
-            raise HTTPException(status_code=401, detail="Invalid token")
-        user = db.query(User).filter(User.id == user_id).first()
-        if not user or not user.is_admin:
-            raise HTTPException(status_code=403, detail="Not an admin")
-        return user
-    except jwt.ExpiredSignatureError:
-        raise HTTPException(status_code=401, detail="Token expired")
-    except jwt.PyJWTError:
-        raise HTTPException(status_code=401, detail="Invalid token")
+        principal = await load_principal(db, user_id) if user_id is not None else None
+        # Tokens issued before a password change carry an older version
+        if not principal or payload.get("ver", 0) != principal.token_version:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+        return principal
+    finally:
+        auth_latency.observe(time.perf_counter() - started)
+
+
+async def get_current_user(request: Request, token: str = Depends(oauth2_scheme), db=Depends(get_session)) -> Principal:
+    """
+    Single authentication dependency. Write requests also pin the user's reads
+    to the primary (see read_routing).
+    """
+    principal = await authenticate(db, token)
+    note_request(request, principal.id)
+    return principal
+
+
+async def authenticate_connection(token: str) -> Principal:
+    """
+    authenticate() for long-lived connections (WebSockets). The session is
+    closed right away, so an open connection does not keep a pooled database
+    connection checked out.
+    """
+    if database.AsyncSessionLocal is not None:
+        async with database.AsyncSessionLocal() as db:
+            return await authenticate(db, token)
+    db = database.SessionLocal()
+    try:
+        return await authenticate(db, token)
+    finally:
+        db.close()
+
+
+async def get_current_admin_user(principal: Principal = Depends(get_current_user)) -> Principal:
+    if not principal.is_admin:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not an admin")
+    return principal
+
+
+def auth_stats() -> dict:
+    return {"principal_cache": principal_cache.stats(), "latency_seconds": auth_latency.snapshot()}
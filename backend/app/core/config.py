@@ -7,8 +7,107 @@ class Settings:
     PROJECT_NAME: str = "SmartBank"
     DATABASE_URL: str = os.getenv("DATABASE_URL")
     TEST_DATABASE_URL: str = os.getenv("TEST_DATABASE_URL")
+    # Serve requests from an AsyncSession (psycopg async / aiosqlite) instead of
+    # a threadpool-bound Session. ASYNC_DATABASE_URL defaults to DATABASE_URL
+    # with the async driver swapped in.
+    DB_ASYNC: bool = os.getenv("DB_ASYNC", "false").lower() in ("1", "true", "yes")
+    ASYNC_DATABASE_URL: str = os.getenv("ASYNC_DATABASE_URL")
+
+    # Optional read replica for read-only routes (GET /accounts/, history, admin
+    # listings and reports). A user's reads stay on the primary for
+    # REPLICA_STICKY_SECONDS after any write request of theirs, so they always see
+    # their own writes despite replication lag. The window travels with the client
+    # as a signed token (see app.core.read_routing), so it holds across workers.
+    DATABASE_REPLICA_URL: str = os.getenv("DATABASE_REPLICA_URL")
+    ASYNC_DATABASE_REPLICA_URL: str = os.getenv("ASYNC_DATABASE_REPLICA_URL")
+    REPLICA_STICKY_SECONDS: float = float(os.getenv("REPLICA_STICKY_SECONDS", 5))
+
+    # Connection pool, per engine and per worker process
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", 5))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", 10))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", 30))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", 1800))
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+    # Server-side per-statement timeout (PostgreSQL only); 0 disables it
+    DB_STATEMENT_TIMEOUT_MS: int = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", 0))
     JWT_SECRET: str = os.getenv("JWT_SECRET")
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24  # 1 day
 
+    # bcrypt cost factor; hashes below it are re-hashed on the next successful login
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", 12))
+    # Dedicated password-hashing executor: threads, plus how many requests may wait
+    # for one before we shed load with 503 + Retry-After
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", os.cpu_count() or 2))
+    PASSWORD_HASH_MAX_QUEUE: int = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", 32))
+    PASSWORD_HASH_RETRY_AFTER: int = int(os.getenv("PASSWORD_HASH_RETRY_AFTER", 1))
+
+    # Account numbers: each worker reserves blocks of sequence values from the
+    # database and permutes them with this key. Never change the key once
+    # accounts exist, or new numbers may collide with old ones. Required to open
+    # accounts (the first allocation fails without it): with a known key, numbers
+    # could be predicted from the sequence.
+    ACCOUNT_NUMBER_KEY: str = os.getenv("ACCOUNT_NUMBER_KEY")
+    ACCOUNT_NUMBER_BLOCK_SIZE: int = int(os.getenv("ACCOUNT_NUMBER_BLOCK_SIZE", 1000))
+
+    # Reporting rollup rows are split into this many buckets to spread write contention
+    ROLLUP_BUCKETS: int = int(os.getenv("ROLLUP_BUCKETS", 16))
+
+    # Idempotency-Key support on money-moving routes
+    IDEMPOTENCY_TTL_SECONDS: int = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", 24 * 60 * 60))
+    IDEMPOTENCY_CACHE_SIZE: int = int(os.getenv("IDEMPOTENCY_CACHE_SIZE", 10000))
+    # How long a retry waits for a duplicate that is still executing elsewhere
+    IDEMPOTENCY_WAIT_SECONDS: float = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", 10))
+    # A retry may take over a key still pending after this long (e.g. after a
+    # worker crash). Never unsafe: a request's money move commits only together
+    # with its stored outcome, and only while it still holds the key
+    IDEMPOTENCY_PENDING_TIMEOUT_SECONDS: float = float(os.getenv("IDEMPOTENCY_PENDING_TIMEOUT_SECONDS", 60))
+    # Expired keys are purged in batches of this size every IDEMPOTENCY_PURGE_EVERY new keys
+    IDEMPOTENCY_PURGE_BATCH: int = int(os.getenv("IDEMPOTENCY_PURGE_BATCH", 1000))
+    IDEMPOTENCY_PURGE_EVERY: int = int(os.getenv("IDEMPOTENCY_PURGE_EVERY", 1000))
+
+    # Per-worker cache of authenticated principals (user id -> id/is_admin/token version).
+    # Role and password changes drop the entry in every worker through the events
+    # broker. With EVENTS_BACKEND=local that reaches only the worker that made the
+    # change, so other workers keep honouring a revoked token or a removed admin
+    # role for up to AUTH_CACHE_TTL_SECONDS: run several workers with
+    # EVENTS_BACKEND=postgres, or lower the TTL.
+    AUTH_CACHE_SIZE: int = int(os.getenv("AUTH_CACHE_SIZE", 10000))
+    AUTH_CACHE_TTL_SECONDS: float = float(os.getenv("AUTH_CACHE_TTL_SECONDS", 60))
+
+    # Per-request instrumentation: route latency histograms, SQL accounting,
+    # Server-Timing headers and the Prometheus /metrics endpoint. Off by default.
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "false").lower() in ("1", "true", "yes")
+    # Requests running more statements than this are logged and counted (likely N+1)
+    METRICS_QUERY_WARN_THRESHOLD: int = int(os.getenv("METRICS_QUERY_WARN_THRESHOLD", 20))
+
+    # Group commit for deposits and withdrawals: requests are queued to one writer
+    # per worker, which applies up to GROUP_COMMIT_MAX_BATCH of them (each in a
+    # savepoint) in a single transaction, waiting at most GROUP_COMMIT_MAX_WAIT_MS
+    # for a batch to fill. Each request returns once its batch has committed.
+    GROUP_COMMIT_ENABLED: bool = os.getenv("GROUP_COMMIT_ENABLED", "false").lower() in ("1", "true", "yes")
+    GROUP_COMMIT_MAX_BATCH: int = int(os.getenv("GROUP_COMMIT_MAX_BATCH", 64))
+    GROUP_COMMIT_MAX_WAIT_MS: float = float(os.getenv("GROUP_COMMIT_MAX_WAIT_MS", 2))
+
+    # Fast response path for list endpoints: rows are dumped straight to JSON bytes
+    # by prebuilt TypeAdapters (no response_model re-validation), and other routes
+    # render with orjson when it is installed. Off by default.
+    FAST_SERIALIZATION: bool = os.getenv("FAST_SERIALIZATION", "false").lower() in ("1", "true", "yes")
+
+    # Push updates (WebSocket /accounts/events). "local" delivers an event only to
+    # connections on the worker that committed it; "postgres" sends it through
+    # NOTIFY on EVENTS_CHANNEL so every worker's connections get it. A connection
+    # more than EVENTS_QUEUE_SIZE events behind is closed.
+    EVENTS_BACKEND: str = os.getenv("EVENTS_BACKEND", "local")
+    EVENTS_CHANNEL: str = os.getenv("EVENTS_CHANNEL", "smartbank_events")
+    EVENTS_QUEUE_SIZE: int = int(os.getenv("EVENTS_QUEUE_SIZE", 256))
+
+    # Daily withdrawal/transfer limits, per account type (DAILY_LIMIT is the fallback)
+    DAILY_LIMIT: float = float(os.getenv("DAILY_LIMIT", 100000))
+    DAILY_LIMITS: dict = {
+        "savings": float(os.getenv("DAILY_LIMIT_SAVINGS", DAILY_LIMIT)),
+        "current": float(os.getenv("DAILY_LIMIT_CURRENT", DAILY_LIMIT)),
+        "fd": float(os.getenv("DAILY_LIMIT_FD", DAILY_LIMIT)),
+    }
+
 settings = Settings()
@@ -0,0 +1,249 @@
+# app/core/events.py
+"""
+Account events pushed to connected clients (WebSocket /accounts/events).
+
+Services stage events on the session with `stage(db, user_id, event)` while
+they write. The events only go out once that transaction commits; a rollback
+drops them. Each worker has one broker that fans events out to its
+connections, one Subscription per connection.
+
+- LocalBroker (EVENTS_BACKEND=local) delivers within the worker that made the
+  change. That is enough for a single worker, and for tests.
+- PostgresBroker (EVENTS_BACKEND=postgres) sends every event with NOTIFY
+  inside the committing transaction. PostgreSQL delivers it to each worker's
+  LISTEN connection only if that transaction commits.
+
+The same channel carries cache invalidations between workers: a transaction
+that changes what workers cache about a user stages `stage_invalidation(db,
+user_id)`, and once it commits every worker's `on_invalidate` handlers run
+(see auth.principal_cache). These never reach the user's connections.
+
+Events are dicts in minor units. The endpoint converts money at the boundary,
+like the rest of the API. A connection that falls more than EVENTS_QUEUE_SIZE
+events behind is closed rather than buffered without bound. The client should
+re-read GET /accounts/ whenever it (re)connects.
+"""
+import asyncio
+import json
+import logging
+import threading
+import time
+from datetime import datetime
+from sqlalchemy import event, make_url, text
+from sqlalchemy.orm import Session
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+PENDING_KEY = "pending_events"
+# End-of-stream markers: the subscriber fell too far behind / its client left
+OVERFLOW = object()
+CLOSED = object()
+# Event name of cache invalidations, dispatched to on_invalidate handlers only
+INVALIDATED = "invalidated"
+
+
+def transaction_event(account_id: int, tx_type: str, amount: int, balance: int = None) -> dict:
+    """A ledger entry on one account; balance (after the entry) when the writer knows it."""
+    event = {"event": "transaction", "account_id": account_id, "type": tx_type, "amount": amount}
+    if balance is not None:
+        event["balance"] = balance
+    return event
+
+
+def stage(db: Session, user_id: int, event: dict):
+    """Publish `event` to the user's connections once the session's transaction commits."""
+    db.info.setdefault(PENDING_KEY, []).append((user_id, event))
+
+
+def stage_invalidation(db: Session, user_id: int):
+    """Run every worker's invalidation handlers for the user once the session's transaction commits."""
+    stage(db, user_id, {"event": INVALIDATED})
+
+
+class Subscription:
+    """One connection's queue of events, fed from any thread and read on its event loop."""
+
+    def __init__(self, user_id: int, loop: asyncio.AbstractEventLoop, max_queue: int):
+        self.user_id = user_id
+        self.loop = loop
+        self.max_queue = max_queue
+        # One spare slot for the OVERFLOW marker
+        self.queue = asyncio.Queue(max_queue + 1)
+        self.open = True
+
+    def deliver(self, event):
+        self.loop.call_soon_threadsafe(self._put, event)
+
+    def _put(self, event):
+        if not self.open:
+            return
+        if event is CLOSED:
+            self.open = False
+        elif self.queue.qsize() >= self.max_queue:
+            self.open = False
+            event = OVERFLOW
+        self.queue.put_nowait(event)
+
+    def close(self):
+        self.deliver(CLOSED)
+
+    async def get(self):
+        return await self.queue.get()
+
+
+class LocalBroker:
+    """Fan-out to the subscriptions of this process."""
+
+    def __init__(self, max_queue: int = None):
+        self.max_queue = max_queue or settings.EVENTS_QUEUE_SIZE
+        self._subscriptions = {}  # user id -> set of Subscription
+        self._lock = threading.Lock()
+        self._invalidation_handlers = []
+        self.published = 0
+        self.delivered = 0
+
+    def subscribe(self, user_id: int) -> Subscription:
+        subscription = Subscription(user_id, asyncio.get_running_loop(), self.max_queue)
+        with self._lock:
+            self._subscriptions.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.user_id)
+            if subscriptions:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.user_id]
+
+    def connections(self) -> int:
+        with self._lock:
+            return sum(len(s) for s in self._subscriptions.values())
+
+    def on_invalidate(self, handler):
+        """
+        Call handler(user_id) whenever a committed transaction invalidates what
+        workers cache about the user, and handler(None) when invalidations may
+        have been missed and everything should be dropped.
+        """
+        self._invalidation_handlers.append(handler)
+
+    def listen(self):
+        """Make sure this worker receives other workers' events; a no-op for a single process."""
+
+    def invalidate(self, user_id):
+        for handler in self._invalidation_handlers:
+            handler(user_id)
+
+    def dispatch(self, user_id: int, event: dict):
+        if event.get("event") == INVALIDATED:
+            return self.invalidate(user_id)
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(user_id, ()))
+        for subscription in subscriptions:
+            subscription.deliver(event)
+        self.delivered += len(subscriptions)
+
+    def before_commit(self, db: Session, events):
+        pass
+
+    def after_commit(self, events):
+        published_at = datetime.utcnow().isoformat()
+        for user_id, event in events:
+            self.dispatch(user_id, {**event, "published_at": published_at})
+        self.published += len(events)
+
+    def stats(self) -> dict:
+        return {"backend": type(self).__name__, "connections": self.connections(),
+                "published": self.published, "delivered": self.delivered}
+
+
+class PostgresBroker(LocalBroker):
+    """
+    Cross-worker fan-out through LISTEN/NOTIFY. Notifications ride on the
+    writing transaction, so they are sent exactly when it commits, and one
+    listener connection per worker receives every event and dispatches it locally.
+    """
+
+    def __init__(self, url: str, channel: str, max_queue: int = None):
+        super().__init__(max_queue)
+        # psycopg speaks libpq URLs, without the SQLAlchemy driver suffix
+        self.dsn = make_url(url).set(drivername="postgresql").render_as_string(hide_password=False)
+        self.channel = channel
+        self._listener = None
+        self._listener_lock = threading.Lock()
+
+    def subscribe(self, user_id: int) -> Subscription:
+        self.listen()
+        return super().subscribe(user_id)
+
+    def before_commit(self, db: Session, events):
+        published_at = datetime.utcnow().isoformat()
+        db.execute(text("SELECT pg_notify(:channel, :payload)"), [
+            {"channel": self.channel,
+             "payload": json.dumps({"user_id": user_id, "event": {**event, "published_at": published_at}})}
+            for user_id, event in events
+        ])
+
+    def after_commit(self, events):
+        self.published += len(events)
+
+    def listen(self):
+        if self._listener is not None:
+            return
+        with self._listener_lock:
+            if self._listener is None:
+                self._listener = threading.Thread(target=self._listen, name="events-listener", daemon=True)
+                self._listener.start()
+
+    def _listen(self):
+        import psycopg
+        while True:
+            try:
+                with psycopg.connect(self.dsn, autocommit=True) as conn:
+                    conn.execute(f'LISTEN "{self.channel}"')
+                    # Whatever was invalidated before or between connections was missed
+                    self.invalidate(None)
+                    for notify in conn.notifies():
+                        message = json.loads(notify.payload)
+                        self.dispatch(message["user_id"], message["event"])
+            except Exception:
+                # Events sent while disconnected are lost; clients re-read on reconnect,
+                # and caches are dropped once the listener is back
+                logger.exception("Event listener connection failed; reconnecting")
+                time.sleep(1)
+
+
+def make_broker():
+    if settings.EVENTS_BACKEND == "postgres":
+        return PostgresBroker(settings.DATABASE_URL, settings.EVENTS_CHANNEL)
+    if settings.EVENTS_BACKEND != "local":
+        raise ValueError(f"Unknown EVENTS_BACKEND {settings.EVENTS_BACKEND!r}")
+    return LocalBroker()
+
+
+broker = make_broker()
+
+
+# ---------------- Session hooks ----------------
+@event.listens_for(Session, "before_commit")
+def _send_events(session, *args):
+    # Also fired when a savepoint is released; only the real commit sends
+    events = session.info.get(PENDING_KEY)
+    if events and not session.in_nested_transaction():
+        broker.before_commit(session, events)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_events(session, *args):
+    events = session.info.pop(PENDING_KEY, None)
+    if events:
+        broker.after_commit(events)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _drop_events(session, transaction):
+    # Whatever is still pending when the outermost transaction ends was rolled back
+    if transaction.parent is None:
+        session.info.pop(PENDING_KEY, None)
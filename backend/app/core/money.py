@@ -0,0 +1,47 @@
+# app/core/money.py
+"""
+Money is stored and computed as integer minor units (paise): balances, amounts,
+limits and report totals are plain ints, so sums never drift. Conversion to and
+from major units (rupees, what the API speaks) happens only at the boundary, in
+the pydantic money types of db/schemas.py.
+"""
+import math
+from decimal import Decimal, InvalidOperation
+
+MINOR_UNITS = 100  # paise per rupee
+# Largest amount exactly representable as a JSON number (float64)
+MAX_MINOR = 2**53
+
+
+def to_minor(value) -> int:
+    """Convert a major-unit amount (int, float, Decimal or numeric string) to minor units."""
+    if isinstance(value, bool):
+        raise ValueError("Amount must be a number")
+    if isinstance(value, int):
+        minor = value * MINOR_UNITS
+    elif isinstance(value, float):
+        if not math.isfinite(value):
+            raise ValueError("Amount must be a finite number")
+        scaled = value * MINOR_UNITS
+        minor = round(scaled)
+        # Tolerate only the float error of scaling a value that has at most two decimals
+        if abs(scaled - minor) > max(1e-9, 4 * math.ulp(scaled)):
+            raise ValueError("Amount must have at most 2 decimal places")
+    elif isinstance(value, (str, Decimal)):
+        try:
+            scaled = Decimal(value) * MINOR_UNITS
+        except InvalidOperation:
+            raise ValueError("Amount must be a number")
+        if not scaled.is_finite() or scaled != scaled.to_integral_value():
+            raise ValueError("Amount must have at most 2 decimal places")
+        minor = int(scaled)
+    else:
+        raise ValueError("Amount must be a number")
+    if abs(minor) > MAX_MINOR:
+        raise ValueError("Amount is out of range")
+    return minor
+
+
+def to_major(minor: int) -> float:
+    """Minor units to the major-unit float the API returns (e.g. 12345 -> 123.45)."""
+    return minor / MINOR_UNITS
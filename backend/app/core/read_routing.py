@@ -0,0 +1,78 @@
+# app/core/read_routing.py
+# Read-your-writes stickiness for replica routing. The response to any non-GET
+# request by a signed-in user carries a signed "primary until" token, as the
+# primary_until cookie and the X-Primary-Until header. Until it expires,
+# REPLICA_STICKY_SECONDS later, that user's reads go to the primary, which is
+# long enough for the replica to catch up with what they just wrote. The token
+# travels with the client (browsers send the cookie back; other clients echo the
+# header), so every worker honours it, not just the one that took the write.
+import hashlib
+import hmac
+import time
+from app.core.config import settings
+
+SAFE_METHODS = frozenset(("GET", "HEAD", "OPTIONS"))
+COOKIE = "primary_until"
+HEADER = "X-Primary-Until"
+# Request state key: the signed-in user who sent a write request
+WRITER = "writer_id"
+
+
+def _signature(user_id: int, until_ms: int) -> str:
+    message = f"{COOKIE}:{user_id}:{until_ms}".encode()
+    return hmac.new(settings.JWT_SECRET.encode(), message, hashlib.sha256).hexdigest()[:32]
+
+
+def issue(user_id: int) -> str:
+    until_ms = int((time.time() + settings.REPLICA_STICKY_SECONDS) * 1000)
+    return f"{user_id}.{until_ms}.{_signature(user_id, until_ms)}"
+
+
+def _pins(token, user_id: int) -> bool:
+    try:
+        token_user, until_ms, signature = token.split(".")
+        until_ms = int(until_ms)
+    except (AttributeError, ValueError):
+        return False
+    return (
+        token_user == str(user_id)
+        and until_ms > time.time() * 1000
+        and hmac.compare_digest(signature, _signature(user_id, until_ms))
+    )
+
+
+def note_request(request, user_id: int):
+    if request.method not in SAFE_METHODS:
+        setattr(request.state, WRITER, user_id)
+
+
+def reads_from_primary(request, user_id: int) -> bool:
+    return _pins(request.headers.get(HEADER), user_id) or _pins(request.cookies.get(COOKIE), user_id)
+
+
+class ReadRoutingMiddleware:
+    """Pure ASGI middleware adding the "primary until" token to responses to write requests."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS:
+            return await self.app(scope, receive, send)
+        # Shared with request.state in the endpoint, which note_request fills in
+        state = scope.setdefault("state", {})
+
+        async def send_with_token(message):
+            if message["type"] == "http.response.start" and state.get(WRITER) is not None:
+                token = issue(state[WRITER])
+                max_age = int(settings.REPLICA_STICKY_SECONDS) + 1
+                headers = list(message.get("headers", []))
+                headers.append((HEADER.lower().encode(), token.encode()))
+                headers.append((
+                    b"set-cookie",
+                    f"{COOKIE}={token}; Max-Age={max_age}; Path=/; HttpOnly; SameSite=Lax".encode()
+                ))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, receive, send_with_token)
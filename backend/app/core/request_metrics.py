@@ -0,0 +1,265 @@
+# app/core/request_metrics.py
+"""
+Per-request instrumentation, enabled with METRICS_ENABLED.
+
+RequestMetricsMiddleware opens a RequestStats for every HTTP request in a
+context variable. SQLAlchemy engine events add each statement's count, rows
+and time to it; `span(name)` blocks add named phases (bcrypt, jwt, limit,
+commit). At response start the totals go into a Server-Timing header and into
+per-route aggregates, which /metrics renders in Prometheus text format.
+
+When instrumentation is off nothing is installed, and `span` costs a single
+ContextVar lookup.
+"""
+import logging
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+# Statements per request
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 250)
+
+
+class RequestStats:
+    __slots__ = ("started", "queries", "rows", "db_time", "spans")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.rows = 0
+        self.db_time = 0.0
+        self.spans = {}
+
+    def add_span(self, name: str, seconds: float):
+        self.spans[name] = self.spans.get(name, 0.0) + seconds
+
+
+_current = ContextVar("request_stats", default=None)
+
+
+@contextmanager
+def span(name: str):
+    """Time a phase of the current request (no-op outside an instrumented request)."""
+    stats = _current.get()
+    if stats is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.add_span(name, time.perf_counter() - started)
+
+
+# ---------------- Aggregates ----------------
+class RouteMetrics:
+    def __init__(self):
+        self.latency = Histogram()
+        self.queries = Histogram(QUERY_BUCKETS)
+        self.statuses = defaultdict(int)
+        self.rows = 0
+        self.db_time = 0.0
+        self.spans = defaultdict(float)
+        self.query_heavy = 0
+
+
+class Registry:
+    """Per (method, route template) aggregates, safe to update from any thread."""
+
+    def __init__(self):
+        self.routes = defaultdict(RouteMetrics)
+        self._lock = threading.Lock()
+
+    def record(self, method: str, route: str, status: int, elapsed: float, stats: RequestStats):
+        with self._lock:
+            metrics = self.routes[(method, route)]
+            metrics.statuses[status] += 1
+            metrics.rows += stats.rows
+            metrics.db_time += stats.db_time
+            for name, seconds in stats.spans.items():
+                metrics.spans[name] += seconds
+            if stats.queries > settings.METRICS_QUERY_WARN_THRESHOLD:
+                metrics.query_heavy += 1
+        metrics.latency.observe(elapsed)
+        metrics.queries.observe(stats.queries)
+
+    def reset(self):
+        with self._lock:
+            self.routes.clear()
+
+
+registry = Registry()
+
+
+# ---------------- SQL accounting ----------------
+# The start time lives on the statement's execution context, which is dropped
+# with it, so a statement that raises leaves nothing behind on the connection
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_query_started", None)
+    stats = _current.get()
+    if stats is not None and started is not None:
+        stats.queries += 1
+        stats.db_time += time.perf_counter() - started
+        # Rows as the driver reports them: affected rows for DML, fetched rows
+        # for SELECT where the driver knows (psycopg does, sqlite3 reports -1)
+        if cursor.rowcount and cursor.rowcount > 0:
+            stats.rows += cursor.rowcount
+
+
+def instrument_engine(engine):
+    """Count statements on a sync Engine (for an AsyncEngine pass .sync_engine)."""
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return engine
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    return engine
+
+
+def _before_commit(session):
+    session.info["commit_started"] = time.perf_counter()
+
+
+def _after_commit(session):
+    started = session.info.pop("commit_started", None)
+    stats = _current.get()
+    if stats is not None and started is not None:
+        stats.add_span("commit", time.perf_counter() - started)
+
+
+def instrument_sessions():
+    """Time every Session commit (flush included) as the `commit` span."""
+    if event.contains(Session, "before_commit", _before_commit):
+        return
+    event.listen(Session, "before_commit", _before_commit)
+    event.listen(Session, "after_commit", _after_commit)
+
+
+# ---------------- Middleware ----------------
+def server_timing(stats: RequestStats, elapsed: float) -> str:
+    parts = [
+        f"app;dur={elapsed * 1000:.2f}",
+        f'db;dur={stats.db_time * 1000:.2f};desc="{stats.queries} queries"',
+    ]
+    parts.extend(f"{name};dur={seconds * 1000:.2f}" for name, seconds in stats.spans.items())
+    return ", ".join(parts)
+
+
+class RequestMetricsMiddleware:
+    """Pure ASGI middleware (no BaseHTTPMiddleware buffering) recording each HTTP request."""
+
+    def __init__(self, app):
+        self.app = app
+        self._templates = None
+
+    def _route_template(self, scope) -> str:
+        # The router leaves the matched endpoint in scope; map it back to its path template
+        # so labels stay bounded (/accounts/{account_id}/transactions, not one per id)
+        if self._templates is None:
+            self._templates = {
+                getattr(route, "endpoint", None): route.path for route in scope["app"].routes
+            }
+        return self._templates.get(scope.get("endpoint"), "unmatched")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = RequestStats()
+        token = _current.set(stats)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                elapsed = time.perf_counter() - stats.started
+                route = self._route_template(scope)
+                registry.record(scope["method"], route, message["status"], elapsed, stats)
+                if stats.queries > settings.METRICS_QUERY_WARN_THRESHOLD:
+                    logger.warning("%s %s ran %d queries (possible N+1)", scope["method"], route, stats.queries)
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", server_timing(stats, elapsed).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+
+
+# ---------------- Prometheus exposition ----------------
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _header(lines, name: str, kind: str, help_text: str):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {kind}")
+
+
+def _histogram(lines, name: str, histogram: Histogram, **labels):
+    for bound, count in histogram.cumulative():
+        le = "+Inf" if bound == float("inf") else repr(float(bound))
+        lines.append(f"{name}_bucket{_labels(**labels, le=le)} {count}")
+    lines.append(f"{name}_sum{_labels(**labels)} {histogram.sum}")
+    lines.append(f"{name}_count{_labels(**labels)} {histogram.count}")
+
+
+def render_prometheus(pools: dict) -> str:
+    """All request and pool metrics in the Prometheus text exposition format."""
+    with registry._lock:
+        routes = sorted(registry.routes.items())
+    lines = []
+
+    _header(lines, "smartbank_http_request_duration_seconds", "histogram", "Time to response start per route.")
+    for (method, route), m in routes:
+        _histogram(lines, "smartbank_http_request_duration_seconds", m.latency, method=method, route=route)
+
+    _header(lines, "smartbank_http_requests_total", "counter", "Requests per route and status.")
+    for (method, route), m in routes:
+        for status, count in sorted(m.statuses.items()):
+            lines.append(f"smartbank_http_requests_total{_labels(method=method, route=route, status=status)} {count}")
+
+    _header(lines, "smartbank_db_queries_per_request", "histogram", "SQL statements per request.")
+    for (method, route), m in routes:
+        _histogram(lines, "smartbank_db_queries_per_request", m.queries, method=method, route=route)
+
+    per_route = (
+        ("smartbank_db_rows_total", "Rows reported by the database driver.", "rows"),
+        ("smartbank_db_time_seconds_total", "Time spent executing SQL.", "db_time"),
+        ("smartbank_query_heavy_requests_total",
+         f"Requests above {settings.METRICS_QUERY_WARN_THRESHOLD} queries (likely N+1).", "query_heavy"),
+    )
+    for name, help_text, attr in per_route:
+        _header(lines, name, "counter", help_text)
+        for (method, route), m in routes:
+            lines.append(f"{name}{_labels(method=method, route=route)} {getattr(m, attr)}")
+
+    _header(lines, "smartbank_phase_seconds_total", "counter", "Time per request phase (bcrypt, jwt, limit, commit).")
+    for (method, route), m in routes:
+        for phase, seconds in sorted(m.spans.items()):
+            lines.append(f"smartbank_phase_seconds_total{_labels(method=method, route=route, phase=phase)} {seconds}")
+
+    snapshots = {name: metrics.snapshot() for name, metrics in pools.items()}
+    _header(lines, "smartbank_db_pool_in_use", "gauge", "Connections checked out per pool.")
+    for name, snap in snapshots.items():
+        lines.append(f"smartbank_db_pool_in_use{_labels(pool=name)} {snap.get('in_use', 0)}")
+    _header(lines, "smartbank_db_pool_timeouts_total", "counter", "Pool checkouts that timed out.")
+    for name, snap in snapshots.items():
+        lines.append(f"smartbank_db_pool_timeouts_total{_labels(pool=name)} {snap['timeouts']}")
+    return "\n".join(lines) + "\n"
@@ -1,26 +1,106 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from jose import jwt
 from jose.exceptions import JWTError
 from passlib.context import CryptContext
 from app.core.config import settings
+from app.core.request_metrics import span
 from typing import Optional
 from fastapi import HTTPException, status
 
-# Initialize CryptContext with bcrypt
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Initialize CryptContext with bcrypt. min_rounds makes hashes created at a
+# lower cost report needs_update, so they get upgraded on the next login.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS
+)
 
-def hash_password(password: str) -> str:
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a small dedicated thread pool (bcrypt releases the GIL) and
+    caps how many calls may be running or waiting. Past that cap we fail fast
+    with 503 instead of letting a login burst queue up behind the CPU.
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+
+    def submit(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many authentication requests, please retry",
+                headers={"Retry-After": str(settings.PASSWORD_HASH_RETRY_AFTER)},
+            )
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+
+
+password_hasher = PasswordHasher(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_QUEUE)
+
+
+def configure_password_hasher(workers: int, max_queue: int) -> PasswordHasher:
+    """Swap in a differently sized executor (benchmarks, tuning)."""
+    global password_hasher
+    old, password_hasher = password_hasher, PasswordHasher(workers, max_queue)
+    old.shutdown()
+    return password_hasher
+
+
+def _password_bytes(password: str) -> bytes:
     # Validate password length before hashing
     if not password:
         raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Password cannot be empty")
     password_bytes = password.encode("utf-8")
     if len(password_bytes) > 72:
         raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Password too long (max 72 bytes)")
-    return pwd_context.hash(password_bytes[:72])
+    return password_bytes
+
+def hash_password(password: str) -> str:
+    with span("bcrypt"):
+        return password_hasher.submit(pwd_context.hash, _password_bytes(password)).result()
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     # Encode and truncate for verification
-    return pwd_context.verify(plain_password.encode("utf-8")[:72], hashed_password)
+    with span("bcrypt"):
+        return password_hasher.submit(pwd_context.verify, plain_password.encode("utf-8")[:72], hashed_password).result()
+
+def verify_and_update_password(plain_password: str, hashed_password: str):
+    """
+    Verify a password and, if its hash uses an outdated cost factor, return a
+    replacement hash as well: (valid, new_hash_or_None).
+    """
+    with span("bcrypt"):
+        return password_hasher.submit(
+            pwd_context.verify_and_update, plain_password.encode("utf-8")[:72], hashed_password
+        ).result()
+
+# Awaitable variants for async handlers: the event loop waits on the executor
+# future instead of parking a threadpool thread on it.
+async def hash_password_async(password: str) -> str:
+    with span("bcrypt"):
+        return await asyncio.wrap_future(password_hasher.submit(pwd_context.hash, _password_bytes(password)))
+
+async def verify_and_update_password_async(plain_password: str, hashed_password: str):
+    with span("bcrypt"):
+        return await asyncio.wrap_future(password_hasher.submit(
+            pwd_context.verify_and_update, plain_password.encode("utf-8")[:72], hashed_password
+        ))
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
@@ -35,7 +115,8 @@ def decode_access_token(token: str) -> dict:
     Raises HTTPException on invalid token.
     """
     try:
-        return jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
+        with span("jwt"):
+            return jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
     except JWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -0,0 +1,213 @@
+# app/db/account_numbers.py
+"""
+Collision-free account numbers.
+
+Each process reserves a block of sequence values from the id_blocks table in
+its own short transaction (hi/lo allocation; on SQLite, in the caller's
+transaction), then hands numbers out from memory. A sequence value is turned
+into a number by a keyed Feistel permutation over the 9-digit range, so
+consecutive accounts do not get guessable numbers, followed by a Luhn check
+digit: 10 digits, never starting with 0, unique by construction. Numbers
+already taken by legacy (randomly generated) accounts are skipped with one
+query per block, so inserts never need a uniqueness retry.
+
+ACCOUNT_NUMBER_KEY is only needed once an account is numbered: without it the
+first allocation fails with a RuntimeError, and nothing else does.
+"""
+import hashlib
+import threading
+from sqlalchemy import create_engine, event, select, update
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db import models
+from app.db.upsert import insert_for
+
+SEQUENCE_NAME = "account_number"
+# Session.info key: allocators that reserved a block in the session's transaction
+RESERVED_IN = "account_number_allocators"
+# 9-digit bodies 100000000..999999999 = 900,000,000 = 30000 * 30000 values
+HALF = 30000
+BODY_OFFSET = 10**8
+ROUNDS = 4
+
+
+_round_keys_cache = []
+
+
+def _round_keys() -> list:
+    # Derived on first use, so the app, migrations and jobs that never number an
+    # account do not need the key
+    if not _round_keys_cache:
+        if not settings.ACCOUNT_NUMBER_KEY:
+            raise RuntimeError("ACCOUNT_NUMBER_KEY must be set to create accounts; account numbers are derived from it")
+        _round_keys_cache.extend(
+            hashlib.blake2b(f"{settings.ACCOUNT_NUMBER_KEY}:{i}".encode(), digest_size=16).digest()
+            for i in range(ROUNDS)
+        )
+    return _round_keys_cache
+
+
+def _f(value: int, key: bytes) -> int:
+    digest = hashlib.blake2b(value.to_bytes(4, "big"), key=key, digest_size=4).digest()
+    return int.from_bytes(digest, "big") % HALF
+
+
+def permute(value: int) -> int:
+    """Bijection on [0, HALF**2); reversed by unpermute."""
+    left, right = divmod(value, HALF)
+    for key in _round_keys():
+        left, right = right, (left + _f(right, key)) % HALF
+    return left * HALF + right
+
+
+def unpermute(value: int) -> int:
+    left, right = divmod(value, HALF)
+    for key in reversed(_round_keys()):
+        left, right = (right - _f(left, key)) % HALF, left
+    return left * HALF + right
+
+
+def luhn_check_digit(digits: str) -> int:
+    total = 0
+    for i, digit in enumerate(reversed(digits)):
+        n = int(digit)
+        if i % 2 == 0:  # doubled positions, counting from the (future) check digit
+            n = n * 2 - 9 if n > 4 else n * 2
+        total += n
+    return (10 - total % 10) % 10
+
+
+def is_valid_account_number(number: str) -> bool:
+    return len(number) == 10 and number.isdigit() and luhn_check_digit(number[:-1]) == int(number[-1])
+
+
+def format_account_number(sequence_value: int) -> str:
+    if not 0 <= sequence_value < HALF * HALF:
+        raise ValueError("Account number sequence exhausted")
+    body = str(BODY_OFFSET + permute(sequence_value))
+    return body + str(luhn_check_digit(body))
+
+
+def sequence_value_of(number: str) -> int:
+    """Inverse of format_account_number (for support tooling and tests)."""
+    return unpermute(int(number[:-1]) - BODY_OFFSET)
+
+
+class BlockAllocator:
+    """Hands out account numbers from a block of sequence values reserved in the database."""
+
+    def __init__(self, block_size: int):
+        self.block_size = block_size
+        self._numbers = []
+        self._engine = None
+        self._lock = threading.Lock()
+
+    def _reservation_engine(self, bind):
+        # Reservations use their own unpooled connections. Taking one from the
+        # application's pool could wait forever: every pooled connection may belong
+        # to a request that is itself waiting on this allocator's lock.
+        if self._engine is None:
+            if bind.dialect.is_async:
+                self._engine = create_async_engine(bind.url, poolclass=NullPool).sync_engine
+            else:
+                self._engine = create_engine(bind.url, poolclass=NullPool)
+        return self._engine
+
+    def _reserve_block(self, bind, insert, session=None):
+        if session is not None:
+            return self._reserve_in(session, insert)
+        # Own connection and transaction: the reservation must stick even if the
+        # caller's transaction rolls back, or two processes could share a block.
+        with self._reservation_engine(bind).connect() as conn:
+            with conn.begin():
+                end = self._bump(conn, insert)
+            return self._untaken(conn, end)
+
+    def _reserve_in(self, session, insert):
+        # In the caller's transaction (SQLite): it is undone along with that
+        # transaction, and then the block is dropped from memory too.
+        session.info.setdefault(RESERVED_IN, set()).add(self)
+        conn = session.connection()
+        return self._untaken(conn, self._bump(conn, insert))
+
+    def _bump(self, conn, insert) -> int:
+        conn.execute(
+            insert(models.IdBlock).values(name=SEQUENCE_NAME, next_value=0)
+            .on_conflict_do_nothing(index_elements=["name"])
+        )
+        return conn.execute(
+            update(models.IdBlock)
+            .where(models.IdBlock.name == SEQUENCE_NAME)
+            .values(next_value=models.IdBlock.next_value + self.block_size)
+            .returning(models.IdBlock.next_value)
+        ).scalar_one()
+
+    def _untaken(self, conn, end: int) -> list:
+        numbers = [format_account_number(v) for v in range(end - self.block_size, end)]
+        # Skip numbers that legacy random generation already handed out
+        taken = set(conn.execute(
+            select(models.Account.account_number).where(models.Account.account_number.in_(numbers))
+        ).scalars())
+        return [n for n in numbers if n not in taken]
+
+    def allocate(self, bind, insert, count: int = 1, session=None):
+        """`count` numbers; a block needed on the way is reserved in `session`'s transaction if given."""
+        with self._lock:
+            while len(self._numbers) < count:
+                self._numbers.extend(self._reserve_block(bind, insert, session))
+            allocated, self._numbers = self._numbers[:count], self._numbers[count:]
+        return allocated
+
+    def forget(self):
+        """Drop the numbers held in memory (their block's reservation was rolled back)."""
+        with self._lock:
+            self._numbers = []
+
+
+# One allocator per database, keyed by URL
+_allocators = {}
+_allocators_lock = threading.Lock()
+
+
+def _allocator_for(bind):
+    key = bind.url.render_as_string(hide_password=False)
+    with _allocators_lock:
+        if key not in _allocators:
+            _allocators[key] = BlockAllocator(settings.ACCOUNT_NUMBER_BLOCK_SIZE)
+        return _allocators[key]
+
+
+def next_account_numbers(db: Session, count: int):
+    """Reserve `count` account numbers for bulk inserts."""
+    _round_keys()  # without the key, fail before reserving a block
+    bind = db.get_bind()
+    # SQLite has one writer at a time: once this session has written anything, a
+    # reservation on another connection waits for it until "database is locked".
+    # There the block is reserved in the session's own transaction instead.
+    session = db if bind.dialect.name == "sqlite" else None
+    return _allocator_for(bind).allocate(bind, insert_for(db), count, session)
+
+
+def next_account_number(db: Session) -> str:
+    return next_account_numbers(db, 1)[0]
+
+
+@event.listens_for(Session, "before_flush")
+def _assign_account_numbers(session, flush_context, instances):
+    pending = [obj for obj in session.new if isinstance(obj, models.Account) and not obj.account_number]
+    if pending:
+        for account, number in zip(pending, next_account_numbers(session, len(pending))):
+            account.account_number = number
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_rolled_back_blocks(session, previous_transaction):
+    for allocator in session.info.pop(RESERVED_IN, ()):
+        allocator.forget()
+
+
+@event.listens_for(Session, "after_commit")
+def _keep_committed_blocks(session):
+    session.info.pop(RESERVED_IN, None)
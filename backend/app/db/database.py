@@ -1,21 +1,128 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-import os
-from dotenv import load_dotenv
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.db.pool_metrics import PoolMetrics, TimedQueuePool, TimedAsyncAdaptedQueuePool
 
-load_dotenv()
+DATABASE_URL = settings.DATABASE_URL
 
-DATABASE_URL = os.getenv("DATABASE_URL")
 
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def engine_options(url: str, async_: bool = False) -> dict:
+    """Pool and timeout settings for create_engine / create_async_engine."""
+    url = make_url(url)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        # In-memory SQLite lives in a single connection; keep SQLAlchemy's default pool
+        return {}
+    options = {
+        "poolclass": TimedAsyncAdaptedQueuePool if async_ else TimedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    if url.get_backend_name() == "postgresql" and settings.DB_STATEMENT_TIMEOUT_MS:
+        options["connect_args"] = {"options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"}
+    return options
+
+
+# Objects returned by the services are serialized after the commit, possibly on
+# the event loop, so they must not expire and lazy-load there.
+engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL))
+pool_metrics = {"primary": PoolMetrics().attach(engine)}
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 Base = declarative_base()
 
+# Read-only routes use the replica when one is configured, the primary otherwise
+REPLICA_URL = settings.DATABASE_REPLICA_URL
+replica_engine = engine
+if REPLICA_URL:
+    replica_engine = create_engine(REPLICA_URL, **engine_options(REPLICA_URL))
+    pool_metrics["replica"] = PoolMetrics().attach(replica_engine)
+ReplicaSessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=replica_engine)
+
+
+def async_database_url(url: str) -> str:
+    """Swap the sync driver in a database URL for its asyncio counterpart."""
+    url = make_url(url)
+    if url.get_backend_name() == "sqlite":
+        return url.set(drivername="sqlite+aiosqlite").render_as_string(hide_password=False)
+    if url.get_backend_name() == "postgresql":
+        # psycopg 3 serves both; SQLAlchemy picks its async dialect under create_async_engine
+        return url.set(drivername="postgresql+psycopg").render_as_string(hide_password=False)
+    return url.render_as_string(hide_password=False)
+
+
+def sync_database_url(url: str) -> str:
+    """The inverse of async_database_url, for code that needs a blocking driver."""
+    url = make_url(url)
+    if url.get_backend_name() == "sqlite":
+        return url.set(drivername="sqlite").render_as_string(hide_password=False)
+    if url.get_backend_name() == "postgresql":
+        return url.set(drivername="postgresql+psycopg").render_as_string(hide_password=False)
+    return url.render_as_string(hide_password=False)
+
+
+# Only built in async mode, so aiosqlite/async drivers stay optional otherwise
+async_engine = None
+AsyncSessionLocal = None
+async_replica_engine = None
+AsyncReplicaSessionLocal = None
+if settings.DB_ASYNC:
+    ASYNC_URL = settings.ASYNC_DATABASE_URL or async_database_url(DATABASE_URL)
+    async_engine = create_async_engine(ASYNC_URL, **engine_options(ASYNC_URL, async_=True))
+    pool_metrics["async"] = PoolMetrics().attach(async_engine.sync_engine)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    AsyncReplicaSessionLocal = AsyncSessionLocal
+    if REPLICA_URL:
+        ASYNC_REPLICA_URL = settings.ASYNC_DATABASE_REPLICA_URL or async_database_url(REPLICA_URL)
+        async_replica_engine = create_async_engine(ASYNC_REPLICA_URL, **engine_options(ASYNC_REPLICA_URL, async_=True))
+        pool_metrics["async_replica"] = PoolMetrics().attach(async_replica_engine.sync_engine)
+        AsyncReplicaSessionLocal = async_sessionmaker(async_replica_engine, autoflush=False, expire_on_commit=False)
+
 # Dependency for routes
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def get_replica_db():
+    db = ReplicaSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_replica_db():
+    async with AsyncReplicaSessionLocal() as db:
+        yield db
+
+
+# What routes depend on; overriding get_db in tests still works in sync mode
+get_session = get_async_db if settings.DB_ASYNC else get_db
+# Read-only routes take it through dependencies.get_read_session, which falls
+# back to get_session for users who wrote recently
+get_replica_session = get_async_replica_db if settings.DB_ASYNC else get_replica_db
+
+
+async def run_sync(db, fn, *args, **kwargs):
+    """
+    Call a sync service function `fn(session, *args)` from an async handler.
+    With an AsyncSession it runs via run_sync (greenlet, on the loop, async IO);
+    with a plain Session it runs on the threadpool.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
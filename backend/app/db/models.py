@@ -1,10 +1,11 @@
-import random
-from sqlalchemy import Column, Integer, String, Boolean, Float, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, BigInteger, String, Boolean, ForeignKey, DateTime, Date, Index, Text
 from sqlalchemy.orm import relationship
 from app.db.database import Base
 from datetime import datetime
 
 class User(Base):
+    # Admin search also has PostgreSQL-only indexes on lower(name) and lower(email),
+    # created by migration 0012
     __tablename__ = "users"
     __table_args__ = {"extend_existing": True}
 
@@ -13,6 +14,8 @@ class User(Base):
     email = Column(String, unique=True, index=True, nullable=False)
     hashed_password = Column(String, nullable=False)
     is_admin = Column(Boolean, default=False)
+    # Bumped on password change; tokens carrying an older version are rejected
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
 
     # Add this relationship to fix the mapper error
     accounts = relationship("Account", back_populates="owner")
@@ -25,29 +28,121 @@ class Account(Base):
     id = Column(Integer, primary_key=True, index=True)
     account_number = Column(String, unique=True, index=True)
     account_type = Column(String, nullable=False)
-    balance = Column(Float, default=0.0)
+    balance = Column(BigInteger, nullable=False, default=0)  # minor units (paise)
+    # Hot-account mode: > 0 spreads incoming credits over this many AccountBalanceSlot rows
+    balance_slots = Column(Integer, nullable=False, default=0, server_default="0")
 
-    user_id = Column(Integer, ForeignKey("users.id"))
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)  # accounts of a user, admin summaries
     owner = relationship("User", back_populates="accounts")
 
     # Add this to fix the Transaction relationship
     transactions = relationship("Transaction", back_populates="account", cascade="all, delete-orphan")
 
-    # Automatically generate a random 10-digit account number
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        if not self.account_number:
-            self.account_number = str(random.randint(10**9, 10**10 - 1))
+    # account_number is assigned at flush time by app.db.account_numbers when not set
 
 
+# ------------------ Balance Slots ------------------
+class AccountBalanceSlot(Base):
+    """
+    Credits to a hot account that have not been folded into Account.balance yet.
+    An account's balance is Account.balance plus the sum of its slots (see
+    app.services.hot_accounts); the compactor moves slot amounts into the balance.
+    """
+    __tablename__ = "account_balance_slots"
+
+    account_id = Column(Integer, ForeignKey("accounts.id"), primary_key=True)
+    slot = Column(Integer, primary_key=True)
+    amount = Column(BigInteger, nullable=False, default=0)  # minor units, never negative
+
+
+# ------------------ Id Blocks ------------------
+class IdBlock(Base):
+    """High-water mark of a block-allocated sequence (e.g. account numbers)."""
+    __tablename__ = "id_blocks"
+
+    name = Column(String, primary_key=True)
+    next_value = Column(BigInteger, nullable=False)
+
 
 class Transaction(Base):
     __tablename__ = "transactions"
+    __table_args__ = (
+        # Per-account, per-type range scans (daily-usage backfill, history by type)
+        Index("ix_transactions_account_type_created", "account_id", "type", "created_at"),
+        # Keyset pagination and streaming export of an account's history
+        Index("ix_transactions_account_created_id", "account_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     account_id = Column(Integer, ForeignKey("accounts.id"))
     type = Column(String)  # 'withdraw' or 'deposit' or 'transfer'
-    amount = Column(Float, nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    amount = Column(BigInteger, nullable=False)  # minor units (paise)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)  # date-range rebuilds and backfills
 
     account = relationship("Account", back_populates="transactions")
+
+
+# ------------------ Daily Usage ------------------
+class DailyUsage(Base):
+    """
+    Running total of money moved out of an account per UTC day and transaction
+    type, maintained by account_service in the same transaction as the transfer
+    or withdrawal so that the daily-limit check is a single primary-key lookup.
+    """
+    __tablename__ = "account_daily_usage"
+
+    account_id = Column(Integer, ForeignKey("accounts.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    type = Column(String, primary_key=True)  # 'withdraw' or 'transfer'
+    total = Column(BigInteger, nullable=False, default=0)
+    count = Column(Integer, nullable=False, default=0)
+
+
+# ------------------ Reporting Rollups ------------------
+# Maintained by app.services.reporting in the same transaction as each ledger
+# write. Rows are spread over `bucket` (account_id % ROLLUP_BUCKETS) so that
+# concurrent transactions do not all queue on one hot row; readers sum buckets.
+class DailyTypeTotal(Base):
+    __tablename__ = "rollup_daily_type_totals"
+
+    day = Column(Date, primary_key=True)
+    account_type = Column(String, primary_key=True)
+    tx_type = Column(String, primary_key=True)
+    bucket = Column(Integer, primary_key=True)
+    total = Column(BigInteger, nullable=False, default=0)
+    count = Column(Integer, nullable=False, default=0)
+
+
+class DailyAccountFlow(Base):
+    __tablename__ = "rollup_daily_account_flows"
+
+    account_id = Column(Integer, ForeignKey("accounts.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    inflow = Column(BigInteger, nullable=False, default=0)
+    outflow = Column(BigInteger, nullable=False, default=0)
+    count = Column(Integer, nullable=False, default=0)
+
+
+# ------------------ Idempotency Keys ------------------
+class IdempotencyKey(Base):
+    """
+    Outcome of a money-moving request sent with an Idempotency-Key header, so a
+    retry gets the stored response instead of running the write path again.
+    """
+    __tablename__ = "idempotency_keys"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    key = Column(String(255), primary_key=True)
+    route = Column(String, nullable=False)
+    request_hash = Column(String(64), nullable=False)
+    status = Column(String, nullable=False, default="pending")  # 'pending' or 'completed'
+    # Set by the request currently holding the key; completing requires it
+    claim_token = Column(String(32))
+    status_code = Column(Integer)
+    response_body = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+
+# Registers the before_flush hook that numbers new accounts
+from app.db import account_numbers  # noqa: E402,F401
@@ -0,0 +1,96 @@
+# app/db/pool_metrics.py
+import threading
+import time
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from app.core.metrics import Histogram
+
+# Checkout waits are mostly sub-millisecond; the tail is what matters for sizing
+WAIT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0)
+
+
+class PoolMetrics:
+    """
+    Counters for one engine's pool, fed by SQLAlchemy pool events, plus a
+    histogram of how long callers waited for a connection.
+    """
+
+    def __init__(self):
+        self.checkouts = 0
+        self.checkins = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.soft_invalidations = 0
+        self.timeouts = 0
+        self.wait = Histogram(WAIT_BUCKETS)
+        self._lock = threading.Lock()
+        self._pool = None
+
+    def _incr(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def attach(self, engine):
+        """Listen on a sync Engine (for an AsyncEngine pass .sync_engine)."""
+        self._pool = engine.pool
+        event.listen(engine, "checkout", lambda *_: self._incr("checkouts"))
+        event.listen(engine, "checkin", lambda *_: self._incr("checkins"))
+        event.listen(engine, "connect", lambda *_: self._incr("connects"))
+        event.listen(engine, "invalidate", lambda *_: self._incr("invalidations"))
+        event.listen(engine, "soft_invalidate", lambda *_: self._incr("soft_invalidations"))
+        if isinstance(engine.pool, _TimedConnect):
+            engine.pool.metrics = self
+        # dispose() swaps in a fresh pool; keep reporting on the live one
+        event.listen(engine, "engine_disposed", lambda e: setattr(self, "_pool", e.pool))
+        return self
+
+    def snapshot(self) -> dict:
+        pool = self._pool
+        data = {
+            "pool": type(pool).__name__ if pool else None,
+            "checkouts": self.checkouts,
+            "checkins": self.checkins,
+            "connects": self.connects,
+            "invalidations": self.invalidations,
+            "soft_invalidations": self.soft_invalidations,
+            "timeouts": self.timeouts,
+            "wait_seconds": self.wait.snapshot(),
+        }
+        if isinstance(pool, QueuePool):
+            data.update({
+                "size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "in_use": pool.checkedout(),
+                "overflow": max(pool.overflow(), 0),
+            })
+        return data
+
+
+class _TimedConnect:
+    """Mixin timing how long pool.connect() blocks waiting for a connection."""
+    metrics = None
+
+    def connect(self):
+        if self.metrics is None:
+            return super().connect()
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            self.metrics._incr("timeouts")
+            raise
+        finally:
+            self.metrics.wait.observe(time.perf_counter() - started)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class TimedQueuePool(_TimedConnect, QueuePool):
+    pass
+
+
+class TimedAsyncAdaptedQueuePool(_TimedConnect, AsyncAdaptedQueuePool):
+    pass
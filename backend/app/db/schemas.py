@@ -1,6 +1,14 @@
-from pydantic import BaseModel, EmailStr, constr, Field
-from typing import Optional
+from datetime import date, datetime
+from pydantic import BaseModel, EmailStr, constr, Field, BeforeValidator, PlainSerializer, WithJsonSchema
+from typing import Annotated, Literal, Optional
 from enum import Enum
+from app.core.money import to_major, to_minor
+
+# Money crosses the API in major units (rupees) but is held as integer minor
+# units (paise) everywhere inside: MoneyIn converts request values, MoneyOut
+# serializes stored values back.
+MoneyIn = Annotated[int, BeforeValidator(to_minor), WithJsonSchema({"type": "number"})]
+MoneyOut = Annotated[int, PlainSerializer(to_major, return_type=float)]
 
 class UserCreate(BaseModel):
     name: str
@@ -16,10 +24,30 @@ class UserOut(BaseModel):
     class Config:
         orm_mode = True
 
+class AccountSummary(BaseModel):
+    count: int
+    total_balance: MoneyOut
+
+class AdminUserOut(BaseModel):
+    id: int
+    name: str
+    email: EmailStr
+    is_admin: bool
+    accounts: Optional[AccountSummary] = None
+
+class AdminUserPage(BaseModel):
+    items: list[AdminUserOut]
+    next_cursor: Optional[int] = None
+    total: Optional[int] = None
+
 class UserLogin(BaseModel):
     email: EmailStr
     password: str
 
+class PasswordChange(BaseModel):
+    current_password: str
+    new_password: constr(min_length=6, max_length=72)
+
 
 class AccountType(str, Enum):
     savings = "savings"
@@ -28,12 +56,12 @@ class AccountType(str, Enum):
 
 class AccountCreate(BaseModel):
     account_type: AccountType
-    initial_deposit: Optional[float] = 0.0
+    initial_deposit: Optional[MoneyIn] = 0
 
 class AccountOut(BaseModel):
     id: int
     account_number: str
-    balance: float
+    balance: MoneyOut
     account_type: AccountType
     user_id: int
 
@@ -41,16 +69,98 @@ class AccountOut(BaseModel):
         orm_mode = True
 
 
+class BalanceSlotsUpdate(BaseModel):
+    slots: int = Field(..., ge=0, le=256, description="Sub-balance slots for incoming credits; 0 turns hot-account mode off")
+
+class BalanceSlotsOut(BaseModel):
+    id: int
+    balance_slots: int
+
+
 class WithdrawRequest(BaseModel):
     account_id: int
-    amount: float = Field(..., gt=0, description="Amount to withdraw")
+    amount: MoneyIn = Field(..., gt=0, description="Amount to withdraw")
 
 
 class MoneyRequest(BaseModel):
     account_id: int
-    amount: float
+    amount: MoneyIn
 
 class TransferRequest(BaseModel):
     from_account_id: int
     to_account_number: str
-    amount: float
\ No newline at end of file
+    amount: MoneyIn
+
+
+class BatchTransferItem(BaseModel):
+    to_account_number: str
+    amount: MoneyIn
+
+class BatchTransferMode(str, Enum):
+    all_or_nothing = "all_or_nothing"
+    best_effort = "best_effort"
+
+class BatchTransferRequest(BaseModel):
+    from_account_id: int
+    mode: BatchTransferMode = BatchTransferMode.all_or_nothing
+    transfers: list[BatchTransferItem] = Field(..., min_length=1, max_length=1000)
+
+class BatchTransferItemResult(BaseModel):
+    index: int
+    to_account_number: str
+    amount: MoneyOut
+    status: Literal["accepted", "rejected", "not_applied"]
+    error: Optional[str] = None
+
+class BatchTransferOut(BaseModel):
+    applied: bool
+    mode: BatchTransferMode
+    from_account: Optional[AccountOut] = None
+    total_amount: MoneyOut
+    results: list[BatchTransferItemResult]
+
+
+class TransactionType(str, Enum):
+    deposit = "deposit"
+    withdraw = "withdraw"
+    transfer = "transfer"
+
+class TransactionOut(BaseModel):
+    id: int
+    account_id: int
+    type: TransactionType
+    amount: MoneyOut
+    created_at: datetime
+
+    class Config:
+        orm_mode = True
+
+class TransactionPage(BaseModel):
+    items: list[TransactionOut]
+    next_cursor: Optional[str] = None
+
+
+class DailyTotalRow(BaseModel):
+    day: date
+    account_type: str
+    tx_type: str
+    total: MoneyOut
+    count: int
+
+class DailyReport(BaseModel):
+    start: date
+    end: date
+    rows: list[DailyTotalRow]
+
+class AccountFlowDay(BaseModel):
+    day: date
+    inflow: MoneyOut
+    outflow: MoneyOut
+    net: MoneyOut
+    count: int
+
+class AccountFlowReport(BaseModel):
+    account_id: int
+    start: date
+    end: date
+    days: list[AccountFlowDay]
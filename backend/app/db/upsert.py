@@ -0,0 +1,16 @@
+# app/db/upsert.py
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+
+def insert_for(db: Session):
+    """
+    Return the dialect's INSERT construct (the one with on_conflict_do_update)
+    for the database the session is bound to.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert
+    if dialect == "sqlite":
+        return sqlite.insert
+    raise NotImplementedError(f"Upsert is not supported on {dialect}")
@@ -0,0 +1,25 @@
+# app/jobs/backfill_daily_usage.py
+# Rebuild the daily-usage counters from the transactions ledger.
+#   python -m app.jobs.backfill_daily_usage            # today
+#   python -m app.jobs.backfill_daily_usage 2025-10-01 # a given UTC day
+import argparse
+from datetime import date, datetime
+from app.db.database import SessionLocal
+from app.services.limits import rebuild_daily_usage
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild account_daily_usage for one day")
+    parser.add_argument("day", nargs="?", type=date.fromisoformat, default=datetime.utcnow().date())
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        rows = rebuild_daily_usage(db, args.day)
+    finally:
+        db.close()
+    print(f"Rebuilt {rows} usage counters for {args.day.isoformat()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+# app/jobs/compact_balance_slots.py
+# Fold hot-account slot credits back into account balances.
+#   python -m app.jobs.compact_balance_slots                 # once
+#   python -m app.jobs.compact_balance_slots --interval 5    # every 5 seconds until stopped
+# Each account is compacted in its own short transaction, so compaction only
+# briefly holds up withdrawals from the account and never blocks credits into it.
+import argparse
+import time
+from app.db.database import SessionLocal
+from app.services.hot_accounts import compact
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compact hot-account balance slots")
+    parser.add_argument("--interval", type=float, help="keep running, compacting every this many seconds")
+    parser.add_argument("--batch-size", type=int, default=1000, help="accounts looked up per query")
+    args = parser.parse_args()
+
+    while True:
+        db = SessionLocal()
+        try:
+            accounts, moved = compact(db, args.batch_size)
+        finally:
+            db.close()
+        print(f"Compacted {accounts} accounts ({moved} minor units moved)", flush=True)
+        if args.interval is None:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
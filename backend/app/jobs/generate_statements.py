@@ -0,0 +1,144 @@
+# app/jobs/generate_statements.py
+# Monthly statements for every account, as gzip-compressed CSV and/or JSON files.
+#   python -m app.jobs.generate_statements                          # last month, CSV
+#   python -m app.jobs.generate_statements --month 2025-10 --format csv json --workers 8
+# Files go to <out>/<month>/<shard>/<account number>.<format>.gz. Every finished
+# partition is appended to <out>/<month>/manifest.jsonl, and a re-run skips those
+# partitions, so an interrupted job resumes where it stopped.
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from sqlalchemy import create_engine
+from sqlalchemy.pool import NullPool
+from app.db import database
+from app.services.reconciliation import account_id_bounds
+from app.services.statements import FORMATS, iter_statements, write_statement
+
+
+def month_bounds(month: str):
+    """'2025-10' -> (2025-10-01, 2025-11-01), as naive UTC datetimes like created_at."""
+    start = datetime.strptime(month, "%Y-%m")
+    end = start.replace(year=start.year + 1, month=1) if start.month == 12 else start.replace(month=start.month + 1)
+    return start, end
+
+
+def previous_month() -> str:
+    first = datetime.utcnow().replace(day=1)
+    return (first.replace(year=first.year - 1, month=12) if first.month == 1 else first.replace(month=first.month - 1)).strftime("%Y-%m")
+
+
+# ---------------- Manifest ----------------
+def read_manifest(path: str) -> set:
+    """(lo, hi) of partitions already written."""
+    if not os.path.exists(path):
+        return set()
+    done = set()
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                done.add((entry["lo"], entry["hi"]))
+    return done
+
+
+def append_manifest(path: str, entry: dict):
+    with open(path, "a") as f:
+        f.write(json.dumps(entry) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+# ---------------- Partitions ----------------
+_engine = None
+
+
+def _init_worker(url: str):
+    # Each process opens its own connections; nothing is shared with the parent
+    global _engine
+    _engine = create_engine(url, poolclass=NullPool)
+
+
+def _write_partition(lo: int, hi: int, directory: str, start: datetime, end: datetime, formats, compresslevel: int):
+    started = time.perf_counter()
+    accounts = transactions = 0
+    with _engine.connect() as conn:
+        for statement in iter_statements(conn, lo, hi, start, end):
+            for fmt in formats:
+                write_statement(directory, statement, fmt, start, end, compresslevel)
+            accounts += 1
+            transactions += len(statement["transactions"])
+    return {"lo": lo, "hi": hi, "accounts": accounts, "transactions": transactions,
+            "seconds": round(time.perf_counter() - started, 3)}
+
+
+def run(month: str, out: str = "statements", url: str = None, formats=("csv",), workers: int = 1,
+        partition_size: int = 10000, compresslevel: int = 6) -> dict:
+    """Write (or finish writing) one month of statements and return the totals of this invocation."""
+    url = url or database.DATABASE_URL
+    start, end = month_bounds(month)
+    directory = os.path.join(out, month)
+    os.makedirs(directory, exist_ok=True)
+    manifest = os.path.join(directory, "manifest.jsonl")
+
+    engine = create_engine(url, poolclass=NullPool)
+    with engine.connect() as conn:
+        lo, hi = account_id_bounds(conn)
+    engine.dispose()
+    # Partitions are aligned to multiples of partition_size, so they stay the same across resumed runs
+    first = lo // partition_size * partition_size
+    done = read_manifest(manifest)
+    pending = [
+        (p, p + partition_size) for p in range(first, hi, partition_size) if (p, p + partition_size) not in done
+    ]
+
+    totals = {"accounts": 0, "transactions": 0, "partitions": 0, "skipped_partitions": len(done)}
+    started = time.perf_counter()
+
+    def record(entry):
+        append_manifest(manifest, entry)
+        totals["accounts"] += entry["accounts"]
+        totals["transactions"] += entry["transactions"]
+        totals["partitions"] += 1
+
+    args = (directory, start, end, tuple(formats), compresslevel)
+    if workers > 1:
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(url,)) as pool:
+            futures = [pool.submit(_write_partition, p_lo, p_hi, *args) for p_lo, p_hi in pending]
+            for future in futures:
+                record(future.result())
+    else:
+        _init_worker(url)
+        for p_lo, p_hi in pending:
+            record(_write_partition(p_lo, p_hi, *args))
+    totals["seconds"] = time.perf_counter() - started
+    totals["accounts_per_second"] = totals["accounts"] / max(totals["seconds"], 1e-9)
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate monthly account statements")
+    parser.add_argument("--month", default=previous_month(), help="YYYY-MM (default: last month, UTC)")
+    parser.add_argument("--out", default="statements", help="output directory")
+    parser.add_argument("--url", help="database URL (default: DATABASE_URL)")
+    parser.add_argument("--format", nargs="+", choices=FORMATS, default=["csv"])
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="processes")
+    parser.add_argument("--partition-size", type=int, default=10000, help="account ids per partition (resume unit)")
+    parser.add_argument("--compresslevel", type=int, default=6, choices=range(1, 10), metavar="1-9")
+    args = parser.parse_args()
+
+    result = run(args.month, args.out, args.url, args.format, args.workers, args.partition_size, args.compresslevel)
+    print(
+        f"Wrote {result['accounts']} statements ({', '.join(args.format)}) over {result['transactions']} transactions "
+        f"in {result['partitions']} partitions, {result['seconds']:.1f}s ({result['accounts_per_second']:.0f} accounts/s)",
+        file=sys.stderr
+    )
+    if result["skipped_partitions"]:
+        print(f"Resumed: {result['skipped_partitions']} partitions were already in the manifest", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
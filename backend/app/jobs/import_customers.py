@@ -0,0 +1,148 @@
+# app/jobs/import_customers.py
+# Bulk onboarding: create customers, their first account and its opening deposit
+# from a CSV (header: name,email,password,account_type,initial_deposit) or an
+# NDJSON file with the same keys. account_type may be empty for a user without an
+# account; initial_deposit is in major units, like the API.
+#   python -m app.jobs.import_customers customers.csv
+#   python -m app.jobs.import_customers customers.ndjson --workers 8 --errors rejected.jsonl
+# Rows that cannot be imported are written to the error report as JSON lines
+# ({"line", "email", "error"}) and the rest carry on. Every chunk commits on its
+# own, so re-running an interrupted import reports the rows that made it in as
+# already registered and creates the others. Exits with status 1 when any row was rejected.
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+from app.db import database
+from app.services.onboarding import (
+    drop_duplicates, hash_passwords, import_chunk, validate_chunk,
+)
+
+
+# ---------------- Input ----------------
+def read_rows(f, fmt: str):
+    """Yield (line number, raw row dict) pairs from an open text file."""
+    if fmt == "csv":
+        reader = csv.DictReader(f)
+        for raw in reader:
+            yield reader.line_num, raw
+        return
+    for line, text in enumerate(f, start=1):
+        if not text.strip():
+            continue
+        try:
+            raw = json.loads(text)
+        except ValueError as e:
+            raw = {"_error": f"Invalid JSON: {e}"}
+        yield line, raw if isinstance(raw, dict) else {"_error": "Expected a JSON object"}
+
+
+def chunks(rows, size: int):
+    rows = iter(rows)
+    while chunk := list(islice(rows, size)):
+        yield chunk
+
+
+def detect_format(path: str) -> str:
+    return "csv" if path.lower().endswith(".csv") else "ndjson"
+
+
+# ---------------- Import ----------------
+def _hash_async(pool, valid, workers: int):
+    """Start hashing a chunk's passwords, split into one slice per worker; returns a callable for the hashes."""
+    passwords = [user.password for _, user, _ in valid]
+    if pool is None:
+        return lambda: hash_passwords(passwords)
+    size = -(-len(passwords) // workers) or 1
+    futures = [pool.submit(hash_passwords, passwords[i:i + size]) for i in range(0, len(passwords), size)]
+    return lambda: [h for future in futures for h in future.result()]
+
+
+def run(path: str, url: str = None, fmt: str = None, workers: int = 1, chunk_size: int = 1000, report=None) -> dict:
+    """
+    Import every row of `path` and return the totals. Rejected rows are written
+    to `report` (a text stream) as JSON lines as chunks finish.
+    """
+    url = url or database.DATABASE_URL
+    fmt = fmt or detect_format(path)
+    engine = create_engine(url, poolclass=NullPool)
+    totals = {"rows": 0, "users": 0, "accounts": 0, "errors": 0}
+
+    def reject(errors):
+        totals["errors"] += len(errors)
+        for error in errors:
+            if report is not None:
+                report.write(json.dumps(error) + "\n")
+
+    def commit(db, valid, hashes):
+        by_line = {line: password_hash for (line, _, _), password_hash in zip(valid, hashes())}
+        # The duplicate check runs after the previous chunk committed, so repeats
+        # across chunks are caught here too
+        valid, duplicates = drop_duplicates(db, valid)
+        reject(duplicates)
+        users, accounts, errors = import_chunk(db, valid, [by_line[line] for line, _, _ in valid])
+        totals["users"] += users
+        totals["accounts"] += accounts
+        reject(errors)
+
+    pool = ProcessPoolExecutor(workers) if workers > 1 else None
+    started = time.perf_counter()
+    pending = None
+    try:
+        with open(path, newline="") as f, Session(engine) as db:
+            # Hash chunk N + 1 on the pool while chunk N is being inserted
+            for chunk in chunks(read_rows(f, fmt), chunk_size):
+                totals["rows"] += len(chunk)
+                malformed = [(line, raw) for line, raw in chunk if "_error" in raw]
+                reject([{"line": line, "email": None, "error": raw["_error"]} for line, raw in malformed])
+                valid, errors = validate_chunk([(line, raw) for line, raw in chunk if "_error" not in raw])
+                reject(errors)
+                hashes = _hash_async(pool, valid, workers)
+                if pending is not None:
+                    commit(db, *pending)
+                pending = (valid, hashes)
+            if pending is not None:
+                commit(db, *pending)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        engine.dispose()
+    totals["seconds"] = time.perf_counter() - started
+    totals["rows_per_second"] = totals["rows"] / max(totals["seconds"], 1e-9)
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-import customers, accounts and opening deposits")
+    parser.add_argument("path", help="CSV or NDJSON file")
+    parser.add_argument("--format", choices=("csv", "ndjson"), help="default: from the file extension")
+    parser.add_argument("--url", help="database URL (default: DATABASE_URL)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="password-hashing processes")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="rows per transaction")
+    parser.add_argument("--errors", help="write rejected rows here as JSON lines (default: stdout)")
+    args = parser.parse_args()
+
+    report = open(args.errors, "a") if args.errors else sys.stdout
+    try:
+        result = run(args.path, args.url, args.format, args.workers, args.chunk_size, report)
+    finally:
+        if args.errors:
+            report.close()
+
+    print(
+        f"Imported {result['users']} customers and {result['accounts']} accounts from {result['rows']} rows "
+        f"in {result['seconds']:.1f}s ({result['rows_per_second']:.0f} rows/s); {result['errors']} rejected",
+        file=sys.stderr
+    )
+    sys.exit(1 if result["errors"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# app/jobs/migrate.py
+# Bring the database schema up to date. Run once per deploy, before starting
+# the API workers (which no longer touch the schema themselves):
+#   python -m app.jobs.migrate                # upgrade to the latest revision
+#   python -m app.jobs.migrate 0002           # upgrade to a given revision
+#   python -m app.jobs.migrate --downgrade 0001
+#   python -m app.jobs.migrate --stamp 0001   # mark an existing database without running DDL
+#   python -m app.jobs.migrate --sql          # print the SQL instead of running it
+import argparse
+import os
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from sqlalchemy import create_engine, pool
+from app.core.config import settings
+
+ALEMBIC_INI = os.path.join(os.path.dirname(__file__), "..", "..", "alembic.ini")
+
+
+def alembic_config(database_url: str = None) -> Config:
+    config = Config(os.path.abspath(ALEMBIC_INI))
+    # Callers (tests, the app's own tooling) keep their logging setup
+    config.attributes["configure_logger"] = False
+    if database_url:
+        config.attributes["database_url"] = database_url
+    return config
+
+
+def current_revision(database_url: str = None):
+    engine = create_engine(database_url or settings.DATABASE_URL, poolclass=pool.NullPool)
+    try:
+        with engine.connect() as conn:
+            return MigrationContext.configure(conn).get_current_revision()
+    finally:
+        engine.dispose()
+
+
+def upgrade(revision: str = "head", database_url: str = None, sql: bool = False, config: Config = None):
+    command.upgrade(config or alembic_config(database_url), revision, sql=sql)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply database migrations")
+    parser.add_argument("revision", nargs="?", default="head")
+    parser.add_argument("--downgrade", metavar="REVISION", help="downgrade to REVISION")
+    parser.add_argument("--stamp", metavar="REVISION", help="record REVISION as applied without running it")
+    parser.add_argument("--sql", action="store_true", help="print the migration SQL instead of executing it")
+    args = parser.parse_args()
+
+    config = alembic_config()
+    config.attributes["configure_logger"] = True
+    if args.stamp:
+        command.stamp(config, args.stamp)
+    elif args.downgrade:
+        command.downgrade(config, args.downgrade)
+    else:
+        upgrade(args.revision, sql=args.sql, config=config)
+    if args.sql:
+        return
+    print(f"Database at revision {current_revision()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+# app/jobs/purge_idempotency_keys.py
+# Delete expired Idempotency-Key records in bounded batches.
+#   python -m app.jobs.purge_idempotency_keys
+import argparse
+from app.db.database import SessionLocal
+from app.services.idempotency import purge_expired
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Purge expired idempotency keys")
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--max-batches", type=int, default=1000)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        deleted = purge_expired(db, args.batch_size, args.max_batches)
+    finally:
+        db.close()
+    print(f"Purged {deleted} expired idempotency keys")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+# app/jobs/rebuild_rollups.py
+# Recompute the reporting rollups from the transactions ledger, one day per
+# transaction, so it can run while the API is taking writes.
+#   python -m app.jobs.rebuild_rollups                          # everything
+#   python -m app.jobs.rebuild_rollups --start 2025-10-01 --end 2025-10-31
+import argparse
+import time
+from datetime import date
+from app.db.database import SessionLocal
+from app.services.reporting import rebuild_rollups
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild reporting rollups from the ledger")
+    parser.add_argument("--start", type=date.fromisoformat)
+    parser.add_argument("--end", type=date.fromisoformat)
+    parser.add_argument("--batch-size", type=int, default=10000)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        processed = rebuild_rollups(db, args.start, args.end, args.batch_size)
+    finally:
+        db.close()
+    elapsed = time.perf_counter() - started
+    print(f"Rebuilt rollups from {processed} transactions in {elapsed:.1f}s ({processed / max(elapsed, 1e-9):.0f} tx/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+# app/jobs/reconcile_ledger.py
+# Check every account balance against its transactions ledger.
+#   python -m app.jobs.reconcile_ledger --full                # every account
+#   python -m app.jobs.reconcile_ledger                       # accounts touched since the last completed run
+#   python -m app.jobs.reconcile_ledger --workers 8           # fan partitions out to a process pool
+#   python -m app.jobs.reconcile_ledger --report drift.jsonl  # drifted accounts as JSON lines
+# Progress is checkpointed after every partition; an interrupted run resumes where
+# it stopped when started again. Exits with status 1 when any account drifted.
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine
+from sqlalchemy.pool import NullPool
+from app.db import database
+from app.services.reconciliation import account_id_bounds, reconcile_range
+
+DEFAULT_CHECKPOINT = "reconcile-checkpoint.json"
+
+
+# ---------------- Checkpoint ----------------
+def load_checkpoint(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_checkpoint(path: str, checkpoint: dict):
+    # Write-then-rename, so a crash never leaves a truncated checkpoint behind
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(checkpoint, f, indent=2)
+    os.replace(tmp, path)
+
+
+def new_run(url: str, since, partition_size: int) -> dict:
+    engine = create_engine(url, poolclass=NullPool)
+    with engine.connect() as conn:
+        lo, hi = account_id_bounds(conn)
+    engine.dispose()
+    return {
+        "started_at": datetime.utcnow().isoformat(),
+        "since": since.isoformat() if since else None,
+        "partitions": [[start, min(start + partition_size, hi)] for start in range(lo, hi, partition_size)],
+        "done": [],
+        "checked": 0,
+        "ledger_rows": 0,
+        "drifts": 0,
+    }
+
+
+# ---------------- Partitions ----------------
+_engine = None
+
+
+def _init_worker(url: str):
+    # Each process opens its own connections; nothing is shared with the parent
+    global _engine
+    _engine = create_engine(url, poolclass=NullPool)
+
+
+def _reconcile_partition(lo: int, hi: int, since, chunk_size: int):
+    with _engine.connect() as conn:
+        return lo, hi, *reconcile_range(conn, lo, hi, since, chunk_size)
+
+
+def run(url: str = None, checkpoint_path: str = DEFAULT_CHECKPOINT, full: bool = False, workers: int = 1,
+        partition_size: int = 100000, chunk_size: int = 5000, overlap_seconds: float = 300, report=None) -> dict:
+    """
+    Reconcile (or resume reconciling) and return the finished run's totals. Drifts
+    are written to `report` (a text stream) as JSON lines as partitions finish.
+    """
+    url = url or database.DATABASE_URL
+    checkpoint = load_checkpoint(checkpoint_path)
+    run_state = checkpoint.get("run")
+    if run_state is None:
+        since = None
+        if not full and checkpoint.get("last_completed"):
+            # Overlap the previous run: rows are stamped before they commit
+            since = datetime.fromisoformat(checkpoint["last_completed"]) - timedelta(seconds=overlap_seconds)
+        run_state = checkpoint["run"] = new_run(url, since, partition_size)
+        save_checkpoint(checkpoint_path, checkpoint)
+    since = datetime.fromisoformat(run_state["since"]) if run_state["since"] else None
+
+    done = {tuple(p) for p in run_state["done"]}
+    pending = [(lo, hi) for lo, hi in run_state["partitions"] if (lo, hi) not in done]
+
+    # This invocation's share, for throughput; run_state holds the run's totals
+    progress = {"checked": 0, "ledger_rows": 0}
+
+    def record(lo, hi, checked, ledger_rows, drifts):
+        progress["checked"] += checked
+        progress["ledger_rows"] += ledger_rows
+        for drift in drifts:
+            if report is not None:
+                report.write(json.dumps(drift) + "\n")
+        run_state["done"].append([lo, hi])
+        run_state["checked"] += checked
+        run_state["ledger_rows"] += ledger_rows
+        run_state["drifts"] += len(drifts)
+        save_checkpoint(checkpoint_path, checkpoint)
+
+    started = time.perf_counter()
+    if workers > 1:
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(url,)) as pool:
+            futures = [pool.submit(_reconcile_partition, lo, hi, since, chunk_size) for lo, hi in pending]
+            for future in futures:
+                record(*future.result())
+    else:
+        _init_worker(url)
+        for lo, hi in pending:
+            record(*_reconcile_partition(lo, hi, since, chunk_size))
+    elapsed = time.perf_counter() - started
+
+    del checkpoint["run"]
+    checkpoint["last_completed"] = run_state["started_at"]
+    save_checkpoint(checkpoint_path, checkpoint)
+    return {
+        **run_state, "resumed_partitions": len(done), "seconds": elapsed,
+        "accounts_per_second": progress["checked"] / max(elapsed, 1e-9),
+        "tx_per_second": progress["ledger_rows"] / max(elapsed, 1e-9),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reconcile account balances with the transactions ledger")
+    parser.add_argument("--url", help="database URL (default: DATABASE_URL)")
+    parser.add_argument("--full", action="store_true", help="check every account, not only recently touched ones")
+    parser.add_argument("--workers", type=int, default=1, help="processes; partitions are spread over them")
+    parser.add_argument("--partition-size", type=int, default=100000, help="account ids per partition (checkpoint unit)")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="account ids per statement")
+    parser.add_argument("--overlap-seconds", type=float, default=300, help="incremental runs re-check this much of the previous run")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT)
+    parser.add_argument("--report", help="write drifted accounts here as JSON lines (default: stdout)")
+    args = parser.parse_args()
+
+    report = open(args.report, "a") if args.report else sys.stdout
+    try:
+        result = run(
+            args.url, args.checkpoint, full=args.full, workers=args.workers, partition_size=args.partition_size,
+            chunk_size=args.chunk_size, overlap_seconds=args.overlap_seconds, report=report
+        )
+    finally:
+        if args.report:
+            report.close()
+
+    scope = f"since {result['since']}" if result["since"] else "full"
+    print(
+        f"Reconciled {result['checked']} accounts ({scope}) over {result['ledger_rows']} transactions "
+        f"in {result['seconds']:.1f}s ({result['accounts_per_second']:.0f} accounts/s, "
+        f"{result['tx_per_second']:.0f} tx/s); {result['drifts']} drifted",
+        file=sys.stderr
+    )
+    if result["resumed_partitions"]:
+        print(f"Resumed: {result['resumed_partitions']} partitions were already done", file=sys.stderr)
+    sys.exit(1 if result["drifts"] else 0)
+
+
+if __name__ == "__main__":
+    main()
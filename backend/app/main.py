@@ -1,13 +1,17 @@
 from fastapi import FastAPI
-from app.db import database, models
+from app.core.config import settings
 from app.api.v1.routes import auth
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.v1.routes import accounts
 from app.api.v1.routes import admin
+from app.api.v1.serialization import json_response_class
+from app.core.read_routing import ReadRoutingMiddleware
+from app.db import database
 
-models.Base.metadata.create_all(bind=database.engine)
+# The schema is managed by migrations (python -m app.jobs.migrate), so importing
+# the app opens no database connection; the pool connects on the first request.
 
-app = FastAPI(title="SmartBank API", version="1.0")
+app = FastAPI(title="SmartBank API", version="1.0", default_response_class=json_response_class())
 
 origins = [
     "http://localhost:5173",
@@ -23,10 +27,27 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Read-your-writes token for replica routing; see app.core.read_routing
+app.add_middleware(ReadRoutingMiddleware)
+
 app.include_router(auth.router)
 app.include_router(accounts.router)
 app.include_router(admin.router)
 
+if settings.METRICS_ENABLED:
+    from app.api.v1.routes import metrics
+    from app.core.request_metrics import RequestMetricsMiddleware, instrument_engine, instrument_sessions
+
+    # instrument_engine is idempotent, so a replica that is the primary is fine
+    for engine in (database.engine, database.replica_engine):
+        instrument_engine(engine)
+    for engine in (database.async_engine, database.async_replica_engine):
+        if engine is not None:
+            instrument_engine(engine.sync_engine)
+    instrument_sessions()
+    app.add_middleware(RequestMetricsMiddleware)
+    app.include_router(metrics.router)
+
 @app.get("/")
 def root():
     return {"message": "Welcome to SmartBank API"}
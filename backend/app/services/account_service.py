@@ -1,16 +1,30 @@
+import base64
+from datetime import datetime
+from sqlalchemy import select, update, insert, and_, or_, tuple_, bindparam
 from sqlalchemy.orm import Session
+from app.core.events import stage, transaction_event
 from app.db import models
-from datetime import datetime, timedelta
+from app.services.hot_accounts import BALANCE, credit_slot, lock_account
+from app.services.limits import consume_daily_limit, daily_limit_for, daily_usage
+from app.services.reporting import record_transactions
 
-DAILY_LIMIT = 100000  # Set daily limit
+# Columns returned to callers in place of a refreshed ORM Account (matches schemas.AccountOut).
+# balance includes credits still sitting in hot-account slots.
+ACCOUNT_COLUMNS = (
+    models.Account.id,
+    models.Account.account_number,
+    BALANCE.label("balance"),
+    models.Account.account_type,
+    models.Account.user_id,
+)
 
 
 def create_account(db: Session, user_id: int, account_data):
     """
     Create a new account for a user.
-    account_data should have account_type and optional initial_deposit
+    account_data should have account_type and optional initial_deposit (minor units)
     """
-    initial_balance = getattr(account_data, "initial_deposit", 0.0)
+    initial_balance = getattr(account_data, "initial_deposit", 0) or 0
 
     # Create the account
     account = models.Account(
@@ -19,8 +33,7 @@ def create_account(db: Session, user_id: int, account_data):
         balance=initial_balance
     )
     db.add(account)
-    db.commit()
-    db.refresh(account)
+    db.flush()
 
     # If initial deposit > 0, log it as a transaction
     if initial_balance > 0:
@@ -30,138 +43,427 @@ def create_account(db: Session, user_id: int, account_data):
             amount=initial_balance
         )
         db.add(transaction)
-        db.commit()
+        record_transactions(db, [(account.id, account.account_type, "deposit", initial_balance)])
+        stage(db, user_id, transaction_event(account.id, "deposit", initial_balance, initial_balance))
 
+    # Account and opening deposit commit together
+    db.commit()
     return account
 
+# All amounts below are integer minor units (see app.core.money); balances only
+# change through UPDATE ... SET balance = balance +/- :amount, never in Python.
+# The money moves take an optional before_commit(db, result), called in the
+# move's transaction right before it commits (Idempotency-Key outcomes are
+# stored there, so they commit with the money).
+# Credits to hot accounts (balance_slots > 0) go to a slot instead; see
+# app.services.hot_accounts.
+
 # ---------------- Withdraw ----------------
-def withdraw_money(db: Session, user_id: int, account_id: int, amount: float):
+def debit_account(db: Session, user_id: int, account_id: int, amount: int):
+    """
+    Take `amount` from the account and count it against the daily limit, without
+    logging or committing. On ValueError the caller rolls back (or releases its
+    savepoint) to undo the debit.
+    """
     if amount <= 0:
         raise ValueError("Withdrawal amount must be positive")
 
-    account = db.query(models.Account).filter(
-        models.Account.id == account_id,
-        models.Account.user_id == user_id
+    # The balance guard makes the debit a no-op when funds are short. Slots are
+    # left out here: they only add to the balance, so this never overdraws.
+    account = db.execute(
+        update(models.Account)
+        .where(
+            models.Account.id == account_id,
+            models.Account.user_id == user_id,
+            models.Account.balance >= amount
+        )
+        .values(balance=models.Account.balance - amount)
+        .returning(*ACCOUNT_COLUMNS)
+        .execution_options(synchronize_session=False)
     ).first()
     if not account:
-        raise ValueError("Account not found")
+        # Short on the row alone: count slot credits too, read under the row lock
+        if not lock_account(db, account_id, user_id):
+            raise ValueError("Account not found")
+        account = db.execute(
+            update(models.Account)
+            .where(models.Account.id == account_id, BALANCE >= amount)
+            .values(balance=models.Account.balance - amount)
+            .returning(*ACCOUNT_COLUMNS)
+            .execution_options(synchronize_session=False)
+        ).first()
+        if not account:
+            raise ValueError("Insufficient balance")
 
-    # Check daily withdrawal limit
-    today = datetime.utcnow()
-    start_of_day = datetime(today.year, today.month, today.day)
-    daily_withdrawals = db.query(models.Transaction).filter(
-        models.Transaction.account_id == account_id,
-        models.Transaction.type == "withdraw",
-        models.Transaction.created_at >= start_of_day
-    ).all()
-    total_today = sum(tx.amount for tx in daily_withdrawals)
-    if total_today + amount > DAILY_LIMIT:
+    # Check and count the daily withdrawal limit in one statement
+    if not consume_daily_limit(db, account.id, account.account_type, "withdraw", amount):
         raise ValueError("Daily withdrawal limit exceeded")
+    return account
 
-    if account.balance < amount:
-        raise ValueError("Insufficient balance")
 
-    account.balance -= amount
-    transaction = models.Transaction(
-        account_id=account.id,
-        type="withdraw",
-        amount=amount
-    )
-    db.add(account)
-    db.add(transaction)
+def withdraw_money(db: Session, user_id: int, account_id: int, amount: int, before_commit=None):
+    try:
+        account = debit_account(db, user_id, account_id, amount)
+    except ValueError:
+        db.rollback()
+        raise
+    log_transactions(db, [(account, "withdraw", amount)])
+    if before_commit:
+        before_commit(db, account)
     db.commit()
-    db.refresh(account)
     return account
 
 
 # ---------------- Deposit ----------------
-def deposit_money(db: Session, user_id: int, account_id: int, amount: float):
-    """
-    Deposit money into a user's account and log the transaction.
-    """
+def credit_account(db: Session, user_id: int, account_id: int, amount: int):
+    """Add `amount` to the account, without logging or committing."""
     if amount <= 0:
         raise ValueError("Deposit amount must be positive")
 
-    # Fetch the account for the user
-    account = db.query(models.Account).filter(
-        models.Account.id == account_id,
-        models.Account.user_id == user_id
+    account = db.execute(
+        update(models.Account)
+        .where(
+            models.Account.id == account_id,
+            models.Account.user_id == user_id,
+            models.Account.balance_slots == 0
+        )
+        .values(balance=models.Account.balance + amount)
+        .returning(*ACCOUNT_COLUMNS)
+        .execution_options(synchronize_session=False)
     ).first()
+    if account:
+        return account
 
-    if not account:
+    # Hot account: credit a slot, leaving the account row unlocked
+    slots = db.execute(
+        select(models.Account.balance_slots).where(models.Account.id == account_id, models.Account.user_id == user_id)
+    ).scalar()
+    if slots is None:
         raise ValueError("Account not found")
+    credit_slot(db, account_id, slots, amount)
+    return db.execute(select(*ACCOUNT_COLUMNS).where(models.Account.id == account_id)).first()
 
-    # Update balance
-    account.balance += amount
-
-    # Log transaction
-    transaction = models.Transaction(
-        account_id=account.id,
-        type="deposit",
-        amount=amount
-    )
 
-    # Commit changes
-    db.add(account)
-    db.add(transaction)
+def deposit_money(db: Session, user_id: int, account_id: int, amount: int, before_commit=None):
+    """
+    Deposit money into a user's account and log the transaction.
+    """
+    account = credit_account(db, user_id, account_id, amount)
+    log_transactions(db, [(account, "deposit", amount)])
+    if before_commit:
+        before_commit(db, account)
     db.commit()
-    db.refresh(account)
-
     return account
 
+
+def log_transactions(db: Session, entries):
+    """
+    Ledger rows and reporting rollups for (account row, type, amount) entries, in
+    one insert each, and the matching push events (sent on commit).
+    """
+    db.execute(insert(models.Transaction), [
+        {"account_id": account.id, "type": tx_type, "amount": amount} for account, tx_type, amount in entries
+    ])
+    record_transactions(db, [(account.id, account.account_type, tx_type, amount) for account, tx_type, amount in entries])
+    for account, tx_type, amount in entries:
+        stage(db, account.user_id, transaction_event(account.id, tx_type, amount, account.balance))
+
 # ---------------- Transfer ----------------
-def transfer_money(db: Session, user_id: int, from_account_id: int, to_account_number: str, amount: float):
+def transfer_money(db: Session, user_id: int, from_account_id: int, to_account_number: str, amount: int,
+                   before_commit=None):
     if amount <= 0:
         raise ValueError("Transfer amount must be positive")
 
-    from_account = db.query(models.Account).filter(
-        models.Account.id == from_account_id,
-        models.Account.user_id == user_id
-    ).first()
-    if not from_account:
+    # Lock both rows in ascending id order so that two transfers over the same
+    # pair of accounts (in either direction) always queue instead of deadlocking.
+    # A hot recipient is credited through a slot, so its row is not locked at all.
+    recipient_columns = (
+        models.Account.id, models.Account.user_id, models.Account.account_number, models.Account.account_type
+    )
+    locked = db.execute(
+        select(*recipient_columns)
+        .where(or_(
+            models.Account.id == from_account_id,
+            and_(models.Account.account_number == to_account_number, models.Account.balance_slots == 0)
+        ))
+        .order_by(models.Account.id)
+        .with_for_update()
+    ).all()
+    from_row = next((row for row in locked if row.id == from_account_id and row.user_id == user_id), None)
+    if not from_row:
         raise ValueError("Source account not found")
+    to_row = next((row for row in locked if row.account_number == to_account_number), None)
+    hot_slots = None
+    if not to_row:
+        to_row = db.execute(
+            select(*recipient_columns, models.Account.balance_slots)
+            .where(models.Account.account_number == to_account_number)
+        ).first()
+        if not to_row:
+            raise ValueError("Recipient account not found")
+        hot_slots = to_row.balance_slots
 
-    to_account = db.query(models.Account).filter(
-        models.Account.account_number == to_account_number
-    ).first()
-    if not to_account:
-        raise ValueError("Recipient account not found")
-
-    # Daily limit for transfers
-    today = datetime.utcnow()
-    start_of_day = datetime(today.year, today.month, today.day)
-    daily_transfers = db.query(models.Transaction).filter(
-        models.Transaction.account_id == from_account_id,
-        models.Transaction.type == "transfer",
-        models.Transaction.created_at >= start_of_day
-    ).all()
-    total_today = sum(tx.amount for tx in daily_transfers)
-    if total_today + amount > DAILY_LIMIT:
+    # Daily limit for transfers; from here on every failure rolls back the
+    # consumed quota explicitly, as withdraw_money does.
+    if not consume_daily_limit(db, from_row.id, from_row.account_type, "transfer", amount):
+        db.rollback()
         raise ValueError("Daily transfer limit exceeded")
 
-    if from_account.balance < amount:
+    # Debit and credit in SQL; the balance guard makes the debit a no-op when
+    # funds are short, so no Python-side read-modify-write can be lost. The
+    # source row is already locked, so its slot total cannot be folded meanwhile.
+    from_account = db.execute(
+        update(models.Account)
+        .where(models.Account.id == from_account_id, BALANCE >= amount)
+        .values(balance=models.Account.balance - amount)
+        .returning(*ACCOUNT_COLUMNS)
+        .execution_options(synchronize_session=False)
+    ).first()
+    if not from_account:
+        db.rollback()
         raise ValueError("Insufficient balance")
 
-    # Perform transfer
-    from_account.balance -= amount
-    to_account.balance += amount
+    to_balance = None
+    if hot_slots is not None:
+        credit_slot(db, to_row.id, hot_slots, amount)
+    else:
+        to_balance = db.execute(
+            update(models.Account)
+            .where(models.Account.id == to_row.id)
+            .values(balance=models.Account.balance + amount)
+            .returning(BALANCE)
+            .execution_options(synchronize_session=False)
+        ).scalar()
 
-    # Create transactions
-    tx_out = models.Transaction(
-        account_id=from_account.id,
-        type="transfer",
-        amount=amount
-    )
-    tx_in = models.Transaction(
-        account_id=to_account.id,
-        type="deposit",
-        amount=amount
+    # Both ledger rows go out as a single multi-row INSERT
+    db.execute(insert(models.Transaction), [
+        {"account_id": from_row.id, "type": "transfer", "amount": amount},
+        {"account_id": to_row.id, "type": "deposit", "amount": amount},
+    ])
+    record_transactions(db, [
+        (from_row.id, from_row.account_type, "transfer", amount),
+        (to_row.id, to_row.account_type, "deposit", amount),
+    ])
+    stage(db, user_id, transaction_event(from_row.id, "transfer", amount, from_account.balance))
+    stage(db, to_row.user_id, transaction_event(to_row.id, "deposit", amount, to_balance))
+    if before_commit:
+        before_commit(db, from_account)
+    db.commit()
+    return from_account
+
+# ---------------- Batch Transfer ----------------
+accounts_table = models.Account.__table__
+
+# Executemany credit: one statement, one parameter set per recipient
+CREDIT_ACCOUNT = (
+    update(accounts_table)
+    .where(accounts_table.c.id == bindparam("recipient_id"))
+    .values(balance=accounts_table.c.balance + bindparam("credit"))
+)
+
+
+def transfer_batch(db: Session, user_id: int, from_account_id: int, items, all_or_nothing: bool = True,
+                   before_commit=None):
+    """
+    Pay many recipients from one account in a single transaction: recipients are
+    resolved and locked with one query, balance and daily limit are checked once
+    for the batch total, and credits, debits and ledger rows are written with bulk
+    statements before a single commit.
+
+    items: sequence of objects with to_account_number and amount.
+    In all-or-nothing mode any failing item rejects the whole batch. In
+    best-effort mode items are checked in order against what is left of the
+    funds and daily limit; an item that does not fit is rejected and later
+    items that still fit are applied, so a smaller payment can follow a
+    rejected larger one. Hot recipients are credited through a balance slot
+    and their rows are not locked, as in transfer_money.
+    Returns {"applied", "from_account", "total_amount", "results"}.
+    """
+    numbers = {item.to_account_number for item in items}
+    recipient_columns = (
+        models.Account.id, models.Account.user_id, models.Account.account_number, models.Account.account_type
     )
+    locked = db.execute(
+        select(*recipient_columns, BALANCE.label("balance"))
+        .where(or_(
+            models.Account.id == from_account_id,
+            and_(models.Account.account_number.in_(numbers), models.Account.balance_slots == 0)
+        ))
+        .order_by(models.Account.id)
+        .with_for_update()
+    ).all()
+    from_row = next((row for row in locked if row.id == from_account_id and row.user_id == user_id), None)
+    if not from_row:
+        raise ValueError("Source account not found")
+    recipients = {row.account_number: row for row in locked}
+    hot_numbers = numbers - recipients.keys()
+    hot_slots = {}
+    if hot_numbers:
+        for row in db.execute(
+            select(*recipient_columns, models.Account.balance_slots)
+            .where(models.Account.account_number.in_(hot_numbers))
+        ):
+            recipients[row.account_number] = row
+            hot_slots[row.id] = row.balance_slots
 
-    db.add_all([from_account, to_account, tx_out, tx_in])
+    # Funds and limit available to this batch
+    available = from_row.balance
+    remaining_limit = daily_limit_for(from_row.account_type) - daily_usage(db, from_row.id, "transfer")
+
+    results, accepted, total = [], [], 0
+    for index, item in enumerate(items):
+        error = None
+        if item.amount <= 0:
+            error = "Transfer amount must be positive"
+        elif item.to_account_number not in recipients:
+            error = "Recipient account not found"
+        elif total + item.amount > available:
+            error = "Insufficient balance"
+        elif total + item.amount > remaining_limit:
+            error = "Daily transfer limit exceeded"
+        results.append({
+            "index": index, "to_account_number": item.to_account_number, "amount": item.amount,
+            "status": "rejected" if error else "accepted", "error": error
+        })
+        if not error:
+            accepted.append((recipients[item.to_account_number], item.amount))
+            total += item.amount
+
+    rejected = len(items) - len(accepted)
+    if not accepted or (all_or_nothing and rejected):
+        db.rollback()
+        for result in results:
+            if result["status"] == "accepted":
+                result["status"] = "not_applied"
+        return {"applied": False, "from_account": None, "total_amount": 0, "results": results}
+
+    if not consume_daily_limit(db, from_row.id, from_row.account_type, "transfer", total):
+        raise ValueError("Daily transfer limit exceeded")
+    from_account = db.execute(
+        update(models.Account)
+        .where(models.Account.id == from_row.id, BALANCE >= total)
+        .values(balance=models.Account.balance - total)
+        .returning(*ACCOUNT_COLUMNS)
+        .execution_options(synchronize_session=False)
+    ).first()
+    if not from_account:
+        raise ValueError("Insufficient balance")
+
+    credits = {}
+    for recipient, amount in accepted:
+        credits[recipient.id] = credits.get(recipient.id, 0) + amount
+    for recipient_id in sorted(credits.keys() & hot_slots.keys()):
+        credit_slot(db, recipient_id, hot_slots[recipient_id], credits.pop(recipient_id))
+    if credits:
+        db.execute(CREDIT_ACCOUNT, [
+            {"recipient_id": recipient_id, "credit": amount} for recipient_id, amount in sorted(credits.items())
+        ])
+
+    db.execute(insert(models.Transaction), [
+        row
+        for recipient, amount in accepted
+        for row in (
+            {"account_id": from_row.id, "type": "transfer", "amount": amount},
+            {"account_id": recipient.id, "type": "deposit", "amount": amount},
+        )
+    ])
+    record_transactions(db, [
+        entry
+        for recipient, amount in accepted
+        for entry in (
+            (from_row.id, from_row.account_type, "transfer", amount),
+            (recipient.id, recipient.account_type, "deposit", amount),
+        )
+    ])
+    # Only the source's final balance is known; recipients just get the entry
+    for n, (recipient, amount) in enumerate(accepted, start=1):
+        balance = from_account.balance if n == len(accepted) else None
+        stage(db, user_id, transaction_event(from_row.id, "transfer", amount, balance))
+        stage(db, recipient.user_id, transaction_event(recipient.id, "deposit", amount))
+    result = {"applied": True, "from_account": from_account, "total_amount": total, "results": results}
+    if before_commit:
+        before_commit(db, result)
     db.commit()
-    db.refresh(from_account)
-    return from_account
-    
+    return result
+
+
 def get_accounts_by_user(db: Session, user_id: int):
-    return db.query(models.Account).filter(models.Account.user_id == user_id).all()
\ No newline at end of file
+    return db.execute(
+        select(*ACCOUNT_COLUMNS).where(models.Account.user_id == user_id).order_by(models.Account.id)
+    ).all()
+
+def get_user_account(db: Session, user_id: int, account_id: int):
+    return db.execute(
+        select(*ACCOUNT_COLUMNS).where(
+            models.Account.id == account_id,
+            models.Account.user_id == user_id
+        )
+    ).first()
+
+# ---------------- Transaction History ----------------
+TRANSACTION_COLUMNS = (
+    models.Transaction.id,
+    models.Transaction.account_id,
+    models.Transaction.type,
+    models.Transaction.amount,
+    models.Transaction.created_at,
+)
+
+
+def encode_cursor(row) -> str:
+    raw = f"{row.created_at.isoformat()}|{row.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str):
+    try:
+        created_at, tx_id = base64.urlsafe_b64decode(cursor.encode()).decode().rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(tx_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def transactions_query(account_id: int, tx_type: str = None, start: datetime = None, end: datetime = None, newest_first: bool = True):
+    """
+    Filtered transactions of one account ordered on (created_at, id), which the
+    (account_id, created_at, id) index serves without a sort.
+    """
+    query = select(*TRANSACTION_COLUMNS).where(models.Transaction.account_id == account_id)
+    if tx_type:
+        query = query.where(models.Transaction.type == tx_type)
+    if start:
+        query = query.where(models.Transaction.created_at >= start)
+    if end:
+        query = query.where(models.Transaction.created_at < end)
+    if newest_first:
+        return query.order_by(models.Transaction.created_at.desc(), models.Transaction.id.desc())
+    return query.order_by(models.Transaction.created_at, models.Transaction.id)
+
+
+def get_transactions_page(db: Session, account_id: int, limit: int = 50, cursor: str = None,
+                          tx_type: str = None, start: datetime = None, end: datetime = None):
+    """
+    One page of history, newest first, using keyset pagination: the cursor is the
+    (created_at, id) of the last row returned, so every page costs the same no
+    matter how deep the client has paged.
+    """
+    query = transactions_query(account_id, tx_type, start, end)
+    if cursor:
+        query = query.where(
+            tuple_(models.Transaction.created_at, models.Transaction.id) < tuple_(*decode_cursor(cursor))
+        )
+    rows = db.execute(query.limit(limit + 1)).all()
+    next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return {"items": rows[:limit], "next_cursor": next_cursor}
+
+
+def iter_transaction_chunks(db: Session, account_id: int, chunk_size: int = 1000, **filters):
+    """
+    Yield the account's history, oldest first, in lists of up to chunk_size rows.
+    yield_per streams from a server-side cursor, so memory stays flat however long
+    the history is.
+    """
+    query = transactions_query(account_id, newest_first=False, **filters)
+    result = db.execute(query.execution_options(yield_per=chunk_size))
+    for chunk in result.partitions():
+        yield chunk
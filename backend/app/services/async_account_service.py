@@ -0,0 +1,82 @@
+# app/services/async_account_service.py
+# Async counterparts of account_service for async route handlers. The logic
+# lives once, in account_service; database.run_sync runs it on an AsyncSession
+# (greenlet, no thread) or, in sync mode, on the threadpool.
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.db import database
+from app.db.database import run_sync
+from app.services import account_service, group_commit, hot_accounts
+
+
+async def create_account(db, user_id: int, account_data):
+    return await run_sync(db, account_service.create_account, user_id, account_data)
+
+
+async def withdraw_money(db, user_id: int, account_id: int, amount: int, before_commit=None):
+    if settings.GROUP_COMMIT_ENABLED:
+        return await group_commit.submit(db, "withdraw", user_id, account_id, amount, before_commit)
+    return await run_sync(db, account_service.withdraw_money, user_id, account_id, amount, before_commit)
+
+
+async def deposit_money(db, user_id: int, account_id: int, amount: int, before_commit=None):
+    if settings.GROUP_COMMIT_ENABLED:
+        return await group_commit.submit(db, "deposit", user_id, account_id, amount, before_commit)
+    return await run_sync(db, account_service.deposit_money, user_id, account_id, amount, before_commit)
+
+
+async def transfer_money(db, user_id: int, from_account_id: int, to_account_number: str, amount: int,
+                         before_commit=None):
+    return await run_sync(
+        db, account_service.transfer_money, user_id, from_account_id, to_account_number, amount, before_commit
+    )
+
+
+async def transfer_batch(db, user_id: int, from_account_id: int, items, all_or_nothing: bool = True,
+                         before_commit=None):
+    return await run_sync(
+        db, account_service.transfer_batch, user_id, from_account_id, items, all_or_nothing, before_commit
+    )
+
+
+async def set_balance_slots(db, account_id: int, slots: int):
+    return await run_sync(db, hot_accounts.set_balance_slots, account_id, slots)
+
+
+async def get_accounts_by_user(db, user_id: int):
+    return await run_sync(db, account_service.get_accounts_by_user, user_id)
+
+
+async def get_user_account(db, user_id: int, account_id: int):
+    return await run_sync(db, account_service.get_user_account, user_id, account_id)
+
+
+async def get_transactions_page(db, account_id: int, **kwargs):
+    return await run_sync(db, account_service.get_transactions_page, account_id, **kwargs)
+
+
+async def stream_transaction_chunks(account_id: int, chunk_size: int = 1000, from_replica: bool = False, **filters):
+    """
+    Async generator over account_service.iter_transaction_chunks for streaming
+    responses. It owns its session because a StreamingResponse body runs after
+    the request's dependencies have been cleaned up.
+    """
+    if database.AsyncSessionLocal is not None:
+        session_factory = database.AsyncReplicaSessionLocal if from_replica else database.AsyncSessionLocal
+        async with session_factory() as db:
+            query = account_service.transactions_query(account_id, newest_first=False, **filters)
+            result = await db.stream(query.execution_options(yield_per=chunk_size))
+            async for chunk in result.partitions():
+                yield chunk
+        return
+
+    db = (database.ReplicaSessionLocal if from_replica else database.SessionLocal)()
+    try:
+        chunks = account_service.iter_transaction_chunks(db, account_id, chunk_size, **filters)
+        while True:
+            chunk = await run_in_threadpool(next, chunks, None)
+            if chunk is None:
+                break
+            yield chunk
+    finally:
+        db.close()
@@ -0,0 +1,12 @@
+# app/services/async_reporting.py
+# Async counterparts of reporting for async route handlers (see async_account_service).
+from app.db.database import run_sync
+from app.services import reporting
+
+
+async def daily_totals(db, start, end, account_type: str = None):
+    return await run_sync(db, reporting.daily_totals, start, end, account_type)
+
+
+async def account_flows(db, account_id: int, start, end):
+    return await run_sync(db, reporting.account_flows, account_id, start, end)
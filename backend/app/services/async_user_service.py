@@ -0,0 +1,54 @@
+# app/services/async_user_service.py
+# Async counterparts of user_service for async route handlers. Database work is
+# delegated to the sync functions through database.run_sync; bcrypt is awaited
+# on the password-hash executor outside of it, so it never blocks the loop.
+from app.core.security import hash_password_async, verify_and_update_password_async
+from app.db.database import run_sync
+from app.services import user_service
+
+
+async def create_user(db, user):
+    hashed_password = await hash_password_async(user.password)
+    return await run_sync(db, user_service.create_user, user, hashed_password)
+
+
+async def authenticate_user(db, email: str, password: str):
+    user = await run_sync(db, user_service.get_user_by_email, email)
+    if not user:
+        return None
+    valid, new_hash = await verify_and_update_password_async(password, user.hashed_password)
+    if not valid:
+        return None
+    if new_hash:
+        await run_sync(db, user_service.store_password_hash, user, new_hash)
+    return user
+
+
+async def verify_password(password: str, hashed_password: str) -> bool:
+    valid, _ = await verify_and_update_password_async(password, hashed_password)
+    return valid
+
+
+async def change_password(db, user, new_password: str):
+    hashed_password = await hash_password_async(new_password)
+    return await run_sync(db, user_service.change_password, user, new_password, hashed_password)
+
+
+async def set_admin(db, user_id: int, is_admin: bool):
+    return await run_sync(db, user_service.set_admin, user_id, is_admin)
+
+
+async def list_users(db, **filters):
+    return await run_sync(db, user_service.list_users, **filters)
+
+
+async def search_users(db, query: str, limit: int = 20):
+    return await run_sync(db, user_service.search_users, query, limit)
+
+
+async def get_user_by_id(db, user_id: int):
+    return await run_sync(db, user_service.get_user_by_id, user_id)
+
+
+async def get_user_by_email(db, email: str):
+    return await run_sync(db, user_service.get_user_by_email, email)
@@ -0,0 +1,150 @@
+# app/services/group_commit.py
+"""
+Group commit for deposits and withdrawals, enabled with GROUP_COMMIT_ENABLED.
+
+Each money move normally pays for its own commit (and fsync), so under heavy
+deposit traffic throughput is capped by commits per second. Here requests are
+queued to a LedgerWriter thread instead. The writer takes up to max_batch
+queued moves, waiting at most max_wait for the batch to fill. It applies each
+move in a savepoint, so a move that fails (insufficient balance, daily limit)
+is undone on its own. A move's before_commit callback (see account_service)
+runs in that savepoint too, so what it writes commits with the move. The ledger
+rows and rollups for the batch are written in one insert each, and the whole
+batch commits once. Every request is answered only after that commit. If the
+commit itself fails, the batch is replayed one move per transaction, so one bad
+move cannot fail its neighbours. A move whose request was cancelled while it
+was still queued is dropped, not applied.
+"""
+import asyncio
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.request_metrics import span
+from app.db.database import engine_options, sync_database_url
+from app.services import account_service
+
+logger = logging.getLogger(__name__)
+
+MOVES = {
+    "deposit": account_service.credit_account,
+    "withdraw": account_service.debit_account,
+}
+
+
+class LedgerWriter:
+    def __init__(self, engine, max_batch: int, max_wait: float):
+        self.engine = engine
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.commits = 0
+        self.moves = 0
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="ledger-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, tx_type: str, user_id: int, account_id: int, amount: int, before_commit=None) -> Future:
+        future = Future()
+        self._queue.put((future, tx_type, user_id, account_id, amount, before_commit))
+        return future
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _session(self) -> Session:
+        return Session(self.engine, autoflush=False, expire_on_commit=False)
+
+    def _run(self):
+        while True:
+            try:
+                # A future cancelled while queued is dropped; once marked
+                # running, its caller can no longer cancel it
+                batch = [move for move in self._next_batch() if move[0].set_running_or_notify_cancel()]
+                if not batch:
+                    continue
+                try:
+                    outcomes = self._commit(batch)
+                except Exception:
+                    logger.exception("Group commit of %d moves failed; replaying them one by one", len(batch))
+                    outcomes = []
+                    for move in batch:
+                        try:
+                            outcomes += self._commit([move])
+                        except Exception as e:
+                            outcomes.append((move[0], None, e))
+                # Answered only after the batch is settled, and never inside
+                # the replay path: a committed batch is never applied twice
+                for future, account, error in outcomes:
+                    if error is not None:
+                        future.set_exception(error)
+                    else:
+                        future.set_result(account)
+            except Exception:
+                logger.exception("Ledger writer error; continuing with the next batch")
+
+    def _commit(self, batch) -> list:
+        """Apply and commit the batch; [(future, account, error), ...] per move. Raises if the commit fails."""
+        outcomes, entries = [], []
+        with self._session() as db:
+            try:
+                for future, tx_type, user_id, account_id, amount, before_commit in batch:
+                    try:
+                        with db.begin_nested():
+                            account = MOVES[tx_type](db, user_id, account_id, amount)
+                            if before_commit:
+                                before_commit(db, account)
+                    except Exception as e:
+                        outcomes.append((future, None, e))
+                    else:
+                        outcomes.append((future, account, None))
+                        entries.append((account, tx_type, amount))
+                if entries:
+                    account_service.log_transactions(db, entries)
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+        self.commits += 1
+        self.moves += len(batch)
+        return outcomes
+
+
+# One writer per database URL in this process
+_writers = {}
+_writers_lock = threading.Lock()
+
+
+def writer_for(db) -> LedgerWriter:
+    """The writer for the database behind a request's Session or AsyncSession."""
+    bind = db.bind if isinstance(db, AsyncSession) else db.get_bind()
+    key = bind.url.render_as_string(hide_password=False)
+    with _writers_lock:
+        writer = _writers.get(key)
+        if writer is None:
+            if isinstance(db, AsyncSession):
+                # The writer is a plain thread, so it needs the blocking driver
+                url = sync_database_url(key)
+                bind = create_engine(url, **engine_options(url))
+            writer = _writers[key] = LedgerWriter(
+                bind, settings.GROUP_COMMIT_MAX_BATCH, settings.GROUP_COMMIT_MAX_WAIT_MS / 1000
+            )
+    return writer
+
+
+async def submit(db, tx_type: str, user_id: int, account_id: int, amount: int, before_commit=None):
+    """Queue a deposit or withdrawal and wait until its batch has committed."""
+    with span("group_commit"):
+        return await asyncio.wrap_future(writer_for(db).submit(tx_type, user_id, account_id, amount, before_commit))
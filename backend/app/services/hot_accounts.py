@@ -0,0 +1,125 @@
+# app/services/hot_accounts.py
+"""
+Hot accounts: sub-balance slots for accounts that receive many concurrent credits.
+
+Every transfer into an account updates its single balance row, so thousands of
+customers paying one biller queue on that row's lock. An account with
+balance_slots = N > 0 instead takes credits into one of N AccountBalanceSlot
+rows, chosen at random. Concurrent credits then mostly lock different rows, and
+the account row itself is never locked by them.
+
+- Reads use BALANCE, which is Account.balance plus the sum of the slots.
+  Every account is read that way, so a credit that lands in a slot is never
+  invisible, even if the account has just left hot mode.
+- Debits still go through Account.balance, which may go negative while the
+  slots cover it. A debit first locks the account row and only then reads
+  the slots. Credits only ever add to slots, and the compactor takes the
+  same row lock, so the slot total a debit sees can only grow before it
+  commits. A debit therefore never overdraws.
+- compact_account folds the slots back into Account.balance. It subtracts
+  exactly what it read from each slot, so credits that land meanwhile are
+  kept.
+"""
+import random
+from sqlalchemy import BigInteger, cast, func, select, update
+from sqlalchemy.orm import Session
+from app.db import models
+from app.db.upsert import insert_for
+
+Slot = models.AccountBalanceSlot
+
+# Not yet compacted credits of the account in the enclosing query's FROM
+SLOT_TOTAL = (
+    select(cast(func.coalesce(func.sum(Slot.amount), 0), BigInteger))
+    .where(Slot.account_id == models.Account.id)
+    .correlate(models.Account)
+    .scalar_subquery()
+)
+BALANCE = models.Account.balance + SLOT_TOTAL
+
+
+def credit_slot(db: Session, account_id: int, slots: int, amount: int):
+    """Add `amount` to a random slot of the account, without committing."""
+    insert = insert_for(db)
+    stmt = insert(Slot).values(account_id=account_id, slot=random.randrange(max(slots, 1)), amount=amount)
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=[Slot.account_id, Slot.slot],
+        set_={"amount": Slot.amount + stmt.excluded.amount},
+    ))
+
+
+def lock_account(db: Session, account_id: int, user_id: int = None):
+    """
+    Lock the account row, so later statements in this transaction see every slot
+    the compactor has folded. Returns (id, balance_slots) or None.
+    """
+    query = select(models.Account.id, models.Account.balance_slots).where(models.Account.id == account_id)
+    if user_id is not None:
+        query = query.where(models.Account.user_id == user_id)
+    return db.execute(query.with_for_update()).first()
+
+
+# ---------------- Compaction ----------------
+def compact_account(db: Session, account_id: int) -> int:
+    """Fold the account's slots into its balance and commit; returns the amount moved."""
+    lock_account(db, account_id)
+    seen = db.execute(
+        select(Slot.slot, Slot.amount)
+        .where(Slot.account_id == account_id, Slot.amount != 0)
+        .with_for_update()
+    ).all()
+    total = sum(amount for _, amount in seen)
+    if total:
+        for slot, amount in seen:
+            db.execute(
+                update(Slot)
+                .where(Slot.account_id == account_id, Slot.slot == slot)
+                .values(amount=Slot.amount - amount)
+                .execution_options(synchronize_session=False)
+            )
+        db.execute(
+            update(models.Account)
+            .where(models.Account.id == account_id)
+            .values(balance=models.Account.balance + total)
+            .execution_options(synchronize_session=False)
+        )
+    db.commit()
+    return total
+
+
+def compact(db: Session, batch_size: int = 1000):
+    """
+    Compact every account with pending slot credits, one short transaction per
+    account. Returns (accounts compacted, amount moved).
+    """
+    accounts = moved = 0
+    after = 0
+    while True:
+        account_ids = db.execute(
+            select(Slot.account_id).distinct()
+            .where(Slot.amount != 0, Slot.account_id > after)
+            .order_by(Slot.account_id)
+            .limit(batch_size)
+        ).scalars().all()
+        db.commit()
+        if not account_ids:
+            return accounts, moved
+        for account_id in account_ids:
+            moved += compact_account(db, account_id)
+            accounts += 1
+        after = account_ids[-1]
+
+
+def set_balance_slots(db: Session, account_id: int, slots: int):
+    """Turn hot-account mode on (slots > 0) or off (0, after folding the slots); returns the account or None."""
+    account = db.execute(
+        update(models.Account)
+        .where(models.Account.id == account_id)
+        .values(balance_slots=slots)
+        .returning(models.Account.id, models.Account.balance_slots)
+        .execution_options(synchronize_session=False)
+    ).first()
+    db.commit()
+    if account and not slots:
+        compact_account(db, account_id)
+    return account
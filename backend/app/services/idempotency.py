@@ -0,0 +1,139 @@
+# app/services/idempotency.py
+from datetime import datetime, timedelta
+from sqlalchemy import select, delete, tuple_, update
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db import models
+from app.db.upsert import insert_for
+
+
+class ClaimLost(Exception):
+    """The request no longer holds its key: a retry took it over. Roll back."""
+
+
+def claim_key(db: Session, user_id: int, key: str, route: str, request_hash: str, token: str):
+    """
+    Try to become the one request that executes for (user_id, key). Commits a
+    'pending' row holding `token` and returns None on success; otherwise returns
+    the existing row (pending or completed). Expired rows are replaced.
+
+    A pending row older than IDEMPOTENCY_PENDING_TIMEOUT_SECONDS is taken over
+    by a retry of the same request: its token is swapped for ours. That is safe
+    however long the first request is still running, because its money move
+    only commits together with complete_key(), which requires its own token.
+    If the first request committed, the row is no longer pending, so the swap
+    does not happen.
+    """
+    now = datetime.utcnow()
+    db.execute(delete(models.IdempotencyKey).where(
+        models.IdempotencyKey.user_id == user_id,
+        models.IdempotencyKey.key == key,
+        models.IdempotencyKey.expires_at < now
+    ))
+    stmt = insert_for(db)(models.IdempotencyKey).values(
+        user_id=user_id,
+        key=key,
+        route=route,
+        request_hash=request_hash,
+        status="pending",
+        claim_token=token,
+        created_at=now,
+        expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_TTL_SECONDS)
+    ).on_conflict_do_nothing(index_elements=["user_id", "key"]).returning(models.IdempotencyKey.key)
+    claimed = db.execute(stmt).first() is not None
+    if not claimed:
+        stale = now - timedelta(seconds=settings.IDEMPOTENCY_PENDING_TIMEOUT_SECONDS)
+        claimed = db.execute(
+            update(models.IdempotencyKey)
+            .where(
+                models.IdempotencyKey.user_id == user_id,
+                models.IdempotencyKey.key == key,
+                models.IdempotencyKey.route == route,
+                models.IdempotencyKey.request_hash == request_hash,
+                models.IdempotencyKey.status == "pending",
+                models.IdempotencyKey.created_at < stale
+            )
+            .values(claim_token=token, created_at=now)
+            .returning(models.IdempotencyKey.key)
+        ).first() is not None
+    existing = None if claimed else get_key(db, user_id, key)
+    db.commit()
+    return existing
+
+
+def get_key(db: Session, user_id: int, key: str):
+    return db.execute(
+        select(
+            models.IdempotencyKey.route,
+            models.IdempotencyKey.request_hash,
+            models.IdempotencyKey.status,
+            models.IdempotencyKey.status_code,
+            models.IdempotencyKey.response_body,
+        ).where(models.IdempotencyKey.user_id == user_id, models.IdempotencyKey.key == key)
+    ).first()
+
+
+def complete_key(db: Session, user_id: int, key: str, token: str, status_code: int, response_body: str):
+    """
+    Store the outcome in the caller's transaction, without committing. For a
+    money move that is the move's own transaction, so the money and the stored
+    response commit together or not at all. Raises ClaimLost if the key has been
+    taken over.
+    """
+    completed = db.execute(
+        update(models.IdempotencyKey)
+        .where(
+            models.IdempotencyKey.user_id == user_id,
+            models.IdempotencyKey.key == key,
+            models.IdempotencyKey.claim_token == token,
+            models.IdempotencyKey.status == "pending"
+        )
+        .values(status="completed", status_code=status_code, response_body=response_body)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not completed:
+        raise ClaimLost(key)
+
+
+def store_outcome(db: Session, user_id: int, key: str, token: str, status_code: int, response_body: str):
+    """complete_key() in a transaction of its own, for outcomes that moved no money."""
+    try:
+        complete_key(db, user_id, key, token, status_code, response_body)
+    except ClaimLost:
+        db.rollback()
+        raise
+    db.commit()
+
+
+def release_key(db: Session, user_id: int, key: str, token: str):
+    """Forget a pending key whose request failed unexpectedly, so it can be retried."""
+    db.execute(delete(models.IdempotencyKey).where(
+        models.IdempotencyKey.user_id == user_id,
+        models.IdempotencyKey.key == key,
+        models.IdempotencyKey.claim_token == token,
+        models.IdempotencyKey.status == "pending"
+    ))
+    db.commit()
+
+
+def purge_expired(db: Session, batch_size: int = None, max_batches: int = 1) -> int:
+    """
+    Delete expired keys, at most batch_size rows per statement so that cleanup
+    never holds long locks on the table. Returns the number of rows deleted.
+    """
+    batch_size = batch_size or settings.IDEMPOTENCY_PURGE_BATCH
+    deleted = 0
+    for _ in range(max_batches):
+        expired = (
+            select(models.IdempotencyKey.user_id, models.IdempotencyKey.key)
+            .where(models.IdempotencyKey.expires_at < datetime.utcnow())
+            .limit(batch_size)
+        )
+        result = db.execute(delete(models.IdempotencyKey).where(
+            tuple_(models.IdempotencyKey.user_id, models.IdempotencyKey.key).in_(expired)
+        ))
+        db.commit()
+        deleted += result.rowcount
+        if result.rowcount < batch_size:
+            break
+    return deleted
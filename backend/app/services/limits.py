@@ -0,0 +1,94 @@
+# app/services/limits.py
+from datetime import date, datetime, timedelta
+from sqlalchemy import select, delete, func, cast, BigInteger
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.money import to_minor
+from app.core.request_metrics import span
+from app.db import models
+from app.db.upsert import insert_for
+
+
+def daily_limit_for(account_type: str) -> int:
+    """The account type's daily limit in minor units (settings are in rupees)."""
+    return to_minor(settings.DAILY_LIMITS.get(account_type, settings.DAILY_LIMIT))
+
+
+def daily_usage(db: Session, account_id: int, tx_type: str) -> int:
+    """Amount already counted against today's limit (one primary-key lookup)."""
+    return db.execute(
+        select(models.DailyUsage.total).where(
+            models.DailyUsage.account_id == account_id,
+            models.DailyUsage.day == datetime.utcnow().date(),
+            models.DailyUsage.type == tx_type
+        )
+    ).scalar() or 0
+
+
+def consume_daily_limit(db: Session, account_id: int, account_type: str, tx_type: str, amount: int) -> bool:
+    """
+    Add `amount` to today's usage counter for (account, tx_type), but only if the
+    new total stays within the account type's limit. Runs as one guarded upsert
+    inside the caller's transaction; returns False (and changes nothing) when the
+    limit would be exceeded.
+    """
+    limit = daily_limit_for(account_type)
+    if amount > limit:
+        return False
+
+    insert = insert_for(db)
+    stmt = insert(models.DailyUsage).values(
+        account_id=account_id,
+        day=datetime.utcnow().date(),
+        type=tx_type,
+        total=amount,
+        count=1
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[models.DailyUsage.account_id, models.DailyUsage.day, models.DailyUsage.type],
+        set_={
+            "total": models.DailyUsage.total + stmt.excluded.total,
+            "count": models.DailyUsage.count + 1,
+        },
+        where=models.DailyUsage.total + stmt.excluded.total <= limit
+    ).returning(models.DailyUsage.total)
+    with span("limit"):
+        return db.execute(stmt).first() is not None
+
+
+def rebuild_daily_usage(db: Session, day: date, account_ids=None):
+    """
+    Recompute the usage counters for one day from the transactions ledger.
+    Used to backfill after deploying the counters or to repair them; when
+    account_ids is given the scan is served by the (account_id, type, created_at) index.
+    """
+    start = datetime(day.year, day.month, day.day)
+    end = start + timedelta(days=1)
+    query = (
+        select(
+            models.Transaction.account_id,
+            models.Transaction.type,
+            cast(func.sum(models.Transaction.amount), BigInteger),
+            func.count()
+        )
+        .where(
+            models.Transaction.type.in_(("withdraw", "transfer")),
+            models.Transaction.created_at >= start,
+            models.Transaction.created_at < end
+        )
+        .group_by(models.Transaction.account_id, models.Transaction.type)
+    )
+    stale = delete(models.DailyUsage).where(models.DailyUsage.day == day)
+    if account_ids is not None:
+        query = query.where(models.Transaction.account_id.in_(account_ids))
+        stale = stale.where(models.DailyUsage.account_id.in_(account_ids))
+    totals = db.execute(query).all()
+
+    db.execute(stale)
+    if totals:
+        db.execute(insert_for(db)(models.DailyUsage), [
+            {"account_id": account_id, "day": day, "type": tx_type, "total": total, "count": count}
+            for account_id, tx_type, total, count in totals
+        ])
+    db.commit()
+    return len(totals)
@@ -0,0 +1,162 @@
+# app/services/onboarding.py
+"""
+Bulk customer onboarding: users, their first account and its opening deposit.
+
+Rows are handled a chunk at a time. Each row is validated with the same schemas
+as /auth/register and POST /accounts/. Emails that are already registered, or
+repeated earlier in the chunk, are found with one query per chunk. Passwords are
+hashed with hash_passwords, which the import job spreads over a process pool.
+The chunk's account numbers are reserved in one go before it writes anything.
+Users, accounts and opening deposits then go in as one multi-row INSERT each,
+and the chunk commits once. Rows that fail are reported instead of stopping the import.
+"""
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.core.security import pwd_context
+from app.db import models, schemas
+from app.db.account_numbers import next_account_numbers
+from app.services.reporting import record_transactions
+
+def hash_passwords(passwords):
+    """bcrypt a list of passwords; top-level so process pools can pickle it."""
+    return [pwd_context.hash(password.encode("utf-8")) for password in passwords]
+
+
+def _error_message(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in exc.errors()
+    )
+
+
+def validate_row(raw: dict):
+    """
+    (user, account) schemas for one input row; account is None when the row
+    has no account_type. Raises ValueError with a readable message.
+    """
+    try:
+        user = schemas.UserCreate(name=raw.get("name"), email=raw.get("email"), password=raw.get("password"))
+        account = None
+        if raw.get("account_type"):
+            account = schemas.AccountCreate(
+                account_type=raw["account_type"], initial_deposit=raw.get("initial_deposit") or 0
+            )
+    except ValidationError as e:
+        raise ValueError(_error_message(e))
+    if len(user.password.encode("utf-8")) > 72:
+        raise ValueError("password: Password too long (max 72 bytes)")
+    if account is not None and account.initial_deposit < 0:
+        raise ValueError("initial_deposit: Initial deposit cannot be negative")
+    return user, account
+
+
+def validate_chunk(rows):
+    """
+    Split (line, raw row) pairs into (valid, errors). valid holds (line, user,
+    account); errors are {"line", "email", "error"} report entries.
+    """
+    valid, errors = [], []
+    for line, raw in rows:
+        try:
+            user, account = validate_row(raw)
+        except ValueError as e:
+            errors.append({"line": line, "email": raw.get("email"), "error": str(e)})
+            continue
+        valid.append((line, user, account))
+    return valid, errors
+
+
+def drop_duplicates(db: Session, valid):
+    """Remove rows whose email is registered already or taken earlier in the chunk; one query."""
+    emails = [user.email for _, user, _ in valid]
+    taken = set(db.execute(select(models.User.email).where(models.User.email.in_(emails))).scalars())
+    kept, errors = [], []
+    for line, user, account in valid:
+        if user.email in taken:
+            errors.append({"line": line, "email": user.email, "error": "Email already registered"})
+            continue
+        taken.add(user.email)
+        kept.append((line, user, account))
+    return kept, errors
+
+
+def insert_customers(db: Session, rows):
+    """
+    Insert (line, user, hashed password, account, account number) rows with one
+    statement per table, without committing. Returns the number of accounts created.
+    """
+    user_ids = db.execute(
+        insert(models.User).returning(models.User.id, sort_by_parameter_order=True),
+        [{"name": user.name, "email": user.email, "hashed_password": hashed, "is_admin": False}
+         for _, user, hashed, _, _ in rows]
+    ).scalars().all()
+
+    opened = [
+        (user_id, account, number) for user_id, (_, _, _, account, number) in zip(user_ids, rows) if account is not None
+    ]
+    if not opened:
+        return 0
+    account_ids = db.execute(
+        insert(models.Account).returning(models.Account.id, sort_by_parameter_order=True),
+        [{"user_id": user_id, "account_number": number, "account_type": account.account_type.value,
+          "balance": account.initial_deposit}
+         for user_id, account, number in opened]
+    ).scalars().all()
+
+    deposits = [
+        (account_id, account.account_type.value, "deposit", account.initial_deposit)
+        for account_id, (_, account, _) in zip(account_ids, opened) if account.initial_deposit > 0
+    ]
+    if deposits:
+        db.execute(insert(models.Transaction), [
+            {"account_id": account_id, "type": tx_type, "amount": amount}
+            for account_id, _, tx_type, amount in deposits
+        ])
+        record_transactions(db, deposits)
+    return len(opened)
+
+
+def _numbered(db: Session, rows, hashed):
+    """(line, user, password_hash, account, account_number) for each row."""
+    # Reserved for the whole chunk up front: on PostgreSQL on their own connection,
+    # on SQLite in this transaction. Numbers of rows that end up rejected are
+    # simply never used.
+    opening = sum(1 for _, _, account in rows if account is not None)
+    numbers = iter(next_account_numbers(db, opening) if opening else [])
+    return [
+        (line, user, password_hash, account, next(numbers) if account is not None else None)
+        for (line, user, account), password_hash in zip(rows, hashed)
+    ]
+
+
+def import_chunk(db: Session, rows, hashed):
+    """
+    Insert one validated, de-duplicated chunk (line, user, account) whose password
+    hashes are `hashed`, and commit it. Returns (users, accounts, errors).
+
+    If the chunk insert fails (an email registered concurrently, say), it is
+    rolled back and replayed one row per savepoint, so only the offending rows
+    are reported.
+    """
+    try:
+        numbered = _numbered(db, rows, hashed)
+        accounts = insert_customers(db, numbered)
+        db.commit()
+        return len(numbered), accounts, []
+    except IntegrityError:
+        db.rollback()
+
+    # On SQLite the numbers were reserved in the transaction just rolled back, so
+    # the replay takes fresh ones
+    users = accounts = 0
+    errors = []
+    for row in _numbered(db, rows, hashed):
+        try:
+            with db.begin_nested():
+                accounts += insert_customers(db, [row])
+            users += 1
+        except IntegrityError as e:
+            errors.append({"line": row[0], "email": row[1].email, "error": f"Rejected by the database: {e.orig}"})
+    db.commit()
+    return users, accounts, errors
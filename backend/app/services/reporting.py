@@ -0,0 +1,169 @@
+# app/services/reporting.py
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from sqlalchemy import select, delete, func, cast, BigInteger
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db import models
+from app.db.upsert import insert_for
+
+# Ledger entry types that move money into the account; everything else is an outflow
+INFLOW_TYPES = ("deposit",)
+
+
+def _aggregate(entries, day: date):
+    """
+    Fold (account_id, account_type, tx_type, amount) entries into rollup rows.
+    Keys are unique and sorted, as a multi-row upsert requires and so that
+    concurrent writers lock rollup rows in the same order.
+    """
+    totals = defaultdict(lambda: [0, 0])
+    flows = defaultdict(lambda: [0, 0, 0])
+    for account_id, account_type, tx_type, amount in entries:
+        total = totals[(day, account_type, tx_type, account_id % settings.ROLLUP_BUCKETS)]
+        total[0] += amount
+        total[1] += 1
+        flow = flows[(account_id, day)]
+        flow[0 if tx_type in INFLOW_TYPES else 1] += amount
+        flow[2] += 1
+    type_rows = [
+        {"day": d, "account_type": a, "tx_type": t, "bucket": b, "total": v[0], "count": v[1]}
+        for (d, a, t, b), v in sorted(totals.items())
+    ]
+    flow_rows = [
+        {"account_id": a, "day": d, "inflow": v[0], "outflow": v[1], "count": v[2]}
+        for (a, d), v in sorted(flows.items())
+    ]
+    return type_rows, flow_rows
+
+
+def _upsert_rollups(db: Session, type_rows, flow_rows):
+    insert = insert_for(db)
+    if type_rows:
+        stmt = insert(models.DailyTypeTotal).values(type_rows)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=["day", "account_type", "tx_type", "bucket"],
+            set_={
+                "total": models.DailyTypeTotal.total + stmt.excluded.total,
+                "count": models.DailyTypeTotal.count + stmt.excluded.count,
+            }
+        ))
+    if flow_rows:
+        stmt = insert(models.DailyAccountFlow).values(flow_rows)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=["account_id", "day"],
+            set_={
+                "inflow": models.DailyAccountFlow.inflow + stmt.excluded.inflow,
+                "outflow": models.DailyAccountFlow.outflow + stmt.excluded.outflow,
+                "count": models.DailyAccountFlow.count + stmt.excluded.count,
+            }
+        ))
+
+
+def record_transactions(db: Session, entries, day: date = None):
+    """
+    Add ledger entries (account_id, account_type, tx_type, amount) to today's
+    rollups. Call before the commit of the transaction that writes them, so
+    rollups and ledger commit or roll back together.
+    """
+    _upsert_rollups(db, *_aggregate(entries, day or datetime.utcnow().date()))
+
+
+# ---------------- Reports ----------------
+def daily_totals(db: Session, start: date, end: date, account_type: str = None):
+    """Totals and counts per day, account type and transaction type for [start, end]."""
+    query = (
+        select(
+            models.DailyTypeTotal.day,
+            models.DailyTypeTotal.account_type,
+            models.DailyTypeTotal.tx_type,
+            # SUM over BIGINT is NUMERIC on PostgreSQL; keep totals integer
+            cast(func.sum(models.DailyTypeTotal.total), BigInteger).label("total"),
+            func.sum(models.DailyTypeTotal.count).label("count"),
+        )
+        .where(models.DailyTypeTotal.day >= start, models.DailyTypeTotal.day <= end)
+        .group_by(models.DailyTypeTotal.day, models.DailyTypeTotal.account_type, models.DailyTypeTotal.tx_type)
+        .order_by(models.DailyTypeTotal.day, models.DailyTypeTotal.account_type, models.DailyTypeTotal.tx_type)
+    )
+    if account_type:
+        query = query.where(models.DailyTypeTotal.account_type == account_type)
+    return [dict(row._mapping) for row in db.execute(query)]
+
+
+def account_flows(db: Session, account_id: int, start: date, end: date):
+    """Daily inflow, outflow and net flow of one account for [start, end]."""
+    rows = db.execute(
+        select(
+            models.DailyAccountFlow.day,
+            models.DailyAccountFlow.inflow,
+            models.DailyAccountFlow.outflow,
+            models.DailyAccountFlow.count,
+        )
+        .where(
+            models.DailyAccountFlow.account_id == account_id,
+            models.DailyAccountFlow.day >= start,
+            models.DailyAccountFlow.day <= end,
+        )
+        .order_by(models.DailyAccountFlow.day)
+    )
+    return [{**row._mapping, "net": row.inflow - row.outflow} for row in rows]
+
+
+# ---------------- Rebuild ----------------
+def _day_bounds(db: Session):
+    """First and last day with a ledger entry or a rollup row, or (None, None)."""
+    first_tx, last_tx = db.execute(
+        select(func.min(models.Transaction.created_at), func.max(models.Transaction.created_at))
+    ).one()
+    days = [d.date() for d in (first_tx, last_tx) if d]
+    for table in (models.DailyTypeTotal, models.DailyAccountFlow):
+        days += [d for d in db.execute(select(func.min(table.day), func.max(table.day))).one() if d]
+    return (min(days), max(days)) if days else (None, None)
+
+
+def _rebuild_day(db: Session, day: date, batch_size: int):
+    """Replace one day's rollups with a fold of that day's ledger entries; commits."""
+    db.execute(delete(models.DailyTypeTotal).where(models.DailyTypeTotal.day == day))
+    db.execute(delete(models.DailyAccountFlow).where(models.DailyAccountFlow.day == day))
+    midnight = datetime(day.year, day.month, day.day)
+    query = (
+        select(
+            models.Transaction.account_id,
+            models.Account.account_type,
+            models.Transaction.type,
+            models.Transaction.amount,
+        )
+        .join(models.Account, models.Account.id == models.Transaction.account_id)
+        .where(models.Transaction.created_at >= midnight, models.Transaction.created_at < midnight + timedelta(days=1))
+        .order_by(models.Transaction.id)
+    )
+    processed = 0
+    for batch in db.execute(query.execution_options(yield_per=batch_size)).partitions():
+        _upsert_rollups(db, *_aggregate(batch, day))
+        processed += len(batch)
+    db.commit()
+    return processed
+
+
+def rebuild_rollups(db: Session, start: date = None, end: date = None, batch_size: int = 10000):
+    """
+    Recompute rollups from the ledger, optionally for days [start, end] only.
+
+    Each day is rebuilt and committed in its own transaction, so live writers
+    wait on the rollup rows of at most the one day being rebuilt, and only for
+    as long as that day takes. A day's ledger is streamed in batches folded in
+    with additive upserts, so memory is bounded by the batch, not the ledger.
+    """
+    if start is None or end is None:
+        first, last = _day_bounds(db)
+        db.commit()
+        if first is None:
+            return 0
+        start, end = start or first, end or last
+
+    processed = 0
+    day = start
+    while day <= end:
+        processed += _rebuild_day(db, day, batch_size)
+        day += timedelta(days=1)
+    return processed
@@ -0,0 +1,155 @@
+# app/services/statements.py
+"""
+Monthly statements, one partition of accounts (lo <= id < hi) at a time.
+
+A partition costs two statements whatever its size. The first reads each
+account with the signed sum of its ledger since the period start, in the same
+snapshot as its balance. The opening balance is that balance minus the sum.
+Only rows from the period start onwards are read, never the whole history.
+The second is one range query over the period's transactions, ordered by
+(account_id, created_at, id) to match the transactions index and read through
+a server-side cursor. The two streams are merged in account order, so only one
+account's transactions are held in memory at a time.
+"""
+import csv
+import gzip
+import json
+import os
+from datetime import datetime, timedelta
+from sqlalchemy import BigInteger, cast, func, select
+from app.core.money import to_major
+from app.db import models
+from app.services.hot_accounts import BALANCE
+from app.services.reconciliation import SIGNED_AMOUNT
+
+FORMATS = ("csv", "json")
+
+
+def _accounts(conn, lo: int, hi: int, start: datetime):
+    since_start = (
+        select(
+            models.Transaction.account_id,
+            cast(func.sum(SIGNED_AMOUNT), BigInteger).label("total"),
+        )
+        .where(
+            models.Transaction.account_id >= lo,
+            models.Transaction.account_id < hi,
+            models.Transaction.created_at >= start,
+        )
+        .group_by(models.Transaction.account_id)
+        .subquery()
+    )
+    return conn.execute(
+        select(
+            models.Account.id,
+            models.Account.account_number,
+            models.Account.account_type,
+            (BALANCE - func.coalesce(since_start.c.total, 0)).label("opening_balance"),
+        )
+        .outerjoin(since_start, since_start.c.account_id == models.Account.id)
+        .where(models.Account.id >= lo, models.Account.id < hi)
+        .order_by(models.Account.id)
+    )
+
+
+def _transactions(conn, lo: int, hi: int, start: datetime, end: datetime, chunk_size: int):
+    return conn.execute(
+        select(
+            models.Transaction.account_id,
+            models.Transaction.id,
+            models.Transaction.created_at,
+            models.Transaction.type,
+            SIGNED_AMOUNT.label("amount"),
+        )
+        .where(
+            models.Transaction.account_id >= lo,
+            models.Transaction.account_id < hi,
+            models.Transaction.created_at >= start,
+            models.Transaction.created_at < end,
+        )
+        .order_by(models.Transaction.account_id, models.Transaction.created_at, models.Transaction.id)
+        .execution_options(yield_per=chunk_size)
+    )
+
+
+def iter_statements(conn, lo: int, hi: int, start: datetime, end: datetime, chunk_size: int = 10000):
+    """
+    Yield one statement dict per account in [lo, hi), in id order. Amounts are
+    minor units; transaction amounts are signed (money in is positive).
+    """
+    accounts = _accounts(conn, lo, hi, start).all()
+    transactions = iter(_transactions(conn, lo, hi, start, end, chunk_size).tuples())
+    pending = next(transactions, None)
+    for account_id, account_number, account_type, opening_balance in accounts:
+        # Ledger rows of accounts that no longer exist are skipped
+        while pending is not None and pending[0] < account_id:
+            pending = next(transactions, None)
+        balance = opening_balance
+        lines = []
+        while pending is not None and pending[0] == account_id:
+            _, tx_id, created_at, tx_type, amount = pending
+            balance += amount
+            lines.append((tx_id, created_at, tx_type, amount, balance))
+            pending = next(transactions, None)
+        yield {
+            "account_id": account_id,
+            "account_number": account_number,
+            "account_type": account_type,
+            "opening_balance": opening_balance,
+            "closing_balance": balance,
+            "transactions": lines,
+        }
+
+
+# ---------------- Files ----------------
+def last_day(end: datetime) -> str:
+    """The last day covered by a period ending (exclusively) at `end`."""
+    return (end - timedelta(days=1)).date().isoformat()
+
+
+def statement_path(directory: str, statement: dict, fmt: str) -> str:
+    # A thousand accounts per directory keeps listings manageable at millions of accounts
+    shard = f"{statement['account_id'] // 1000:06d}"
+    return os.path.join(directory, shard, f"{statement['account_number']}.{fmt}.gz")
+
+
+def _write_csv(f, statement: dict, start: datetime, end: datetime):
+    writer = csv.writer(f)
+    writer.writerow(("date", "transaction_id", "description", "amount", "balance"))
+    writer.writerow((start.date().isoformat(), "", "Opening balance", "", to_major(statement["opening_balance"])))
+    writer.writerows(
+        (created_at.isoformat(), tx_id, tx_type, to_major(amount), to_major(balance))
+        for tx_id, created_at, tx_type, amount, balance in statement["transactions"]
+    )
+    writer.writerow((last_day(end), "", "Closing balance", "", to_major(statement["closing_balance"])))
+
+
+def _write_json(f, statement: dict, start: datetime, end: datetime):
+    json.dump({
+        "account_number": statement["account_number"],
+        "account_type": statement["account_type"],
+        "period_start": start.date().isoformat(),
+        "period_end": last_day(end),
+        "opening_balance": to_major(statement["opening_balance"]),
+        "closing_balance": to_major(statement["closing_balance"]),
+        "transactions": [
+            {"id": tx_id, "created_at": created_at.isoformat(), "type": tx_type,
+             "amount": to_major(amount), "balance": to_major(balance)}
+            for tx_id, created_at, tx_type, amount, balance in statement["transactions"]
+        ],
+    }, f, separators=(",", ":"))
+
+
+WRITERS = {"csv": _write_csv, "json": _write_json}
+
+
+def write_statement(directory: str, statement: dict, fmt: str, start: datetime, end: datetime,
+                    compresslevel: int = 6) -> str:
+    """Write one gzip-compressed statement atomically (temp file, then rename); return its path."""
+    path = statement_path(directory, statement, fmt)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with gzip.open(tmp, "wt", newline="", compresslevel=compresslevel) as f:
+        WRITERS[fmt](f, statement, start, end)
+    os.replace(tmp, path)
+    return path
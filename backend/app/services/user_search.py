@@ -0,0 +1,67 @@
+# app/services/user_search.py
+"""
+Admin customer search (GET /admin/users/search): prefix and substring matches
+on name and email, ranked, answered by the database.
+
+On PostgreSQL, migration 0012 indexes lower(name) and lower(email) twice:
+text_pattern_ops btrees serve the prefix LIKEs, and pg_trgm GIN indexes serve
+the substring LIKEs. SQLite runs the same statements as scans (and folds the
+case of ASCII letters only). Nothing is cached in the worker, so renamed,
+deleted and bulk-imported users are seen by the next search.
+
+A search runs up to two statements:
+
+- prefix matches: the name or email starts with the query, or a later word of
+  the name does. Queries shorter than three characters stop here, since
+  trigrams cannot narrow a shorter substring;
+- if the page is not full yet, other substring matches, newest users first.
+
+Matches rank as: exact name or email, then name or email prefix, then a later
+name word's prefix (ties in name order), then any other substring.
+"""
+from sqlalchemy import case, func, or_, select
+from sqlalchemy.orm import Session
+from app.db.models import User
+
+MIN_SUBSTRING = 3
+LIKE_ESCAPE = "\\"
+
+# Same columns as the admin listing; never hashed_password
+COLUMNS = (User.id, User.name, User.email, User.is_admin)
+
+
+def normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def _escape(text: str) -> str:
+    return text.replace(LIKE_ESCAPE, LIKE_ESCAPE * 2).replace("%", LIKE_ESCAPE + "%").replace("_", LIKE_ESCAPE + "_")
+
+
+def search_users(db: Session, query: str, limit: int = 20):
+    """The best `limit` matches for `query` as admin listing rows, best first."""
+    query = normalize(query)
+    if not query:
+        return []
+    name, email = func.lower(User.name), func.lower(User.email)
+    term = _escape(query)
+
+    is_prefix = or_(name.like(term + "%", escape=LIKE_ESCAPE), email.like(term + "%", escape=LIKE_ESCAPE))
+    is_word_prefix = name.like("% " + term + "%", escape=LIKE_ESCAPE)
+    tier = case((or_(name == query, email == query), 0), (is_prefix, 1), else_=2)
+    rows = db.execute(
+        select(*COLUMNS)
+        .where(or_(is_prefix, is_word_prefix))
+        .order_by(tier, name, User.id)
+        .limit(limit)
+    ).all()
+
+    if len(rows) < limit and len(query) >= MIN_SUBSTRING:
+        pattern = "%" + term + "%"
+        substring = select(*COLUMNS).where(
+            or_(name.like(pattern, escape=LIKE_ESCAPE), email.like(pattern, escape=LIKE_ESCAPE))
+        )
+        if rows:
+            substring = substring.where(User.id.notin_([row.id for row in rows]))
+        rows += db.execute(substring.order_by(User.id.desc()).limit(limit - len(rows))).all()
+    return [dict(row._mapping) for row in rows]
@@ -1,13 +1,19 @@
+from sqlalchemy import select, func, cast, BigInteger
 from sqlalchemy.orm import Session
 from app.db import models, schemas
-from app.core.security import hash_password, verify_password, create_access_token, decode_access_token
+from app.core.security import hash_password, verify_password, verify_and_update_password, create_access_token
+from app.core.auth import invalidate_principal
+from app.core.events import stage_invalidation
 from app.db.models import User
+from app.services.hot_accounts import BALANCE
+from app.services import user_search
 
-def create_user(db: Session, user: schemas.UserCreate):
+def create_user(db: Session, user: schemas.UserCreate, hashed_password: str = None):
+    # Async callers hash on the executor first and pass the result in
     db_user = models.User(
         name=user.name,
         email=user.email,
-        hashed_password=hash_password(user.password)
+        hashed_password=hashed_password or hash_password(user.password)
     )
     db.add(db_user)
     db.commit()
@@ -15,36 +21,98 @@ def create_user(db: Session, user: schemas.UserCreate):
     return db_user
 
 def authenticate_user(db: Session, email: str, password: str):
-    user = db.query(models.User).filter(models.User.email == email).first()
+    user = get_user_by_email(db, email)
     if not user:
         return None
-    if not verify_password(password, user.hashed_password):
+    valid, new_hash = verify_and_update_password(password, user.hashed_password)
+    if not valid:
         return None
+    if new_hash:
+        store_password_hash(db, user, new_hash)
+    return user
+
+def store_password_hash(db: Session, user: models.User, new_hash: str):
+    # Hash was made at an older bcrypt cost; upgrade it transparently
+    user.hashed_password = new_hash
+    db.commit()
     return user
 
 def create_token(user: models.User):
-    token_data = {"user_id": user.id, "is_admin": user.is_admin}
+    token_data = {"user_id": user.id, "is_admin": user.is_admin, "ver": user.token_version}
     return create_access_token(token_data)
 
 
+def set_admin(db: Session, user_id: int, is_admin: bool):
+    user = get_user_by_id(db, user_id)
+    if not user:
+        return None
+    user.is_admin = is_admin
+    stage_invalidation(db, user_id)
+    db.commit()
+    # Other workers drop their copy when the invalidation reaches them; this one now
+    invalidate_principal(user_id)
+    return user
+
 
-def verify_token(db: Session, token: str):
+def change_password(db: Session, user: models.User, new_password: str, hashed_password: str = None):
     """
-    Decode JWT token and return the corresponding user from DB.
+    Store a new password hash and revoke every token issued before the change.
     """
-    try:
-        payload = decode_access_token(token)
-        user_id = payload.get("user_id")
-        if user_id is None:
-            return None
-        user = db.query(models.User).filter(models.User.id == user_id).first()
-        return user
-    except Exception:
-        return None
+    user.hashed_password = hashed_password or hash_password(new_password)
+    user.token_version = (user.token_version or 0) + 1
+    stage_invalidation(db, user.id)
+    db.commit()
+    invalidate_principal(user.id)
+    return user
+
+
+# Columns an admin listing needs; never hashed_password
+USER_LIST_COLUMNS = (User.id, User.name, User.email, User.is_admin)
 
 
-def get_all_users(db: Session):
-    return db.query(User).all()
+def list_users(db: Session, limit: int = 50, cursor: int = None, is_admin: bool = None,
+               email_prefix: str = None, name_prefix: str = None,
+               include_count: bool = False, include_accounts: bool = False):
+    """
+    One page of users ordered by id. `cursor` is the last id of the previous
+    page. Only the listed columns are selected (no ORM hydration); the optional
+    total and per-user account summaries cost one extra query each.
+    """
+    filters = []
+    if is_admin is not None:
+        filters.append(User.is_admin == is_admin)
+    if email_prefix:
+        filters.append(User.email.startswith(email_prefix, autoescape=True))
+    if name_prefix:
+        filters.append(User.name.startswith(name_prefix, autoescape=True))
+
+    query = select(*USER_LIST_COLUMNS).where(*filters)
+    if cursor is not None:
+        query = query.where(User.id > cursor)
+    rows = db.execute(query.order_by(User.id).limit(limit + 1)).all()
+    page = [dict(row._mapping) for row in rows[:limit]]
+
+    result = {"items": page, "next_cursor": rows[limit - 1].id if len(rows) > limit else None}
+    if include_count:
+        result["total"] = db.execute(select(func.count()).select_from(User).where(*filters)).scalar_one()
+    if include_accounts and page:
+        summaries = {
+            user_id: {"count": count, "total_balance": total}
+            for user_id, count, total in db.execute(
+                select(models.Account.user_id, func.count(), cast(func.coalesce(func.sum(BALANCE), 0), BigInteger))
+                .where(models.Account.user_id.in_([u["id"] for u in page]))
+                .group_by(models.Account.user_id)
+            )
+        }
+        for user in page:
+            user["accounts"] = summaries.get(user["id"], {"count": 0, "total_balance": 0})
+    return result
+
+def search_users(db: Session, query: str, limit: int = 20):
+    return user_search.search_users(db, query, limit)
 
 def get_user_by_id(db: Session, user_id: int):
-    return db.query(User).filter(User.id == user_id).first()
\ No newline at end of file
+    return db.query(User).filter(User.id == user_id).first()
+
+def get_user_by_email(db: Session, email: str):
+    return db.query(User).filter(User.email == email).first()
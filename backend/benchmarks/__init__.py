@@ -0,0 +1,6 @@
+# benchmarks/__init__.py
+# Benchmarks run against throwaway databases, so any account number key will
+# do when none is configured. Set here, before any script imports the app.
+import os
+
+os.environ.setdefault("ACCOUNT_NUMBER_KEY", "benchmark-account-numbers")
@@ -0,0 +1,63 @@
+# benchmarks/account_creation.py
+# Bulk account creation throughput with block-allocated account numbers.
+#   python -m benchmarks.account_creation --workers 8 --accounts 2000
+import argparse
+import threading
+import time
+from sqlalchemy.exc import IntegrityError
+from benchmarks.common import bench_database_url, make_session_factory
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--accounts", type=int, default=2000, help="accounts per worker")
+    args = parser.parse_args()
+
+    engine, SessionLocal = make_session_factory(bench_database_url(args.url))
+    from app.db import models
+    from app.db.account_numbers import is_valid_account_number
+
+    db = SessionLocal()
+    user = models.User(name="Bench User", email=f"bench-{time.time_ns()}@smartbank.com", hashed_password="x")
+    db.add(user)
+    db.commit()
+    user_id = user.id
+    db.close()
+
+    conflicts = []
+
+    def worker():
+        db = SessionLocal()
+        try:
+            for _ in range(args.accounts):
+                db.add(models.Account(user_id=user_id, account_type="savings", balance=0))
+                try:
+                    db.commit()
+                except IntegrityError:
+                    db.rollback()
+                    conflicts.append(1)
+        finally:
+            db.close()
+
+    threads = [threading.Thread(target=worker) for _ in range(args.workers)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    db = SessionLocal()
+    numbers = [n for (n,) in db.query(models.Account.account_number).filter(models.Account.user_id == user_id)]
+    db.close()
+    total = args.workers * args.accounts
+    print(f"accounts:         {len(numbers)} / {total} in {elapsed:.2f}s ({total / elapsed:.0f}/s)")
+    print(f"unique numbers:   {len(set(numbers))}")
+    print(f"invalid numbers:  {sum(not is_valid_account_number(n) for n in numbers)}")
+    print(f"insert conflicts: {len(conflicts)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+# benchmarks/api_suite.py
+# End-to-end load and latency suite for the API. Seeds a database (users,
+# accounts, a large transactions ledger), drives the main endpoints in-process
+# at fixed concurrency levels with the session dependency overridden to point
+# at that database, and reports throughput and p50/p95/p99 per endpoint.
+#   python -m benchmarks.api_suite                                   # temp SQLite
+#   python -m benchmarks.api_suite --postgres --transactions 2000000 # throwaway PostgreSQL
+#   python -m benchmarks.api_suite --save benchmarks/baselines/local.json
+#   python -m benchmarks.api_suite --baseline benchmarks/baselines/local.json --threshold 0.25
+# With --baseline the exit status is 1 when any endpoint regressed past the threshold.
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from benchmarks.common import bench_database_url, latency_summary, throwaway_postgres
+
+ENDPOINTS = ("register", "login", "list_accounts", "deposit", "withdraw", "transfer")
+PASSWORD = "Secure6!"
+SEED_CHUNK = 50_000
+OPENING_BALANCE = 10**9  # minor units, enough that withdrawals and transfers never run dry
+
+
+# ---------------- Seeding ----------------
+def seed(SessionLocal, users: int, accounts_per_user: int, transactions: int):
+    """
+    Bulk-load the seed data set unless the database already holds it, and
+    return [(user_id, [(account_id, account_number), ...]), ...].
+    """
+    from sqlalchemy import func, insert, select
+    from app.core import security
+    from app.db import models
+    from app.db.account_numbers import next_account_numbers
+
+    db = SessionLocal()
+    try:
+        seeded = db.execute(
+            select(func.count()).select_from(models.User).where(models.User.email.like("seed-%"))
+        ).scalar_one()
+        if seeded < users:
+            hashed = security.pwd_context.hash(PASSWORD.encode("utf-8"))
+            # Reserve account numbers before this transaction takes the SQLite write lock
+            numbers = iter(next_account_numbers(db, users * accounts_per_user))
+            db.execute(insert(models.User), [
+                {"name": f"Seed User {i}", "email": f"seed-{i}@smartbank.com", "hashed_password": hashed, "is_admin": False}
+                for i in range(seeded, users)
+            ])
+            new_ids = db.execute(
+                select(models.User.id).where(models.User.email.like("seed-%")).order_by(models.User.id).offset(seeded)
+            ).scalars().all()
+            db.execute(insert(models.Account), [
+                {"user_id": user_id, "account_type": ("savings", "current")[n % 2],
+                 "balance": OPENING_BALANCE, "account_number": next(numbers)}
+                for user_id in new_ids
+                for n in range(accounts_per_user)
+            ])
+            db.commit()
+
+        rows = db.execute(
+            select(models.Account.user_id, models.Account.id, models.Account.account_number)
+            .join(models.User, models.User.id == models.Account.user_id)
+            .where(models.User.email.like("seed-%"))
+            .order_by(models.Account.user_id, models.Account.id)
+        ).all()
+        accounts = {}
+        for user_id, account_id, number in rows:
+            accounts.setdefault(user_id, []).append((account_id, number))
+        account_ids = [account_id for _, account_id, _ in rows]
+
+        existing = db.execute(select(func.count()).select_from(models.Transaction)).scalar_one()
+        now = datetime.utcnow()
+        for start in range(existing, transactions, SEED_CHUNK):
+            db.execute(insert(models.Transaction), [
+                {
+                    "account_id": random.choice(account_ids),
+                    "type": random.choice(("deposit", "withdraw", "transfer")),
+                    "amount": random.randint(100, 5_000_000),
+                    "created_at": now - timedelta(seconds=random.randint(0, 90 * 86400)),
+                }
+                for _ in range(min(SEED_CHUNK, transactions - start))
+            ])
+            db.commit()
+        return list(accounts.items())[:users]
+    finally:
+        db.close()
+
+
+# ---------------- Load ----------------
+def scenarios(seeded, tokens, run_id):
+    """endpoint -> function(i) returning (method, path, json body, headers)."""
+    def owner(i):
+        user_id, accounts = seeded[i % len(seeded)]
+        return {"Authorization": f"Bearer {tokens[user_id]}"}, accounts
+
+    def register(i):
+        email = f"bench-{run_id}-{i}@smartbank.com"
+        return "POST", "/auth/register", {"name": "Bench User", "email": email, "password": PASSWORD}, None
+
+    def login(i):
+        return "POST", "/auth/login", {"email": f"seed-{i % len(seeded)}@smartbank.com", "password": PASSWORD}, None
+
+    def list_accounts(i):
+        headers, _ = owner(i)
+        return "GET", "/accounts/", None, headers
+
+    def deposit(i):
+        headers, accounts = owner(i)
+        return "POST", "/accounts/deposit", {"account_id": accounts[0][0], "amount": 1.0}, headers
+
+    def withdraw(i):
+        headers, accounts = owner(i)
+        return "POST", "/accounts/withdraw", {"account_id": accounts[0][0], "amount": 0.01}, headers
+
+    def transfer(i):
+        headers, accounts = owner(i)
+        _, recipient = seeded[(i + 1) % len(seeded)]
+        return "POST", "/accounts/transfer", {
+            "from_account_id": accounts[0][0], "to_account_number": recipient[0][1], "amount": 0.01
+        }, headers
+
+    return {
+        "register": register, "login": login, "list_accounts": list_accounts,
+        "deposit": deposit, "withdraw": withdraw, "transfer": transfer,
+    }
+
+
+async def drive(client, request_for, concurrency: int, requests: int, offset: int):
+    latencies, errors = [], []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        method, path, body, headers = request_for(offset + i)
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.request(method, path, json=body, headers=headers)
+            elapsed = time.perf_counter() - started
+        if response.status_code >= 400:
+            errors.append(response.status_code)
+        else:
+            latencies.append(elapsed)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": requests,
+        "errors": len(errors),
+        "rps": round(len(latencies) / elapsed, 1),
+        **latency_summary(latencies),
+    }
+
+
+async def run_load(app, seeded, tokens, endpoints, levels, requests):
+    import httpx
+
+    run_id = time.time_ns()
+    request_for = scenarios(seeded, tokens, run_id)
+    results = {}
+    offset = 0
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for endpoint in endpoints:
+            await drive(client, request_for[endpoint], 1, 3, offset)  # warm up
+            offset += 3
+            for concurrency in levels:
+                result = await drive(client, request_for[endpoint], concurrency, requests, offset)
+                offset += requests
+                results[f"{endpoint}@{concurrency}"] = result
+                print(f"{endpoint:14} c={concurrency:<4} {result}", flush=True)
+    return results
+
+
+# ---------------- Baselines ----------------
+def compare(results, baseline, threshold: float):
+    """
+    Print each endpoint against the baseline; return the keys that regressed:
+    p95 latency up, or throughput down, by more than `threshold`.
+    """
+    regressions = []
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if not previous:
+            print(f"{key:20} (no baseline)")
+            continue
+        p95_change = current["p95_ms"] / previous["p95_ms"] - 1 if previous["p95_ms"] else 0.0
+        rps_change = current["rps"] / previous["rps"] - 1 if previous["rps"] else 0.0
+        regressed = p95_change > threshold or rps_change < -threshold
+        if regressed:
+            regressions.append(key)
+        print(f"{key:20} p95 {p95_change:+7.1%}  rps {rps_change:+7.1%}  {'REGRESSED' if regressed else 'ok'}")
+    return regressions
+
+
+def run_suite(url, args, endpoints, levels):
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from app.core.config import settings
+    from app.db import database
+    from app.jobs.migrate import upgrade
+    from app.main import app
+    from app.services.user_service import create_token
+
+    upgrade(database_url=url)
+    pool = {"pool_size": max(levels), "max_overflow": 0}
+    connect_args = {"timeout": 30} if url.startswith("sqlite") else {}
+    engine = create_engine(url, connect_args=connect_args, **pool)
+    SessionLocal = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+
+    started = time.perf_counter()
+    seeded = seed(SessionLocal, args.users, args.accounts_per_user, args.transactions)
+    print(f"seeded in {time.perf_counter() - started:.1f}s", flush=True)
+    tokens = {
+        user_id: create_token(SimpleNamespace(id=user_id, is_admin=False, token_version=0))
+        for user_id, _ in seeded
+    }
+
+    # Point the app's session dependency at the bench database
+    if settings.DB_ASYNC:
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+        async_engine = create_async_engine(database.async_database_url(url), connect_args=connect_args, **pool)
+        AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+        async def bench_session():
+            async with AsyncSessionLocal() as db:
+                yield db
+    else:
+        async_engine = None
+
+        def bench_session():
+            db = SessionLocal()
+            try:
+                yield db
+            finally:
+                db.close()
+    app.dependency_overrides[database.get_session] = bench_session
+
+    async def load():
+        try:
+            return await run_load(app, seeded, tokens, endpoints, levels, args.requests)
+        finally:
+            if async_engine is not None:
+                await async_engine.dispose()
+
+    try:
+        results = asyncio.run(load())
+    finally:
+        app.dependency_overrides.pop(database.get_session, None)
+        engine.dispose()
+
+    meta = {
+        "recorded_at": datetime.utcnow().isoformat(timespec="seconds"),
+        "database": engine.url.get_backend_name(),
+        "async": settings.DB_ASYNC,
+        "bcrypt_rounds": settings.BCRYPT_ROUNDS,
+        "python": platform.python_version(),
+        "seed": {"users": args.users, "accounts_per_user": args.accounts_per_user, "transactions": args.transactions},
+        "requests": args.requests,
+    }
+    return results, meta
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API load and latency suite")
+    parser.add_argument("--url", help="database URL (default: BENCH_DATABASE_URL or a temp SQLite file)")
+    parser.add_argument("--postgres", action="store_true", help="run against a throwaway local PostgreSQL")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--accounts-per-user", type=int, default=2)
+    parser.add_argument("--transactions", type=int, default=200_000, help="ledger rows to seed")
+    parser.add_argument("--concurrency", default="1,16,64")
+    parser.add_argument("--requests", type=int, default=200, help="requests per endpoint per concurrency level")
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS))
+    parser.add_argument("--save", metavar="PATH", help="write the results as a JSON baseline")
+    parser.add_argument("--baseline", metavar="PATH", help="compare against a saved baseline")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="allowed relative p95 increase / throughput drop (default 0.2)")
+    args = parser.parse_args()
+
+    endpoints = args.endpoints.split(",")
+    unknown = set(endpoints) - set(ENDPOINTS)
+    if unknown:
+        parser.error(f"unknown endpoints: {', '.join(sorted(unknown))}")
+    levels = [int(c) for c in args.concurrency.split(",")]
+
+    with contextlib.ExitStack() as stack:
+        url = stack.enter_context(throwaway_postgres()) if args.postgres else bench_database_url(args.url)
+        # Anything that reads the setting instead of the dependency hits the bench database too
+        os.environ["DATABASE_URL"] = url
+        results, meta = run_suite(url, args, endpoints, levels)
+
+    report = {"meta": meta, "results": results}
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"saved baseline to {args.save}")
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline["meta"]["database"] != meta["database"] or baseline["meta"]["seed"] != meta["seed"]:
+            print("note: baseline was recorded with a different database or seed size")
+        regressions = compare(results, baseline["results"], args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) past {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
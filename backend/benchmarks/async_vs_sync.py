@@ -0,0 +1,83 @@
+# benchmarks/async_vs_sync.py
+# Side-by-side throughput of the sync (threadpool Session) and async
+# (AsyncSession) modes at high in-flight concurrency. Each mode runs in its own
+# subprocess because DB_ASYNC is read at import time; requests go through the
+# ASGI app in-process via httpx, so no server or network is involved.
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from benchmarks.common import bench_database_url, latency_summary
+
+
+async def drive(concurrency, requests):
+    import httpx
+    from app.main import app
+    from app.db import database, models
+    from app.services import user_service
+    from app.jobs.migrate import upgrade
+
+    upgrade()
+
+    db = database.SessionLocal()
+    user = models.User(name="Bench", email=f"async-{time.time_ns()}@smartbank.com", hashed_password="x")
+    db.add(user)
+    db.commit()  # account numbers are reserved on their own connection
+    db.add_all([models.Account(user_id=user.id, account_type="savings", balance=10000) for _ in range(5)])
+    db.commit()
+    headers = {"Authorization": f"Bearer {user_service.create_token(user)}"}
+    db.close()
+
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one():
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.get("/accounts/", headers=headers)
+                assert response.status_code == 200, response.text
+                latencies.append(time.perf_counter() - started)
+
+        await one()  # warm up
+        latencies.clear()
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        elapsed = time.perf_counter() - started
+    if database.settings.DB_ASYNC:
+        # aiosqlite connection threads keep the interpreter alive until disposed
+        await database.async_engine.dispose()
+    return {"rps": round(len(latencies) / elapsed, 1), **latency_summary(latencies)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sync vs async database mode")
+    parser.add_argument("--url")
+    parser.add_argument("--concurrency", default="10,100,1000")
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        results = {c: asyncio.run(drive(int(c), args.requests)) for c in args.concurrency.split(",")}
+        print(json.dumps(results))
+        return
+
+    url = bench_database_url(args.url)
+    for mode in ("false", "true"):
+        env = dict(os.environ, DATABASE_URL=url, DB_ASYNC=mode)
+        out = subprocess.run(
+            [sys.executable, "-m", "benchmarks.async_vs_sync", "--child",
+             "--concurrency", args.concurrency, "--requests", str(args.requests)],
+            env=env, capture_output=True, text=True, check=True
+        ).stdout
+        for concurrency, result in json.loads(out.strip().splitlines()[-1]).items():
+            label = "async" if mode == "true" else "sync"
+            print(f"{label:5} in-flight={concurrency:>5} {result}")
+
+
+if __name__ == "__main__":
+    main()
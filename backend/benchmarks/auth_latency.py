@@ -0,0 +1,56 @@
+# benchmarks/auth_latency.py
+# Per-request cost of the authentication dependency with and without the
+# principal cache, over a pool of users making repeated requests.
+import argparse
+import asyncio
+import random
+import time
+from app.core import auth
+from app.core.cache import TTLCache
+from app.db import models
+from app.services.user_service import create_token
+from benchmarks.common import bench_database_url, make_session_factory, latency_summary
+
+
+def seed_tokens(SessionLocal, users):
+    db = SessionLocal()
+    rows = [models.User(name=f"User {i}", email=f"auth-{time.time_ns()}-{i}@smartbank.com", hashed_password="x") for i in range(users)]
+    db.add_all(rows)
+    db.commit()
+    tokens = [create_token(u) for u in rows]
+    db.close()
+    return tokens
+
+
+async def run(SessionLocal, tokens, requests, cache_size):
+    auth.principal_cache = TTLCache(cache_size, 300)
+    db = SessionLocal()
+    samples = []
+    for _ in range(requests):
+        token = random.choice(tokens)
+        started = time.perf_counter()
+        await auth.authenticate(db, token)
+        samples.append(time.perf_counter() - started)
+    db.close()
+    return samples, auth.principal_cache.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Authentication dependency latency")
+    parser.add_argument("--url")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    engine, SessionLocal = make_session_factory(bench_database_url(args.url))
+    tokens = seed_tokens(SessionLocal, args.users)
+
+    for label, size in (("no cache", 0), ("cache", args.users)):
+        samples, stats = asyncio.run(run(SessionLocal, tokens, args.requests, size))
+        mean_us = sum(samples) / len(samples) * 1e6
+        print(f"{label:9} mean={mean_us:8.1f}us {latency_summary(samples)} hit_ratio={stats['hit_ratio']}")
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# benchmarks/batch_transfer.py
+# Paying N payees: N calls to POST /accounts/transfer versus one call to
+# POST /accounts/transfers/batch, both through the ASGI app in-process.
+import argparse
+import os
+import time
+from benchmarks.common import bench_database_url
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch transfer vs individual transfers")
+    parser.add_argument("--url")
+    parser.add_argument("--payees", type=int, default=500)
+    args = parser.parse_args()
+
+    # The app reads DATABASE_URL at import time
+    os.environ["DATABASE_URL"] = bench_database_url(args.url)
+    from fastapi.testclient import TestClient
+    from app.core.config import settings
+    from app.db import database, models
+    from app.main import app
+    from app.services import user_service
+    from app.jobs.migrate import upgrade
+
+    upgrade()
+
+    settings.DAILY_LIMITS["current"] = 10**12
+    db = database.SessionLocal()
+    payer = models.User(name="Payroll", email=f"payroll-{time.time_ns()}@smartbank.com", hashed_password="x")
+    db.add(payer)
+    db.commit()  # account numbers are reserved on their own connection
+    source = models.Account(user_id=payer.id, account_type="current", balance=1000 * args.payees * 10)
+    payees = [models.Account(user_id=payer.id, account_type="savings", balance=0) for _ in range(args.payees)]
+    db.add_all([source, *payees])
+    db.commit()
+    headers = {"Authorization": f"Bearer {user_service.create_token(payer)}"}
+    numbers = [p.account_number for p in payees]
+    db.close()
+
+    client = TestClient(app)
+    started = time.perf_counter()
+    for number in numbers:
+        response = client.post("/accounts/transfer", json={
+            "from_account_id": source.id, "to_account_number": number, "amount": 10.0
+        }, headers=headers)
+        assert response.status_code == 200, response.text
+    individual = time.perf_counter() - started
+
+    started = time.perf_counter()
+    response = client.post("/accounts/transfers/batch", json={
+        "from_account_id": source.id,
+        "transfers": [{"to_account_number": number, "amount": 10.0} for number in numbers]
+    }, headers=headers)
+    assert response.status_code == 200, response.text
+    batch = time.perf_counter() - started
+
+    print(f"payees:            {args.payees}")
+    print(f"individual calls:  {individual:.3f}s ({args.payees / individual:.0f} transfers/s)")
+    print(f"one batch call:    {batch:.3f}s ({args.payees / batch:.0f} transfers/s)")
+    print(f"speedup:           {individual / batch:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
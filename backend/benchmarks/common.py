@@ -0,0 +1,79 @@
+# benchmarks/common.py
+# Shared helpers for the benchmark scripts. Run them from backend/, e.g.
+#   python -m benchmarks.transfer_concurrency --workers 32
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+from contextlib import contextmanager
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+
+def bench_database_url(url=None):
+    """
+    Resolve the database a benchmark runs against: explicit --url, then
+    BENCH_DATABASE_URL, then a throwaway SQLite file.
+    """
+    if url:
+        return url
+    if os.getenv("BENCH_DATABASE_URL"):
+        return os.getenv("BENCH_DATABASE_URL")
+    return "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="smartbank-bench-"), "bench.db")
+
+
+@contextmanager
+def throwaway_postgres():
+    """
+    Start a temporary PostgreSQL cluster (needs initdb and pg_ctl on PATH),
+    listening only on a Unix socket in a temp directory, and yield its URL.
+    The cluster and its data are deleted on exit.
+    """
+    initdb, pg_ctl = shutil.which("initdb"), shutil.which("pg_ctl")
+    if not (initdb and pg_ctl):
+        raise SystemExit("A throwaway PostgreSQL needs initdb and pg_ctl on PATH")
+    root = tempfile.mkdtemp(prefix="smartbank-pg-")
+    data = os.path.join(root, "data")
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    subprocess.run([initdb, "-D", data, "-U", "bench", "--auth=trust", "-E", "UTF8"], check=True, capture_output=True)
+    subprocess.run(
+        [pg_ctl, "-D", data, "-l", os.path.join(root, "postgres.log"), "-w",
+         "-o", f"-p {port} -k {root} -c listen_addresses='' -c fsync=off", "start"],
+        check=True, capture_output=True
+    )
+    try:
+        yield f"postgresql+psycopg://bench@/postgres?host={root}&port={port}"
+    finally:
+        subprocess.run([pg_ctl, "-D", data, "-m", "immediate", "stop"], capture_output=True)
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def make_session_factory(url, **engine_kwargs):
+    # Imported here so scripts can set DATABASE_URL before the app loads
+    from app.db import models
+    if url.startswith("sqlite"):
+        # Writers wait for the database lock instead of failing immediately
+        engine_kwargs.setdefault("connect_args", {"timeout": 30})
+    engine = create_engine(url, **engine_kwargs)
+    models.Base.metadata.create_all(bind=engine)
+    return engine, sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def latency_summary(samples):
+    """p50/p95/p99 in milliseconds for a list of durations in seconds."""
+    return {
+        "p50_ms": round(percentile(samples, 50) * 1000, 3),
+        "p95_ms": round(percentile(samples, 95) * 1000, 3),
+        "p99_ms": round(percentile(samples, 99) * 1000, 3),
+    }
@@ -0,0 +1,107 @@
+# benchmarks/group_commit.py
+# Deposit throughput and latency with one commit per deposit against group
+# commit (LedgerWriter) at several batch waits. Each worker deposits into its
+# own account, so the difference is the commit count, not row contention.
+#   python -m benchmarks.group_commit --workers 32 --deposits 200 --wait-ms 0 1 5
+import argparse
+import threading
+import time
+from sqlalchemy import func, select
+from app.db import models
+from app.services import account_service
+from app.services.group_commit import LedgerWriter
+from benchmarks.common import bench_database_url, latency_summary, make_session_factory, throwaway_postgres
+
+
+def seed(SessionLocal, count):
+    db = SessionLocal()
+    user = models.User(name="Bench User", email=f"bench-{time.time_ns()}@smartbank.com", hashed_password="x")
+    db.add(user)
+    db.commit()  # account numbers are reserved on their own connection
+    accounts = [models.Account(user_id=user.id, account_type="savings", balance=0) for _ in range(count)]
+    db.add_all(accounts)
+    db.commit()
+    result = user.id, [a.id for a in accounts]
+    db.close()
+    return result
+
+
+def run(workers, deposits, deposit):
+    """Start `workers` threads each calling deposit(index) `deposits` times; return (elapsed, latencies)."""
+    latencies = []
+
+    def worker(index):
+        samples = []
+        for _ in range(deposits):
+            started = time.perf_counter()
+            deposit(index)
+            samples.append(time.perf_counter() - started)
+        latencies.extend(samples)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(workers)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - started, latencies
+
+
+def report(name, elapsed, latencies, batches=None):
+    summary = latency_summary(latencies)
+    batch = f"{len(latencies) / batches:>7.1f}" if batches else f"{1:>7.1f}"
+    print(f"{name:<18} {len(latencies) / elapsed:>10.0f} {batch} "
+          f"{summary['p50_ms']:>8.2f} {summary['p95_ms']:>8.2f} {summary['p99_ms']:>8.2f}")
+
+
+def bench(url, args):
+    engine, SessionLocal = make_session_factory(url, pool_size=args.workers + 1, max_overflow=0)
+    user_id, account_ids = seed(SessionLocal, args.workers)
+    print(f"{'mode':<18} {'deposits/s':>10} {'batch':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+
+    sessions = [SessionLocal() for _ in range(args.workers)]
+    elapsed, latencies = run(
+        args.workers, args.deposits,
+        lambda i: account_service.deposit_money(sessions[i], user_id, account_ids[i], args.amount)
+    )
+    for db in sessions:
+        db.close()
+    report("commit per deposit", elapsed, latencies)
+
+    for wait_ms in args.wait_ms:
+        writer = LedgerWriter(engine, args.batch, wait_ms / 1000)
+        elapsed, latencies = run(
+            args.workers, args.deposits,
+            lambda i: writer.submit("deposit", user_id, account_ids[i], args.amount).result()
+        )
+        report(f"group, wait {wait_ms:g}ms", elapsed, latencies, writer.commits)
+
+    db = SessionLocal()
+    total = db.execute(select(func.sum(models.Account.balance)).where(models.Account.id.in_(account_ids))).scalar_one()
+    ledger = db.execute(select(func.count()).where(models.Transaction.account_id.in_(account_ids))).scalar_one()
+    db.close()
+    expected = args.workers * args.deposits * (1 + len(args.wait_ms))
+    print(f"\nbalance check: {'ok' if total == expected * args.amount and ledger == expected else 'MISMATCH'}")
+    engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Group commit benchmark")
+    parser.add_argument("--url", help="database URL (default: BENCH_DATABASE_URL or a temp SQLite file)")
+    parser.add_argument("--postgres", action="store_true", help="run against a throwaway local PostgreSQL")
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--deposits", type=int, default=100, help="deposits per worker and mode")
+    parser.add_argument("--amount", type=int, default=100, help="minor units per deposit")
+    parser.add_argument("--batch", type=int, default=64, help="GROUP_COMMIT_MAX_BATCH")
+    parser.add_argument("--wait-ms", type=float, nargs="+", default=[0, 2, 10], help="GROUP_COMMIT_MAX_WAIT_MS values")
+    args = parser.parse_args()
+
+    if args.postgres:
+        with throwaway_postgres() as url:
+            bench(url, args)
+    else:
+        bench(bench_database_url(args.url), args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+# benchmarks/hot_account.py
+# Transfer throughput into one hot recipient account as its number of balance
+# slots varies. Every worker pays the same merchant from its own account, so
+# the only shared row is the merchant's (or, with slots, one of its slots).
+# After each run the slots are compacted and every account is reconciled
+# against its ledger.
+#   python -m benchmarks.hot_account --postgres --workers 32 --slots 0 1 4 16 64
+# On SQLite every write takes the database-wide lock, so slots cannot help
+# there; use --postgres or --url for meaningful numbers.
+import argparse
+import threading
+import time
+from app.core.config import settings
+from app.db import models
+from app.services import account_service
+from app.services.hot_accounts import compact, set_balance_slots
+from app.services.reconciliation import reconcile_range
+from benchmarks.common import bench_database_url, latency_summary, make_session_factory, throwaway_postgres
+
+OPENING_BALANCE = 100_000_000  # minor units
+
+
+def seed(SessionLocal, payers):
+    db = SessionLocal()
+    user = models.User(name="Bench User", email=f"bench-{time.time_ns()}@smartbank.com", hashed_password="x")
+    db.add(user)
+    db.commit()  # account numbers are reserved on their own connection
+    merchant = models.Account(user_id=user.id, account_type="current", balance=0)
+    accounts = [models.Account(user_id=user.id, account_type="current", balance=OPENING_BALANCE) for _ in range(payers)]
+    db.add_all([merchant, *accounts])
+    db.flush()
+    db.add_all([models.Transaction(account_id=a.id, type="deposit", amount=OPENING_BALANCE) for a in accounts])
+    db.commit()
+    result = user.id, (merchant.id, merchant.account_number), [a.id for a in accounts]
+    db.close()
+    return result
+
+
+def run(SessionLocal, user_id, merchant_number, payer_ids, transfers, amount):
+    """Each payer transfers `transfers` times to the merchant on its own thread; returns (elapsed, latencies, errors)."""
+    latencies, errors = [], []
+
+    def worker(payer_id):
+        db = SessionLocal()
+        samples = []
+        try:
+            for _ in range(transfers):
+                started = time.perf_counter()
+                try:
+                    account_service.transfer_money(db, user_id, payer_id, merchant_number, amount)
+                except Exception as e:
+                    db.rollback()
+                    errors.append(repr(e))
+                    continue
+                samples.append(time.perf_counter() - started)
+        finally:
+            db.close()
+        latencies.extend(samples)
+
+    threads = [threading.Thread(target=worker, args=(payer_id,)) for payer_id in payer_ids]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - started, latencies, errors
+
+
+def bench(url, args):
+    # Keep the benchmark about contention, not about the daily limit
+    settings.DAILY_LIMITS["current"] = 10**12
+    engine, SessionLocal = make_session_factory(url, pool_size=args.workers + 1, max_overflow=0)
+    user_id, (merchant_id, merchant_number), payer_ids = seed(SessionLocal, args.workers)
+    print(f"database: {engine.url.render_as_string(hide_password=True)}, workers: {args.workers}")
+    print(f"{'slots':>6} {'transfers/s':>12} {'failed':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+
+    drifted = False
+    for slots in args.slots:
+        db = SessionLocal()
+        set_balance_slots(db, merchant_id, slots)
+        db.close()
+        elapsed, latencies, errors = run(SessionLocal, user_id, merchant_number, payer_ids, args.transfers, args.amount)
+        summary = latency_summary(latencies)
+        print(f"{slots:>6} {len(latencies) / elapsed:>12.0f} {len(errors):>7} "
+              f"{summary['p50_ms']:>8.2f} {summary['p95_ms']:>8.2f} {summary['p99_ms']:>8.2f}")
+
+        db = SessionLocal()
+        compact(db)
+        lo, hi = min(merchant_id, *payer_ids), max(merchant_id, *payer_ids) + 1
+        _, _, drifts = reconcile_range(db.connection(), lo, hi)
+        db.close()
+        drifted = drifted or bool(drifts)
+
+    print(f"\nledger check: {'MISMATCH' if drifted else 'ok'}")
+    engine.dispose()
+    raise SystemExit(1 if drifted else 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hot recipient account benchmark")
+    parser.add_argument("--url", help="database URL (default: BENCH_DATABASE_URL or a temp SQLite file)")
+    parser.add_argument("--postgres", action="store_true", help="run against a throwaway local PostgreSQL")
+    parser.add_argument("--workers", type=int, default=32, help="concurrent payers")
+    parser.add_argument("--transfers", type=int, default=100, help="transfers per worker and slot count")
+    parser.add_argument("--amount", type=int, default=100, help="minor units per transfer")
+    parser.add_argument("--slots", type=int, nargs="+", default=[0, 1, 4, 16, 64], help="balance_slots values to compare")
+    args = parser.parse_args()
+
+    if args.postgres:
+        with throwaway_postgres() as url:
+            bench(url, args)
+    else:
+        bench(bench_database_url(args.url), args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# benchmarks/login_throughput.py
+# Logins/sec and p99 login latency through user_service.authenticate_user as the
+# password-hashing executor size varies. Requests that the executor sheds
+# (503) are counted separately rather than timed.
+import argparse
+import os
+import threading
+import time
+from fastapi import HTTPException
+from app.core import security
+from app.core.config import settings
+from app.db import models
+from app.services import user_service
+from benchmarks.common import bench_database_url, make_session_factory, latency_summary
+
+
+def seed_users(SessionLocal, users, password):
+    hashed = security.pwd_context.hash(password.encode("utf-8"))
+    db = SessionLocal()
+    emails = [f"login-{time.time_ns()}-{i}@smartbank.com" for i in range(users)]
+    db.add_all([models.User(name="Login User", email=e, hashed_password=hashed) for e in emails])
+    db.commit()
+    db.close()
+    return emails
+
+
+def run(SessionLocal, emails, password, clients, logins_per_client):
+    latencies, shed = [], []
+
+    def client(index):
+        db = SessionLocal()
+        try:
+            for n in range(logins_per_client):
+                email = emails[(index + n) % len(emails)]
+                started = time.perf_counter()
+                try:
+                    assert user_service.authenticate_user(db, email, password)
+                except HTTPException:
+                    shed.append(1)
+                    continue
+                latencies.append(time.perf_counter() - started)
+        finally:
+            db.close()
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return latencies, len(shed), time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Login throughput vs password-hash executor size")
+    parser.add_argument("--url")
+    parser.add_argument("--clients", type=int, default=32, help="concurrent login callers")
+    parser.add_argument("--logins", type=int, default=10, help="logins per caller")
+    parser.add_argument("--sizes", default=f"1,2,4,{os.cpu_count()}", help="executor sizes to try")
+    parser.add_argument("--max-queue", type=int, default=settings.PASSWORD_HASH_MAX_QUEUE)
+    args = parser.parse_args()
+
+    password = "Secure6!"
+    engine, SessionLocal = make_session_factory(bench_database_url(args.url), pool_size=args.clients)
+    emails = seed_users(SessionLocal, 100, password)
+    print(f"bcrypt rounds={settings.BCRYPT_ROUNDS} clients={args.clients} max_queue={args.max_queue}")
+
+    for size in sorted({int(s) for s in args.sizes.split(",")}):
+        security.configure_password_hasher(size, args.max_queue)
+        latencies, shed, elapsed = run(SessionLocal, emails, password, args.clients, args.logins)
+        summary = latency_summary(latencies)
+        print(f"workers={size:3} logins/sec={len(latencies) / elapsed:8.1f} p99_ms={summary['p99_ms']:9.1f} shed_503={shed}")
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
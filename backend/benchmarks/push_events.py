@@ -0,0 +1,168 @@
+# benchmarks/push_events.py
+# WebSocket push updates against one uvicorn worker: memory per idle
+# connection, and publish-to-deliver latency while deposits are flowing.
+#   python -m benchmarks.push_events --connections 2000 --users 200 --rate 200 --seconds 10
+# --postgres runs against a throwaway PostgreSQL with EVENTS_BACKEND=postgres,
+# so every event also makes the round trip through NOTIFY and the listener.
+# The server runs in a subprocess (so its RSS is the worker's own), the clients
+# in this process. Latency is measured from the event's published_at (stamped
+# by the server when the transaction commits) to its arrival at the client.
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime
+from benchmarks.common import bench_database_url, latency_summary, make_session_factory, throwaway_postgres
+
+
+def seed(url, users):
+    """Users with one account each; returns [(account_id, token), ...]."""
+    from app.db import models
+    from app.services.user_service import create_token
+
+    engine, SessionLocal = make_session_factory(url)
+    db = SessionLocal()
+    people = [
+        models.User(name=f"Push User {i}", email=f"push-{time.time_ns()}-{i}@smartbank.com", hashed_password="x", token_version=0)
+        for i in range(users)
+    ]
+    db.add_all(people)
+    db.commit()  # the accounts need the user ids
+    accounts = [models.Account(user_id=user.id, account_type="savings", balance=0) for user in people]
+    db.add_all(accounts)
+    db.commit()
+    result = [(account.id, create_token(user)) for account, user in zip(accounts, people)]
+    db.close()
+    engine.dispose()
+    return result
+
+
+def rss_kb(pid) -> int:
+    with open(f"/proc/{pid}/status") as f:
+        return next(int(line.split()[1]) for line in f if line.startswith("VmRSS:"))
+
+
+def start_server(url, backend):
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning", "--ws-max-queue", "32"],
+        env={**os.environ, "DATABASE_URL": url, "EVENTS_BACKEND": backend},
+    )
+    for _ in range(100):
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            return server, port
+        except OSError:
+            time.sleep(0.1)
+    server.kill()
+    raise SystemExit("server did not start")
+
+
+async def bench(port, pid, accounts, args):
+    import httpx
+    import websockets
+
+    base = f"127.0.0.1:{port}"
+    latencies = []
+
+    async def listen(ws):
+        async for message in ws:
+            event = json.loads(message)
+            latencies.append((datetime.utcnow() - datetime.fromisoformat(event["published_at"])).total_seconds())
+
+    idle_rss = rss_kb(pid)
+    started = time.perf_counter()
+    sockets = []
+    for n in range(args.connections):
+        _, token = accounts[n % len(accounts)]
+        sockets.append(await websockets.connect(f"ws://{base}/accounts/events?token={token}", max_queue=None))
+    connect_seconds = time.perf_counter() - started
+    await asyncio.sleep(1)
+    connected_rss = rss_kb(pid)
+    print(f"connections:        {len(sockets)} over {len(accounts)} users, opened in {connect_seconds:.1f}s")
+    print(f"server RSS:         {idle_rss / 1024:.1f} MB idle -> {connected_rss / 1024:.1f} MB connected "
+          f"({(connected_rss - idle_rss) / max(len(sockets), 1):.1f} KB per connection)")
+
+    listeners = [asyncio.create_task(listen(ws)) for ws in sockets]
+    deposits = failed = 0
+    async with httpx.AsyncClient(base_url=f"http://{base}", timeout=30) as http:
+        async def deposit():
+            nonlocal deposits, failed
+            account_id, token = random.choice(accounts)
+            try:
+                response = await http.post("/accounts/deposit", json={"account_id": account_id, "amount": 1},
+                                           headers={"Authorization": f"Bearer {token}"})
+            except httpx.HTTPError:
+                failed += 1
+                return
+            if response.status_code == 200:
+                deposits += 1
+            else:
+                failed += 1
+
+        started = time.perf_counter()
+        pending = set()
+        for n in range(int(args.rate * args.seconds)):
+            # Open loop: deposits start on schedule whether or not earlier ones finished
+            await asyncio.sleep(max(0.0, started + n / args.rate - time.perf_counter()))
+            pending.add(asyncio.create_task(deposit()))
+        await asyncio.gather(*pending)
+        elapsed = time.perf_counter() - started
+    await asyncio.sleep(1)
+    active_rss = rss_kb(pid)
+
+    for ws in sockets:
+        await ws.close()
+    for task in listeners:
+        task.cancel()
+    summary = latency_summary(latencies)
+    print(f"deposits:           {deposits} in {elapsed:.1f}s ({deposits / elapsed:.0f}/s), {failed} failed")
+    print(f"events delivered:   {len(latencies)} ({len(latencies) / elapsed:.0f}/s, "
+          f"{args.connections / len(accounts):.0f} connections per user)")
+    print(f"publish -> deliver: p50 {summary['p50_ms']:.2f} ms, p95 {summary['p95_ms']:.2f} ms, p99 {summary['p99_ms']:.2f} ms")
+    print(f"server RSS active:  {active_rss / 1024:.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WebSocket push benchmark")
+    parser.add_argument("--url", help="database URL (default: BENCH_DATABASE_URL or a temp SQLite file)")
+    parser.add_argument("--postgres", action="store_true", help="run against a throwaway local PostgreSQL")
+    parser.add_argument("--connections", type=int, default=1000)
+    parser.add_argument("--users", type=int, default=100, help="connections are spread over this many users")
+    parser.add_argument("--rate", type=float, default=100, help="deposits per second during the active phase")
+    parser.add_argument("--seconds", type=float, default=10, help="length of the active phase")
+    args = parser.parse_args()
+
+    # One descriptor per connection on both ends
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+    if args.postgres:
+        with throwaway_postgres() as url:
+            run(url, "postgres", args)
+    else:
+        run(bench_database_url(args.url), "local", args)
+
+
+def run(url, backend, args):
+    accounts = seed(url, args.users)
+    server, port = start_server(url, backend)
+    print(f"events backend: {backend}")
+    try:
+        asyncio.run(bench(port, server.pid, accounts, args))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# benchmarks/serialization.py
+# Per-item cost of rendering GET /accounts/ bodies: FastAPI's response_model
+# path (validate, serialize, encode) against the FAST_SERIALIZATION path
+# (prebuilt TypeAdapter straight to bytes). Serialization only, no HTTP or SQL.
+#   python -m benchmarks.serialization --sizes 1 10 100 1000
+import argparse
+import time
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+
+
+def load(count):
+    """`count` accounts as ORM instances and as column-select rows, from an in-memory SQLite."""
+    from app.db import models
+    from app.services.account_service import ACCOUNT_COLUMNS
+
+    engine = create_engine("sqlite://")
+    # ACCOUNT_COLUMNS reads the balance slots too, so every table is needed
+    models.Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(models.Account), [
+            {"account_number": f"{n:010d}", "balance": n * 12345, "account_type": "savings", "user_id": 1}
+            for n in range(count)
+        ])
+    with Session(engine) as db:
+        objects = db.scalars(select(models.Account)).all()
+        db.expunge_all()
+        rows = db.execute(select(*ACCOUNT_COLUMNS)).all()
+    return objects, rows
+
+
+def complete(coroutine):
+    # serialize_response never suspends for an `async def` route, so step it once
+    # instead of paying for an event loop per call
+    try:
+        coroutine.send(None)
+    except StopIteration as done:
+        return done.value
+    raise RuntimeError("serialize_response suspended")
+
+
+def timed(fn, repeat):
+    fn()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        body = fn()
+    return (time.perf_counter() - started) / repeat, body
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 100, 1000])
+    parser.add_argument("--items", type=int, default=200000, help="items serialized per measurement")
+    args = parser.parse_args()
+
+    from app.api.v1 import serialization
+    from app.db import schemas
+
+    field = create_model_field("response", list[schemas.AccountOut], mode="serialization")
+
+    def response_model(content, response_class):
+        encoded = complete(serialize_response(field=field, response_content=content))
+        return response_class(encoded).body
+
+    print(f"{'items':>6} {'path':<34} {'us/item':>8} {'us/response':>12}")
+    for size in args.sizes:
+        objects, rows = load(size)
+        paths = (
+            ("response_model, ORM objects", lambda: response_model(objects, JSONResponse)),
+            ("response_model, rows", lambda: response_model(rows, JSONResponse)),
+            ("response_model, rows, orjson", lambda: response_model(rows, ORJSONResponse)),
+            ("TypeAdapter, rows (fast path)",
+             lambda: serialization.render(serialization.account_list, serialization.as_dicts(rows)).body),
+        )
+        repeat = max(args.items // size, 5)
+        bodies = {}
+        for name, fn in paths:
+            seconds, bodies[name] = timed(fn, repeat)
+            print(f"{size:>6} {name:<34} {seconds / size * 1e6:>8.2f} {seconds * 1e6:>12.1f}")
+        assert bodies["TypeAdapter, rows (fast path)"] == bodies["response_model, ORM objects"]
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# benchmarks/startup.py
+# Cold-start cost of an API worker: time to import app.main, connections opened
+# by the import (should be 0), and latency of the first request with and without
+# database access. Each run is a fresh interpreter, as a new worker would be.
+#   python -m benchmarks.startup --runs 10
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from benchmarks.common import bench_database_url
+
+
+def child():
+    started = time.perf_counter()
+    from app.main import app
+    imported = time.perf_counter()
+    from app.db.database import pool_metrics
+    connects_on_import = pool_metrics["primary"].connects
+
+    from fastapi.testclient import TestClient
+    client = TestClient(app)
+    t0 = time.perf_counter()
+    client.get("/")
+    t1 = time.perf_counter()
+    # Unknown user: one indexed lookup, no password hashing
+    client.post("/auth/login", json={"email": "nobody@smartbank.com", "password": "Secure6!"})
+    t2 = time.perf_counter()
+    print(json.dumps({
+        "import_ms": (imported - started) * 1000,
+        "connects_on_import": connects_on_import,
+        "first_request_ms": (t1 - t0) * 1000,
+        "first_db_request_ms": (t2 - t1) * 1000,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API worker cold-start benchmark")
+    parser.add_argument("--url")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child()
+        return
+
+    url = bench_database_url(args.url)
+    env = dict(os.environ, DATABASE_URL=url)
+    # Schema is created once, by the migration CLI, as in a deploy
+    subprocess.run([sys.executable, "-m", "app.jobs.migrate"], env=env, check=True, capture_output=True)
+
+    runs = []
+    for _ in range(args.runs):
+        out = subprocess.run(
+            [sys.executable, "-m", "benchmarks.startup", "--child"],
+            env=env, capture_output=True, text=True, check=True
+        ).stdout
+        runs.append(json.loads(out.strip().splitlines()[-1]))
+
+    print(f"runs:                 {len(runs)}")
+    print(f"connections on import: {max(r['connects_on_import'] for r in runs)}")
+    for key in ("import_ms", "first_request_ms", "first_db_request_ms"):
+        samples = [r[key] for r in runs]
+        print(f"{key + ':':21} median {statistics.median(samples):8.1f}  max {max(samples):8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# benchmarks/transfer_concurrency.py
+# Many workers hammer transfers back and forth between the same two accounts.
+# Reports transfers/sec and checks that no update was lost: the pair's total
+# balance is unchanged and each balance matches its ledger.
+import argparse
+import threading
+import time
+from sqlalchemy import select, func, case
+from app.core.config import settings
+from app.db import models
+from app.services import account_service
+from benchmarks.common import bench_database_url, make_session_factory, latency_summary
+
+OPENING_BALANCE = 100_000_000  # minor units
+
+
+def seed(SessionLocal):
+    db = SessionLocal()
+    user = models.User(name="Bench User", email=f"bench-{time.time_ns()}@smartbank.com", hashed_password="x")
+    db.add(user)
+    db.commit()  # account numbers are reserved on their own connection
+    accounts = [
+        models.Account(user_id=user.id, account_type="current", balance=OPENING_BALANCE)
+        for _ in range(2)
+    ]
+    db.add_all(accounts)
+    db.flush()
+    db.add_all([models.Transaction(account_id=a.id, type="deposit", amount=OPENING_BALANCE) for a in accounts])
+    db.commit()
+    result = user.id, [(a.id, a.account_number) for a in accounts]
+    db.close()
+    return result
+
+
+def worker(SessionLocal, user_id, pair, transfers, amount, index, latencies, errors):
+    (a_id, a_number), (b_id, b_number) = pair
+    db = SessionLocal()
+    try:
+        for n in range(transfers):
+            # Alternate direction per worker so lock ordering is actually exercised
+            if (index + n) % 2:
+                source, target = a_id, b_number
+            else:
+                source, target = b_id, a_number
+            started = time.perf_counter()
+            try:
+                account_service.transfer_money(db, user_id, source, target, amount)
+            except Exception as e:
+                db.rollback()
+                errors.append(repr(e))
+                continue
+            latencies.append(time.perf_counter() - started)
+    finally:
+        db.close()
+
+
+def ledger_balance(db, account_id):
+    signed = case(
+        (models.Transaction.type == "deposit", models.Transaction.amount),
+        else_=-models.Transaction.amount,
+    )
+    return db.execute(
+        select(func.coalesce(func.sum(signed), 0)).where(models.Transaction.account_id == account_id)
+    ).scalar_one()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent transfer benchmark")
+    parser.add_argument("--url", help="database URL (default: BENCH_DATABASE_URL or a temp SQLite file)")
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--transfers", type=int, default=200, help="transfers per worker")
+    parser.add_argument("--amount", type=int, default=100, help="minor units per transfer")
+    args = parser.parse_args()
+
+    # Keep the benchmark about contention, not about the daily limit
+    settings.DAILY_LIMITS["current"] = 10**12
+
+    url = bench_database_url(args.url)
+    engine, SessionLocal = make_session_factory(url, pool_size=args.workers, max_overflow=0)
+    user_id, pair = seed(SessionLocal)
+
+    latencies, errors = [], []
+    threads = [
+        threading.Thread(target=worker, args=(SessionLocal, user_id, pair, args.transfers, args.amount, i, latencies, errors))
+        for i in range(args.workers)
+    ]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    db = SessionLocal()
+    balances = [db.get(models.Account, account_id).balance for account_id, _ in pair]
+    ledgers = [ledger_balance(db, account_id) for account_id, _ in pair]
+    db.close()
+    engine.dispose()
+
+    lost = sum(balances) != 2 * OPENING_BALANCE or balances != ledgers
+    print(f"database:        {engine.url.render_as_string(hide_password=True)}")
+    print(f"workers:         {args.workers}")
+    print(f"transfers ok:    {len(latencies)}  failed: {len(errors)}")
+    print(f"transfers/sec:   {len(latencies) / elapsed:.1f}")
+    print(f"latency:         {latency_summary(latencies)}")
+    print(f"balances:        {balances}  ledger: {ledgers}")
+    print(f"lost updates:    {'YES' if lost else 0}")
+    if errors:
+        print(f"first error:     {errors[0]}")
+    raise SystemExit(1 if lost else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+# benchmarks/user_search.py
+# Admin customer search latency over a large user table: user_search.search_users
+# (prefix, then substring statements over the migration 0012 indexes) against a
+# single ILIKE '%q%' scan of the users table. The schema is built by the
+# migrations, so on PostgreSQL the pg_trgm and prefix indexes are in place.
+#   python -m benchmarks.user_search --postgres --users 1000000   # throwaway PostgreSQL
+#   python -m benchmarks.user_search --users 200000               # SQLite: both are scans
+# Users are seeded once per database and reused on later runs with the same --url.
+import argparse
+import random
+import string
+import time
+from sqlalchemy import create_engine, func, insert, or_, select
+from sqlalchemy.orm import sessionmaker
+from app.db.models import User
+from app.jobs.migrate import upgrade
+from app.services.user_search import search_users
+from benchmarks.common import bench_database_url, latency_summary, throwaway_postgres
+
+SYLLABLES = ["ka", "ri", "so", "ma", "lee", "an", "de", "vi", "ro", "na", "shi", "to", "bel", "ar", "mi", "jo", "ne", "ru", "pa", "tha"]
+DOMAINS = ["smartbank.com", "gmail.com", "example.org", "mail.in"]
+
+
+def word(rng):
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))).capitalize()
+
+
+def seed(SessionLocal, users):
+    db = SessionLocal()
+    existing = db.execute(select(func.count()).select_from(User)).scalar_one()
+    rng = random.Random(existing)
+    for start in range(existing, users, 10_000):
+        rows = []
+        for n in range(start, min(start + 10_000, users)):
+            first, last = word(rng), word(rng)
+            rows.append({"name": f"{first} {last}", "email": f"{first}.{last}{n}@{rng.choice(DOMAINS)}".lower(),
+                         "hashed_password": "x"})
+        db.execute(insert(User), rows)
+        db.commit()
+    db.close()
+    return max(users - existing, 0)
+
+
+def queries(SessionLocal, count):
+    """A mix of what admins type: name and email prefixes, fragments, short and missing terms."""
+    db = SessionLocal()
+    top = db.execute(select(func.max(User.id))).scalar_one()
+    sample = db.execute(select(User.name, User.email).where(User.id.in_(random.sample(range(1, top + 1), count)))).all()
+    db.close()
+    mixed = []
+    for n, (name, email) in enumerate(sample):
+        kind = n % 5
+        if kind == 0:
+            mixed.append(("email prefix", email[:random.randint(4, 10)]))
+        elif kind == 1:
+            mixed.append(("full name", name))
+        elif kind == 2:
+            last = name.split()[-1]
+            mixed.append(("surname prefix", last[:random.randint(3, len(last))]))
+        elif kind == 3:
+            start = random.randint(1, len(email) - 6)
+            mixed.append(("substring", email[start:start + 5]))
+        else:
+            mixed.append(("short", random.choice(string.ascii_lowercase) + random.choice(string.ascii_lowercase)))
+    mixed += [("miss", "zzqx" + random.choice(string.ascii_lowercase)) for _ in range(count // 10)]
+    random.shuffle(mixed)
+    return mixed
+
+
+def bench(url, args):
+    upgrade(database_url=url)
+    engine = create_engine(url)
+    SessionLocal = sessionmaker(bind=engine, autoflush=False)
+    started = time.perf_counter()
+    added = seed(SessionLocal, args.users)
+    print(f"users: {args.users} ({added} seeded in {time.perf_counter() - started:.1f}s)")
+    if engine.dialect.name == "postgresql":
+        with engine.begin() as conn:
+            conn.exec_driver_sql("ANALYZE users")
+
+    db = SessionLocal()
+    mixed = queries(SessionLocal, args.queries)
+    by_kind = {}
+    for kind, query in mixed:
+        started = time.perf_counter()
+        found = search_users(db, query, args.limit)
+        by_kind.setdefault(kind, []).append((time.perf_counter() - started, len(found)))
+
+    print(f"\n{'query kind':>15} {'count':>6} {'hits':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    every = []
+    for kind, samples in sorted(by_kind.items()):
+        latencies = [s for s, _ in samples]
+        every += latencies
+        summary = latency_summary(latencies)
+        print(f"{kind:>15} {len(samples):>6} {sum(h for _, h in samples) / len(samples):>6.1f} "
+              f"{summary['p50_ms']:>8.2f} {summary['p95_ms']:>8.2f} {summary['p99_ms']:>8.2f}")
+    summary = latency_summary(every)
+    print(f"{'all':>15} {len(every):>6} {'':>6} {summary['p50_ms']:>8.2f} {summary['p95_ms']:>8.2f} {summary['p99_ms']:>8.2f}")
+
+    if args.scan_queries:
+        latencies = []
+        for _, query in mixed[:args.scan_queries]:
+            pattern = f"%{query}%"
+            started = time.perf_counter()
+            db.execute(select(User.id).where(or_(User.name.ilike(pattern), User.email.ilike(pattern))).limit(args.limit)).all()
+            latencies.append(time.perf_counter() - started)
+        summary = latency_summary(latencies)
+        print(f"{'ILIKE scan':>15} {len(latencies):>6} {'':>6} {summary['p50_ms']:>8.2f} {summary['p95_ms']:>8.2f} {summary['p99_ms']:>8.2f}")
+    db.close()
+    engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Admin customer search benchmark")
+    parser.add_argument("--url", help="database URL (default: BENCH_DATABASE_URL or a temp SQLite file)")
+    parser.add_argument("--postgres", action="store_true", help="run against a throwaway local PostgreSQL")
+    parser.add_argument("--users", type=int, default=200_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--scan-queries", type=int, default=20, help="queries to time against the ILIKE scan (0 skips it)")
+    args = parser.parse_args()
+
+    if args.postgres:
+        with throwaway_postgres() as url:
+            bench(url, args)
+    else:
+        bench(bench_database_url(args.url), args)
+
+
+if __name__ == "__main__":
+    main()
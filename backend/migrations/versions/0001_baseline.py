@@ -0,0 +1,65 @@
+"""baseline schema
+
+The schema as create_all() built it before migrations were introduced: users,
+accounts and transactions, with money stored as floats. Databases created that
+way are stamped at this revision and then upgraded:
+    python -m app.jobs.migrate --stamp 0001
+    python -m app.jobs.migrate
+
+Revision ID: 0001
+Revises:
+Create Date: 2025-10-18 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("hashed_password", sa.String(), nullable=False),
+        sa.Column("is_admin", sa.Boolean(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+    op.create_index("ix_users_id", "users", ["id"])
+
+    op.create_table(
+        "accounts",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("account_number", sa.String(), nullable=True),
+        sa.Column("account_type", sa.String(), nullable=False),
+        sa.Column("balance", sa.Float(), nullable=True),
+        sa.Column("user_id", sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_accounts_account_number", "accounts", ["account_number"], unique=True)
+    op.create_index("ix_accounts_id", "accounts", ["id"])
+
+    op.create_table(
+        "transactions",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("account_id", sa.Integer(), nullable=True),
+        sa.Column("type", sa.String(), nullable=True),
+        sa.Column("amount", sa.Float(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["account_id"], ["accounts.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_transactions_id", "transactions", ["id"])
+
+
+def downgrade():
+    op.drop_table("transactions")
+    op.drop_table("accounts")
+    op.drop_table("users")
@@ -0,0 +1,44 @@
+"""per-account daily usage counters
+
+- account_daily_usage: money moved out of an account per UTC day and type,
+  checked against the daily limits. Fill it for an existing ledger with
+  python -m app.jobs.backfill_daily_usage.
+- transactions(account_id, type, created_at): the backfill's range scans.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2025-10-18 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "account_daily_usage",
+        sa.Column("account_id", sa.Integer(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("type", sa.String(), nullable=False),
+        sa.Column("total", sa.Float(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["account_id"], ["accounts.id"]),
+        sa.PrimaryKeyConstraint("account_id", "day", "type"),
+    )
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_transactions_account_type_created", "transactions", ["account_id", "type", "created_at"],
+            postgresql_concurrently=True
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_transactions_account_type_created", "transactions", postgresql_concurrently=True)
+    op.drop_table("account_daily_usage")
@@ -0,0 +1,27 @@
+"""users.token_version
+
+Bumped on password change; access tokens carrying an older version are
+rejected.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2025-10-18 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # A constant server default: no table rewrite on PostgreSQL 11+
+    op.add_column("users", sa.Column("token_version", sa.Integer(), server_default="0", nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table("users") as batch:
+        batch.drop_column("token_version")
@@ -0,0 +1,29 @@
+"""transaction history index
+
+- transactions(account_id, created_at, id): keyset pagination and the
+  streaming export of an account's history.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2025-10-18 00:00:00
+"""
+from alembic import op
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_transactions_account_created_id", "transactions", ["account_id", "created_at", "id"],
+            postgresql_concurrently=True
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_transactions_account_created_id", "transactions", postgresql_concurrently=True)
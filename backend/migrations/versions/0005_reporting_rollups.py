@@ -0,0 +1,46 @@
+"""reporting rollups
+
+- rollup_daily_type_totals, rollup_daily_account_flows: per-day aggregates
+  kept current with every ledger write. Fill them for an existing ledger with
+  python -m app.jobs.rebuild_rollups.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2025-10-18 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "rollup_daily_type_totals",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("account_type", sa.String(), nullable=False),
+        sa.Column("tx_type", sa.String(), nullable=False),
+        sa.Column("bucket", sa.Integer(), nullable=False),
+        sa.Column("total", sa.Float(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("day", "account_type", "tx_type", "bucket"),
+    )
+    op.create_table(
+        "rollup_daily_account_flows",
+        sa.Column("account_id", sa.Integer(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("inflow", sa.Float(), nullable=False),
+        sa.Column("outflow", sa.Float(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["account_id"], ["accounts.id"]),
+        sa.PrimaryKeyConstraint("account_id", "day"),
+    )
+
+
+def downgrade():
+    op.drop_table("rollup_daily_account_flows")
+    op.drop_table("rollup_daily_type_totals")
@@ -0,0 +1,29 @@
+"""id blocks
+
+- id_blocks: high-water marks of block-allocated sequences (account numbers).
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2025-10-18 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "id_blocks",
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("next_value", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("name"),
+    )
+
+
+def downgrade():
+    op.drop_table("id_blocks")
@@ -0,0 +1,66 @@
+"""money as integer minor units
+
+Every money column changes from float rupees to BIGINT paise, rounding each
+value to the nearest paisa. NULL balances become 0. PostgreSQL converts in
+place with ALTER ... TYPE ... USING. SQLite cannot change a column type, so
+the values are scaled first and batch mode then rebuilds each table.
+
+Take a backup before upgrading a database that holds real balances.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2025-10-18 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+# Frozen here rather than imported from app.core.money: a migration must keep
+# doing what it did when it was written.
+MINOR_UNITS = 100
+
+MONEY_COLUMNS = {
+    "accounts": ("balance",),
+    "transactions": ("amount",),
+    "account_daily_usage": ("total",),
+    "rollup_daily_type_totals": ("total",),
+    "rollup_daily_account_flows": ("inflow", "outflow"),
+}
+
+
+def _is_postgresql():
+    return op.get_bind().dialect.name == "postgresql"
+
+
+def upgrade():
+    postgresql = _is_postgresql()
+    for table, columns in MONEY_COLUMNS.items():
+        if not postgresql:
+            op.execute(f"UPDATE {table} SET " + ", ".join(
+                f"{c} = ROUND(COALESCE({c}, 0) * {MINOR_UNITS})" for c in columns
+            ))
+        with op.batch_alter_table(table) as batch:
+            for c in columns:
+                batch.alter_column(
+                    c, existing_type=sa.Float(), type_=sa.BigInteger(), nullable=False,
+                    postgresql_using=f"ROUND(COALESCE({c}, 0) * {MINOR_UNITS})::bigint"
+                )
+
+
+def downgrade():
+    postgresql = _is_postgresql()
+    for table, columns in MONEY_COLUMNS.items():
+        with op.batch_alter_table(table) as batch:
+            for c in columns:
+                batch.alter_column(
+                    c, existing_type=sa.BigInteger(), type_=sa.Float(),
+                    nullable=table == "accounts",  # only the baseline balance was nullable
+                    postgresql_using=f"{c}::double precision / {MINOR_UNITS}"
+                )
+        if not postgresql:
+            op.execute(f"UPDATE {table} SET " + ", ".join(f"{c} = {c} * 1.0 / {MINOR_UNITS}" for c in columns))
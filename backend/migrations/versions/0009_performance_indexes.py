@@ -0,0 +1,33 @@
+"""performance indexes
+
+- accounts.user_id: listing a user's accounts and the admin per-user summaries
+  filter or group on it, and were full scans.
+- transactions.created_at: date-range rollup rebuilds and backfills.
+
+On PostgreSQL the indexes are built CONCURRENTLY so a live system keeps
+accepting writes while they build.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2025-10-18 00:00:00
+"""
+from alembic import op
+
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        op.create_index("ix_accounts_user_id", "accounts", ["user_id"], postgresql_concurrently=True)
+        op.create_index("ix_transactions_created_at", "transactions", ["created_at"], postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_transactions_created_at", "transactions", postgresql_concurrently=True)
+        op.drop_index("ix_accounts_user_id", "accounts", postgresql_concurrently=True)
@@ -0,0 +1,39 @@
+"""hot-account balance slots
+
+- accounts.balance_slots: number of sub-balance slots incoming credits are
+  spread over; 0 (every existing account) keeps the single balance row.
+- account_balance_slots: the slots, folded back into accounts.balance by the
+  compactor job.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2025-10-18 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # A constant server default: no table rewrite on PostgreSQL 11+
+    op.add_column("accounts", sa.Column("balance_slots", sa.Integer(), server_default="0", nullable=False))
+    op.create_table(
+        "account_balance_slots",
+        sa.Column("account_id", sa.Integer(), nullable=False),
+        sa.Column("slot", sa.Integer(), nullable=False),
+        sa.Column("amount", sa.BigInteger(), nullable=False),
+        sa.ForeignKeyConstraint(["account_id"], ["accounts.id"]),
+        sa.PrimaryKeyConstraint("account_id", "slot"),
+    )
+
+
+def downgrade():
+    # Slot amounts would be lost; run the compactor before downgrading
+    op.drop_table("account_balance_slots")
+    with op.batch_alter_table("accounts") as batch:
+        batch.drop_column("balance_slots")
@@ -0,0 +1,27 @@
+"""idempotency key claim tokens
+
+- idempotency_keys.claim_token: identifies the request holding a pending key.
+  The outcome is stored only under that token, in the same transaction as the
+  money move, so a retry that takes over a stale key can never move money twice.
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2025-10-18 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0011"
+down_revision = "0010"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("idempotency_keys", sa.Column("claim_token", sa.String(length=32), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table("idempotency_keys") as batch:
+        batch.drop_column("claim_token")
@@ -0,0 +1,46 @@
+"""user search indexes
+
+Indexes for the admin customer search (app.services.user_search), PostgreSQL
+only; SQLite answers the same LIKE statements with a scan.
+
+- users lower(name), lower(email) with text_pattern_ops: prefix LIKEs and
+  exact matches, in any collation.
+- users lower(name), lower(email) with pg_trgm GIN: substring LIKEs, including
+  the prefix of a later word of the name.
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2025-10-18 00:00:00
+"""
+from alembic import op
+
+
+revision = "0012"
+down_revision = "0011"
+branch_labels = None
+depends_on = None
+
+INDEXES = {
+    "ix_users_name_prefix": "(lower(name) text_pattern_ops)",
+    "ix_users_email_prefix": "(lower(email) text_pattern_ops)",
+    "ix_users_name_trgm": "USING gin (lower(name) gin_trgm_ops)",
+    "ix_users_email_trgm": "USING gin (lower(email) gin_trgm_ops)",
+}
+
+
+def upgrade():
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        for name, definition in INDEXES.items():
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON users {definition}")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    with op.get_context().autocommit_block():
+        for name in INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
@@ -0,0 +1,101 @@
+# backend/tests/conftest.py
+import os
+import tempfile
+
+# Run the suite against a throwaway SQLite database unless TEST_DATABASE_URL
+# points somewhere else. This must happen before the app (and its .env) is imported.
+os.environ["DATABASE_URL"] = os.getenv("TEST_DATABASE_URL") or (
+    "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="smartbank-test-"), "test.db")
+)
+# Cheap bcrypt cost for tests; one above the minimum so the rehash-on-login path can run
+os.environ.setdefault("BCRYPT_ROUNDS", "5")
+# Any key will do for a throwaway database
+os.environ.setdefault("ACCOUNT_NUMBER_KEY", "test-account-numbers")
+# Exercise the request instrumentation on every test request
+os.environ.setdefault("METRICS_ENABLED", "true")
+
+# Build the schema the way deployments do, through the migrations
+from app.jobs.migrate import upgrade  # noqa: E402
+
+upgrade()
+
+import uuid  # noqa: E402
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+PASSWORD = "Secure6!"
+
+
+# ---------------- Shared fixtures ----------------
+# Factories rather than values, so one test can make as many users and
+# accounts as it needs.
+
+@pytest.fixture(scope="session")
+def client():
+    from backend.app.main import app
+    return TestClient(app)
+
+
+@pytest.fixture
+def login(client):
+    """login(email, password=PASSWORD) -> auth headers, or None if the login fails"""
+    def login(email, password=PASSWORD):
+        response = client.post("/auth/login", json={"email": email, "password": password})
+        return {"Authorization": f"Bearer {response.json()['access_token']}"} if response.status_code == 200 else None
+    return login
+
+
+@pytest.fixture
+def register(client, login):
+    """register(name, email=None, password=PASSWORD) -> (user, auth headers)"""
+    def register(name="Test User", email=None, password=PASSWORD):
+        email = email or f"{uuid.uuid4().hex[:10]}@smartbank.com"
+        user = client.post("/auth/register", json={"name": name, "email": email, "password": password}).json()
+        return user, login(email, password)
+    return register
+
+
+@pytest.fixture
+def user_headers(register):
+    """user_headers() -> auth headers of a fresh user"""
+    return lambda: register()[1]
+
+
+@pytest.fixture
+def make_admin():
+    def make_admin(user_id):
+        from app.db import database, models
+        db = database.SessionLocal()
+        db.get(models.User, user_id).is_admin = True
+        db.commit()
+        db.close()
+    return make_admin
+
+
+@pytest.fixture
+def admin_headers(register, make_admin):
+    """admin_headers() -> auth headers of a fresh admin"""
+    def admin_headers():
+        user, headers = register("Admin User")
+        make_admin(user["id"])
+        return headers
+    return admin_headers
+
+
+@pytest.fixture
+def open_account(client, user_headers):
+    """open_account(initial_deposit=100.0, headers=None, account_type="savings") -> (account, headers)
+
+    Opens the account for a fresh user unless headers are given."""
+    def open_account(initial_deposit=100.0, headers=None, account_type="savings"):
+        headers = headers or user_headers()
+        response = client.post("/accounts/", json={"account_type": account_type, "initial_deposit": initial_deposit}, headers=headers)
+        assert response.status_code == 200
+        return response.json(), headers
+    return open_account
+
+
+@pytest.fixture
+def balances(client):
+    """balances(headers) -> {account id: balance} for that user"""
+    return lambda headers: {a["id"]: a["balance"] for a in client.get("/accounts/", headers=headers).json()}
@@ -0,0 +1,84 @@
+# backend/tests/test_account_numbers.py
+
+import uuid
+import pytest
+from sqlalchemy import select, update
+from app.core.config import settings
+from app.db import account_numbers, database, models
+from app.db.upsert import insert_for
+from app.db.account_numbers import format_account_number, is_valid_account_number, sequence_value_of
+
+
+def test_account_numbers_are_unique_ten_digit_and_check_digit_valid():
+    numbers = [format_account_number(v) for v in range(5000)]
+
+    assert len(set(numbers)) == len(numbers)
+    assert all(len(n) == 10 and n[0] != "0" and is_valid_account_number(n) for n in numbers)
+    assert [sequence_value_of(n) for n in numbers[:100]] == list(range(100))
+
+
+def test_opened_accounts_get_valid_distinct_numbers(open_account):
+    first = open_account()[0]["account_number"]
+    second = open_account()[0]["account_number"]
+
+    assert first != second
+    assert is_valid_account_number(first) and is_valid_account_number(second)
+
+
+def test_block_skips_numbers_taken_by_legacy_accounts(open_account):
+    # Arrange: a legacy account already holds a number from the next block
+    account, _ = open_account()
+    db = database.SessionLocal()
+    next_value = db.get(models.IdBlock, account_numbers.SEQUENCE_NAME).next_value
+    taken = format_account_number(next_value + 3)
+    db.execute(update(models.Account).where(models.Account.id == account["id"]).values(account_number=taken))
+    db.commit()
+
+    # Act
+    allocator = account_numbers.BlockAllocator(block_size=10)
+    allocated = allocator.allocate(db.get_bind(), insert_for(db), 10)
+    db.close()
+
+    # Assert
+    assert taken not in allocated
+    assert len(set(allocated)) == 10
+
+
+def test_a_session_that_already_wrote_reserves_in_its_own_transaction():
+    # Arrange: the next account needs a new block, in a session that has written a user
+    db = database.SessionLocal()
+    account_numbers._allocator_for(db.get_bind()).forget()
+    start = db.scalar(select(models.IdBlock.next_value).where(models.IdBlock.name == account_numbers.SEQUENCE_NAME)) or 0
+    block = settings.ACCOUNT_NUMBER_BLOCK_SIZE
+
+    def open_with_new_user():
+        user = models.User(name="Block User", email=f"{uuid.uuid4().hex[:10]}@smartbank.com", hashed_password="x")
+        db.add(user)
+        db.flush()
+        account = models.Account(user_id=user.id, account_type="savings", balance=0)
+        db.add(account)
+        db.flush()
+        return account
+
+    # Act: the first reservation is rolled back with its transaction
+    open_with_new_user()
+    db.rollback()
+    account = open_with_new_user()
+    db.commit()
+
+    # Assert
+    assert is_valid_account_number(account.account_number)
+    assert start <= sequence_value_of(account.account_number) < start + block
+    assert db.get(models.IdBlock, account_numbers.SEQUENCE_NAME).next_value == start + block
+    db.close()
+
+
+def test_a_missing_key_fails_the_first_allocation_not_the_import(monkeypatch):
+    monkeypatch.setattr(settings, "ACCOUNT_NUMBER_KEY", None)
+    monkeypatch.setattr(account_numbers, "_round_keys_cache", [])
+    db = database.SessionLocal()
+    account_numbers._allocator_for(db.get_bind()).forget()
+
+    with pytest.raises(RuntimeError, match="ACCOUNT_NUMBER_KEY"):
+        account_numbers.next_account_number(db)
+    db.close()
@@ -0,0 +1,93 @@
+# backend/tests/test_admin.py
+
+import uuid
+from app.db import database
+
+
+def test_user_listing_is_cursor_paginated_and_never_exposes_password_hashes(client, register, admin_headers):
+    headers = admin_headers()
+    prefix = uuid.uuid4().hex[:8]
+    for n in range(5):
+        register(f"Listed {n}", email=f"{prefix}-{n}@smartbank.com")
+
+    ids, cursor = [], None
+    while True:
+        params = {"email_prefix": prefix, "limit": 2, "include_count": True}
+        if cursor:
+            params["cursor"] = cursor
+        page = client.get("/admin/users", params=params, headers=headers).json()
+        assert page["total"] == 5
+        assert all("hashed_password" not in u for u in page["items"])
+        ids.extend(u["id"] for u in page["items"])
+        cursor = page.get("next_cursor")
+        if not cursor:
+            break
+
+    assert len(ids) == 5 and ids == sorted(ids)
+
+
+def test_user_listing_includes_account_summaries_on_request(client, register, open_account, admin_headers):
+    headers = admin_headers()
+    prefix = uuid.uuid4().hex[:8]
+    _, customer = register("Customer", email=f"{prefix}@smartbank.com")
+    for deposit in (100.0, 50.0):
+        open_account(deposit, headers=customer)
+
+    page = client.get("/admin/users", params={"email_prefix": prefix, "include_accounts": True}, headers=headers).json()
+
+    assert page["items"][0]["accounts"] == {"count": 2, "total_balance": 150.0}
+
+
+def test_reports_are_served_from_rollups_and_match_a_rebuild(client, open_account, admin_headers):
+    from datetime import datetime
+    from app.services.reporting import rebuild_rollups
+
+    headers = admin_headers()
+    account, customer = open_account(100.0, account_type="current")
+    client.post("/accounts/withdraw", json={"account_id": account["id"], "amount": 30.0}, headers=customer)
+
+    def flows():
+        return client.get(f"/admin/reports/accounts/{account['id']}/flows", headers=headers).json()["days"]
+
+    today = flows()
+    assert [(d["inflow"], d["outflow"], d["net"], d["count"]) for d in today] == [(100.0, 30.0, 70.0, 2)]
+
+    report = client.get("/admin/reports/daily", params={"account_type": "current"}, headers=headers).json()
+    day = datetime.utcnow().date().isoformat()
+    assert any(r["day"] == day and r["tx_type"] == "withdraw" and r["total"] >= 30.0 for r in report["rows"])
+
+    # Rebuilding from the ledger reproduces the incrementally maintained rollups
+    db = database.SessionLocal()
+    rebuild_rollups(db)
+    db.close()
+    assert flows() == today
+
+
+def test_rebuilding_a_range_replaces_those_days_only(client, open_account, admin_headers):
+    from datetime import datetime, timedelta
+    from app.db import models
+    from app.services.reporting import rebuild_rollups
+
+    # Arrange: stale flow rows on two past days that have no ledger entries
+    headers = admin_headers()
+    account, _ = open_account(100.0)
+    today = datetime.utcnow().date()
+    stale, outside = today - timedelta(days=10), today - timedelta(days=20)
+    db = database.SessionLocal()
+    db.add_all([
+        models.DailyAccountFlow(account_id=account["id"], day=day, inflow=500, outflow=0, count=1)
+        for day in (stale, outside)
+    ])
+    db.commit()
+
+    # Act
+    processed = rebuild_rollups(db, stale, today)
+    db.close()
+
+    # Assert: the range now matches the ledger; the day before it is untouched
+    days = client.get(
+        f"/admin/reports/accounts/{account['id']}/flows",
+        params={"start": outside.isoformat(), "end": today.isoformat()}, headers=headers
+    ).json()["days"]
+    assert [(d["day"], d["inflow"]) for d in days] == [(outside.isoformat(), 5.0), (today.isoformat(), 100.0)]
+    assert processed >= 1
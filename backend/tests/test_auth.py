@@ -0,0 +1,97 @@
+# backend/tests/test_auth.py
+
+from app.core.auth import principal_cache
+
+
+def test_repeated_requests_are_served_from_the_principal_cache(client, register):
+    user, headers = register()
+    principal_cache.pop(user["id"])
+
+    client.get("/accounts/", headers=headers)
+    hits_before = principal_cache.hits
+    client.get("/accounts/", headers=headers)
+
+    assert principal_cache.hits == hits_before + 1
+    assert principal_cache.get(user["id"]).id == user["id"]
+
+
+def test_password_change_revokes_old_tokens(client, register):
+    user, old_headers = register()
+
+    response = client.post("/auth/change-password", json={
+        "current_password": "Secure6!",
+        "new_password": "Secure7!"
+    }, headers=old_headers)
+    assert response.status_code == 200
+    new_headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    assert client.get("/accounts/", headers=old_headers).status_code == 401
+    assert client.get("/accounts/", headers=new_headers).status_code == 200
+
+
+def test_a_committed_role_change_drops_the_cached_principal_in_every_worker(client, register):
+    from app.core.events import stage_invalidation
+    from app.db import database, models
+
+    # Arrange: this worker has the principal cached
+    user, headers = register()
+    client.get("/accounts/", headers=headers)
+    assert principal_cache.get(user["id"]) is not None
+
+    def change_role(commit):
+        # As another worker would: through the broker, not this worker's cache
+        db = database.SessionLocal()
+        db.get(models.User, user["id"]).is_admin = True
+        stage_invalidation(db, user["id"])
+        db.commit() if commit else db.rollback()
+        db.close()
+
+    # Act / Assert: a rolled-back change keeps the entry, a committed one drops it
+    change_role(commit=False)
+    assert principal_cache.get(user["id"]) is not None
+    change_role(commit=True)
+    assert principal_cache.get(user["id"]) is None
+    assert client.get("/admin/users", headers=headers).status_code == 200
+
+
+def test_admin_routes_reject_non_admins(client, register):
+    _, headers = register()
+    response = client.get("/admin/users", headers=headers)
+    assert response.status_code == 403
+
+
+def test_login_upgrades_hashes_made_at_an_older_cost(client, register):
+    from passlib.hash import bcrypt
+    from app.db import database, models
+
+    user, _ = register()
+    db = database.SessionLocal()
+    db_user = db.get(models.User, user["id"])
+    db_user.hashed_password = bcrypt.using(rounds=4).hash("Secure6!")
+    db.commit()
+
+    response = client.post("/auth/login", json={"email": user["email"], "password": "Secure6!"})
+
+    assert response.status_code == 200
+    db.refresh(db_user)
+    assert bcrypt.from_string(db_user.hashed_password).rounds == 5
+    db.close()
+
+
+def test_password_hashing_sheds_load_when_the_queue_is_full():
+    import threading
+    import pytest
+    from fastapi import HTTPException
+    from app.core import security
+
+    hasher = security.PasswordHasher(workers=1, max_queue=0)
+    release = threading.Event()
+    hasher.submit(release.wait)
+    try:
+        with pytest.raises(HTTPException) as exc:
+            hasher.submit(security.pwd_context.hash, b"Secure6!")
+        assert exc.value.status_code == 503
+        assert exc.value.headers["Retry-After"] == "1"
+    finally:
+        release.set()
+        hasher.shutdown()
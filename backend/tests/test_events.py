@@ -0,0 +1,67 @@
+# backend/tests/test_events.py
+
+import asyncio
+import pytest
+from starlette.websockets import WebSocketDisconnect
+from app.core import events
+
+
+def token_of(headers):
+    return headers["Authorization"].split()[1]
+
+
+def test_committed_moves_are_pushed_to_the_account_owner(client, open_account):
+    # Arrange
+    account, headers = open_account(50)
+    payer, payer_headers = open_account(100)
+
+    with client.websocket_connect(f"/accounts/events?token={token_of(headers)}") as websocket:
+        # Act
+        client.post("/accounts/deposit", json={"account_id": account["id"], "amount": 20.5}, headers=headers)
+        client.post("/accounts/transfer", json={
+            "from_account_id": payer["id"], "to_account_number": account["account_number"], "amount": 10
+        }, headers=payer_headers)
+        deposit, incoming = websocket.receive_json(), websocket.receive_json()
+
+    # Assert
+    assert {k: deposit[k] for k in ("event", "account_id", "type", "amount", "balance")} == {
+        "event": "transaction", "account_id": account["id"], "type": "deposit", "amount": 20.5, "balance": 70.5
+    }
+    assert "published_at" in deposit
+    assert (incoming["account_id"], incoming["type"], incoming["amount"], incoming["balance"]) == (account["id"], "deposit", 10.0, 80.5)
+
+
+def test_rolled_back_moves_publish_nothing(client, open_account):
+    account, headers = open_account(5)
+
+    with client.websocket_connect("/accounts/events", headers=headers) as websocket:
+        rejected = client.post("/accounts/withdraw", json={"account_id": account["id"], "amount": 50}, headers=headers)
+        client.post("/accounts/withdraw", json={"account_id": account["id"], "amount": 2}, headers=headers)
+        event = websocket.receive_json()
+
+    assert rejected.status_code == 400
+    assert (event["type"], event["amount"], event["balance"]) == ("withdraw", 2.0, 3.0)
+
+
+def test_connections_without_a_valid_token_are_refused(client):
+    with pytest.raises(WebSocketDisconnect) as refused:
+        with client.websocket_connect("/accounts/events?token=not-a-jwt"):
+            pass
+    assert refused.value.code == 1008
+
+
+def test_a_subscriber_that_falls_behind_is_cut_off():
+    async def scenario():
+        broker = events.LocalBroker(max_queue=2)
+        subscription = broker.subscribe(user_id=1)
+        for n in range(4):
+            broker.dispatch(1, {"n": n})
+        await asyncio.sleep(0)
+        received = [await subscription.get() for _ in range(3)]
+        broker.unsubscribe(subscription)
+        return received, broker.connections()
+
+    received, connections = asyncio.run(scenario())
+
+    assert received == [{"n": 0}, {"n": 1}, events.OVERFLOW]
+    assert connections == 0
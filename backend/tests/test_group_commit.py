@@ -0,0 +1,78 @@
+# backend/tests/test_group_commit.py
+
+from concurrent.futures import ThreadPoolExecutor
+from app.core.config import settings
+from app.db import database, models
+from app.services.group_commit import LedgerWriter
+
+
+def ledger(account_id):
+    db = database.SessionLocal()
+    rows = db.query(models.Transaction.type, models.Transaction.amount).filter(models.Transaction.account_id == account_id).all()
+    db.close()
+    return sorted(rows)
+
+
+def test_grouped_deposits_and_withdrawals_are_all_applied(client, open_account, balances, monkeypatch):
+    # Arrange
+    monkeypatch.setattr(settings, "GROUP_COMMIT_ENABLED", True)
+    account, headers = open_account()
+
+    def move(n):
+        route = "deposit" if n % 2 else "withdraw"
+        return client.post(f"/accounts/{route}", json={"account_id": account["id"], "amount": 1.5}, headers=headers)
+
+    # Act
+    with ThreadPoolExecutor(8) as pool:
+        responses = list(pool.map(move, range(20)))
+
+    # Assert
+    assert [r.status_code for r in responses] == [200] * 20
+    assert balances(headers)[account["id"]] == 100.0
+    assert ledger(account["id"]).count(("deposit", 150)) == 10
+    assert ledger(account["id"]).count(("withdraw", 150)) == 10
+
+
+def test_grouped_failures_are_reported_per_request(client, open_account, monkeypatch):
+    monkeypatch.setattr(settings, "GROUP_COMMIT_ENABLED", True)
+    account, headers = open_account(5.0)
+
+    response = client.post("/accounts/withdraw", json={"account_id": account["id"], "amount": 6.0}, headers=headers)
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Insufficient balance"
+
+
+def test_a_failing_move_is_rolled_back_alone_and_the_batch_commits_once(open_account):
+    account, _ = open_account(10.0)
+    writer = LedgerWriter(database.engine, max_batch=3, max_wait=5)
+
+    futures = [
+        writer.submit("deposit", account["user_id"], account["id"], 500),
+        writer.submit("withdraw", account["user_id"], account["id"], 100000),
+        writer.submit("withdraw", account["user_id"], account["id"], 200),
+    ]
+
+    assert futures[0].result(timeout=10).balance == 1500
+    assert str(futures[1].exception(timeout=10)) == "Insufficient balance"
+    assert futures[2].result(timeout=10).balance == 1300
+    assert (writer.commits, writer.moves) == (1, 3)
+    assert ledger(account["id"]) == [("deposit", 500), ("deposit", 1000), ("withdraw", 200)]
+
+
+def test_a_move_cancelled_while_queued_is_dropped_and_the_writer_keeps_going(open_account):
+    # Arrange: the writer holds the first move while it waits for a second
+    account, _ = open_account(100.0)
+    writer = LedgerWriter(database.engine, max_batch=2, max_wait=1)
+    cancelled = writer.submit("deposit", account["user_id"], account["id"], 10000)
+
+    # Act
+    assert cancelled.cancel()
+    kept = writer.submit("deposit", account["user_id"], account["id"], 10000)
+    later = writer.submit("deposit", account["user_id"], account["id"], 10000)
+
+    # Assert
+    assert kept.result(timeout=10).balance == 20000
+    assert later.result(timeout=10).balance == 30000
+    assert ledger(account["id"]) == [("deposit", 10000), ("deposit", 10000), ("deposit", 10000)]
+    assert writer.moves == 2
@@ -0,0 +1,114 @@
+# backend/tests/test_hot_accounts.py
+
+import pytest
+from app.db import database, models
+from app.services.hot_accounts import compact
+from app.services.reconciliation import reconcile_range
+
+
+@pytest.fixture
+def hot_account(client, register, make_admin, open_account):
+    """hot_account(slots=4) -> (account in hot mode, its admin owner's headers)"""
+    def hot_account(slots=4):
+        user, headers = register("Hot User")
+        make_admin(user["id"])
+        account, _ = open_account(0, headers=headers, account_type="current")
+        response = client.put(f"/admin/accounts/{account['id']}/balance-slots", json={"slots": slots}, headers=headers)
+        assert response.json() == {"id": account["id"], "balance_slots": slots}
+        return account, headers
+    return hot_account
+
+
+def stored(account_id):
+    db = database.SessionLocal()
+    balance = db.get(models.Account, account_id).balance
+    slots = db.query(models.AccountBalanceSlot).filter_by(account_id=account_id).all()
+    db.close()
+    return balance, sum(s.amount for s in slots)
+
+
+def test_credits_to_a_hot_account_land_in_slots_and_show_in_its_balance(client, open_account, balances, hot_account):
+    # Arrange
+    merchant, merchant_headers = hot_account()
+    payer, payer_headers = open_account(100)
+
+    # Act
+    for _ in range(5):
+        response = client.post("/accounts/transfer", json={
+            "from_account_id": payer["id"], "to_account_number": merchant["account_number"], "amount": 10
+        }, headers=payer_headers)
+        assert response.status_code == 200
+    client.post("/accounts/deposit", json={"account_id": merchant["id"], "amount": 7.5}, headers=merchant_headers)
+
+    # Assert
+    assert stored(merchant["id"]) == (0, 5750)
+    assert balances(merchant_headers)[merchant["id"]] == 57.5
+    db = database.SessionLocal()
+    try:
+        _, _, drifts = reconcile_range(db.connection(), merchant["id"], merchant["id"] + 1)
+    finally:
+        db.close()
+    assert drifts == []
+
+
+def test_batch_transfers_credit_hot_recipients_through_slots(client, open_account, balances, hot_account):
+    # Arrange
+    merchant, merchant_headers = hot_account()
+    payee, payee_headers = open_account(0)
+    payer, payer_headers = open_account(100)
+
+    # Act
+    response = client.post("/accounts/transfers/batch", json={
+        "from_account_id": payer["id"],
+        "transfers": [
+            {"to_account_number": merchant["account_number"], "amount": 10},
+            {"to_account_number": payee["account_number"], "amount": 20},
+            {"to_account_number": merchant["account_number"], "amount": 5},
+        ]
+    }, headers=payer_headers)
+
+    # Assert
+    assert response.status_code == 200
+    assert stored(merchant["id"]) == (0, 1500)
+    assert balances(merchant_headers)[merchant["id"]] == 15.0
+    assert stored(payee["id"]) == (2000, 0)
+    assert balances(payer_headers)[payer["id"]] == 65.0
+
+
+def test_debits_spend_slot_credits_but_never_overdraw(client, hot_account):
+    # Arrange
+    merchant, headers = hot_account()
+    client.post("/accounts/deposit", json={"account_id": merchant["id"], "amount": 30}, headers=headers)
+
+    # Act
+    spent = client.post("/accounts/withdraw", json={"account_id": merchant["id"], "amount": 20}, headers=headers)
+    overdrawn = client.post("/accounts/withdraw", json={"account_id": merchant["id"], "amount": 20}, headers=headers)
+
+    # Assert
+    assert spent.status_code == 200 and spent.json()["balance"] == 10.0
+    assert overdrawn.status_code == 400 and overdrawn.json()["detail"] == "Insufficient balance"
+    assert stored(merchant["id"]) == (-2000, 3000)
+
+
+def test_compaction_folds_slots_into_the_balance(client, balances, hot_account):
+    # Arrange
+    merchant, headers = hot_account()
+    client.post("/accounts/deposit", json={"account_id": merchant["id"], "amount": 12}, headers=headers)
+    client.post("/accounts/withdraw", json={"account_id": merchant["id"], "amount": 2}, headers=headers)
+
+    # Act
+    db = database.SessionLocal()
+    try:
+        accounts, moved = compact(db)
+    finally:
+        db.close()
+
+    # Assert
+    assert accounts >= 1 and moved >= 1200
+    assert stored(merchant["id"]) == (1000, 0)
+    assert balances(headers)[merchant["id"]] == 10.0
+
+    # Turning hot mode off folds whatever arrived since
+    client.post("/accounts/deposit", json={"account_id": merchant["id"], "amount": 1}, headers=headers)
+    client.put(f"/admin/accounts/{merchant['id']}/balance-slots", json={"slots": 0}, headers=headers)
+    assert stored(merchant["id"]) == (1100, 0)
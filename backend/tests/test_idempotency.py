@@ -0,0 +1,204 @@
+# backend/tests/test_idempotency.py
+
+import asyncio
+import json
+import uuid
+import pytest
+from pydantic import BaseModel
+from app.api.v1.idempotency import idempotent, request_fingerprint, response_cache
+from app.core.config import settings
+from app.db import database, schemas
+from app.db.database import run_sync
+from app.services import account_service, idempotency
+
+
+def test_retried_deposit_is_applied_once(client, open_account, balances):
+    account, headers = open_account()
+    headers = {**headers, "Idempotency-Key": uuid.uuid4().hex}
+    payload = {"account_id": account["id"], "amount": 25.0}
+
+    first = client.post("/accounts/deposit", json=payload, headers=headers)
+    retry = client.post("/accounts/deposit", json=payload, headers=headers)
+
+    assert first.status_code == retry.status_code == 200
+    assert retry.json() == first.json()
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert balances(headers)[account["id"]] == 125.0
+
+
+def test_retried_batch_transfer_is_applied_once(client, open_account, balances):
+    source, payer = open_account(100.0)
+    target, payee = open_account(0.0)
+    headers = {**payer, "Idempotency-Key": uuid.uuid4().hex}
+    payload = {
+        "from_account_id": source["id"], "mode": "best_effort",
+        "transfers": [{"to_account_number": target["account_number"], "amount": 30.0}]
+    }
+
+    first = client.post("/accounts/transfers/batch", json=payload, headers=headers)
+    retry = client.post("/accounts/transfers/batch", json=payload, headers=headers)
+
+    assert first.status_code == retry.status_code == 200
+    assert retry.json() == first.json()
+    assert first.json()["mode"] == "best_effort"
+    assert balances(payee)[target["id"]] == 30.0
+
+
+def test_retry_is_answered_from_the_table_when_not_cached(client, open_account, balances):
+    account, headers = open_account()
+    key = uuid.uuid4().hex
+    headers = {**headers, "Idempotency-Key": key}
+    payload = {"account_id": account["id"], "amount": 10.0}
+
+    client.post("/accounts/withdraw", json=payload, headers=headers)
+    response_cache.clear()
+    retry = client.post("/accounts/withdraw", json=payload, headers=headers)
+
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert balances(headers)[account["id"]] == 90.0
+
+
+def test_failed_outcomes_are_replayed_too(client, open_account):
+    account, headers = open_account(5.0)
+    headers = {**headers, "Idempotency-Key": uuid.uuid4().hex}
+    payload = {"account_id": account["id"], "amount": 50.0}
+
+    first = client.post("/accounts/withdraw", json=payload, headers=headers)
+    retry = client.post("/accounts/withdraw", json=payload, headers=headers)
+
+    assert first.status_code == retry.status_code == 400
+    assert retry.json() == {"detail": "Insufficient balance"}
+
+
+def test_reusing_a_key_for_a_different_request_is_rejected(client, open_account, balances):
+    account, headers = open_account()
+    headers = {**headers, "Idempotency-Key": uuid.uuid4().hex}
+
+    client.post("/accounts/deposit", json={"account_id": account["id"], "amount": 1.0}, headers=headers)
+    response = client.post("/accounts/deposit", json={"account_id": account["id"], "amount": 2.0}, headers=headers)
+
+    assert response.status_code == 422
+    assert balances(headers)[account["id"]] == 101.0
+
+
+class Outcome(BaseModel):
+    value: int
+
+
+def run_duplicates(user_id, key, other_worker=None):
+    """
+    Two requests with one key, the second arriving while the first is still
+    executing: in this worker, or (with other_worker) in another worker that
+    only this worker's table can tell about. Returns (responses, executions).
+    """
+    executions = []
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def execute(before_commit):
+            executions.append(key)
+            await release.wait()
+            result = {"value": len(executions)}
+            await run_sync(first_db, lambda session: (before_commit(session, result), session.commit()))
+            return result
+
+        first_db, duplicate_db = database.SessionLocal(), database.SessionLocal()
+        if other_worker is None:
+            first = asyncio.create_task(idempotent(first_db, user_id, key, "test", {}, Outcome, execute))
+        else:
+            first = asyncio.create_task(other_worker(first_db, release))
+        await asyncio.sleep(0.2)
+        duplicate = asyncio.create_task(idempotent(duplicate_db, user_id, key, "test", {}, Outcome, execute))
+        await asyncio.sleep(0.2)
+        assert not duplicate.done()  # it waits for the first
+        release.set()
+        responses = await asyncio.gather(first, duplicate)
+        first_db.close()
+        duplicate_db.close()
+        return responses
+
+    return asyncio.run(scenario()), executions
+
+
+def test_a_concurrent_duplicate_in_this_worker_waits_for_the_first(register):
+    user, _ = register()
+
+    (first, duplicate), executions = run_duplicates(user["id"], uuid.uuid4().hex)
+
+    assert len(executions) == 1
+    assert duplicate.headers["Idempotent-Replayed"] == "true"
+    assert json.loads(duplicate.body) == json.loads(first.body) == {"value": 1}
+
+
+def test_a_concurrent_duplicate_of_another_workers_request_polls_the_table(register):
+    user, _ = register()
+    key = uuid.uuid4().hex
+
+    async def other_worker(db, release):
+        # Claims the key through the table only, then stores its outcome
+        fingerprint = request_fingerprint("test", {})
+        assert await run_sync(db, idempotency.claim_key, user["id"], key, "test", fingerprint, "other") is None
+        await release.wait()
+        await run_sync(db, idempotency.store_outcome, user["id"], key, "other", 200, json.dumps({"value": 7}))
+
+    (_, duplicate), executions = run_duplicates(user["id"], key, other_worker)
+
+    assert executions == []
+    assert json.loads(duplicate.body) == {"value": 7}
+
+
+def test_a_stale_pending_key_is_taken_over_and_its_first_request_cannot_commit(
+    client, open_account, balances, monkeypatch
+):
+    # Arrange: another worker claimed the key and is slow to finish its deposit
+    account, headers = open_account()
+    key = uuid.uuid4().hex
+    payload = {"account_id": account["id"], "amount": 5.0}
+    fingerprint = request_fingerprint("deposit", schemas.MoneyRequest(**payload))
+    db = database.SessionLocal()
+    idempotency.claim_key(db, account["user_id"], key, "deposit", fingerprint, "slow-worker")
+    monkeypatch.setattr(settings, "IDEMPOTENCY_PENDING_TIMEOUT_SECONDS", 0)
+    monkeypatch.setattr(settings, "IDEMPOTENCY_WAIT_SECONDS", 0)
+
+    # Act: a retry takes the key over and deposits; then the slow worker tries to commit
+    retry = client.post("/accounts/deposit", json=payload, headers={**headers, "Idempotency-Key": key})
+
+    def store_slow_outcome(session, result):
+        idempotency.complete_key(session, account["user_id"], key, "slow-worker", 200, "{}")
+
+    with pytest.raises(idempotency.ClaimLost):
+        account_service.deposit_money(db, account["user_id"], account["id"], 500, store_slow_outcome)
+    db.rollback()
+    db.close()
+
+    # Assert: the money moved once, and the key holds the retry's response
+    assert retry.status_code == 200
+    assert balances(headers)[account["id"]] == 105.0
+    replay = client.post("/accounts/deposit", json=payload, headers={**headers, "Idempotency-Key": key})
+    assert replay.json() == retry.json()
+
+
+def test_the_stored_response_commits_with_the_money_move(client, open_account, balances, monkeypatch):
+    # Arrange: the commit that would carry both the deposit and its outcome fails
+    account, headers = open_account()
+    key = uuid.uuid4().hex
+    payload = {"account_id": account["id"], "amount": 5.0}
+    original = idempotency.complete_key
+
+    def complete_then_fail(*args):
+        original(*args)
+        raise RuntimeError("connection lost before COMMIT")
+
+    monkeypatch.setattr(idempotency, "complete_key", complete_then_fail)
+
+    # Act
+    with pytest.raises(RuntimeError):
+        client.post("/accounts/deposit", json=payload, headers={**headers, "Idempotency-Key": key})
+    monkeypatch.setattr(idempotency, "complete_key", original)
+    retry = client.post("/accounts/deposit", json=payload, headers={**headers, "Idempotency-Key": key})
+
+    # Assert: neither the money nor the key survived the failure, so the retry runs once
+    assert retry.status_code == 200
+    assert "Idempotent-Replayed" not in retry.headers
+    assert balances(headers)[account["id"]] == 105.0
@@ -0,0 +1,96 @@
+# backend/tests/test_import_customers.py
+
+import csv
+import io
+import json
+import uuid
+from app.db import database
+from app.jobs.import_customers import run
+from app.services.onboarding import hash_passwords, import_chunk, validate_chunk
+
+
+def new_email():
+    return f"{uuid.uuid4().hex[:10]}@smartbank.com"
+
+
+def write_csv(path, rows):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(("name", "email", "password", "account_type", "initial_deposit"))
+        writer.writerows(rows)
+
+
+def test_csv_import_creates_customers_accounts_and_opening_deposits(client, login, tmp_path):
+    # Arrange
+    saver, spender, bare = new_email(), new_email(), new_email()
+    path = tmp_path / "customers.csv"
+    write_csv(path, [
+        ("Saver", saver, "Secure6!", "savings", "250.75"),
+        ("Spender", spender, "Secure6!", "current", ""),
+        ("Bare", bare, "Secure6!", "", ""),
+    ])
+    report = io.StringIO()
+
+    # Act
+    result = run(str(path), workers=1, chunk_size=2, report=report)
+
+    # Assert
+    assert (result["rows"], result["users"], result["accounts"], result["errors"]) == (3, 3, 2, 0)
+    assert report.getvalue() == ""
+    accounts = client.get("/accounts/", headers=login(saver)).json()
+    assert [(a["account_type"], a["balance"]) for a in accounts] == [("savings", 250.75)]
+    history = client.get(f"/accounts/{accounts[0]['id']}/transactions", headers=login(saver)).json()
+    assert [(tx["type"], tx["amount"]) for tx in history["items"]] == [("deposit", 250.75)]
+    assert [a["balance"] for a in client.get("/accounts/", headers=login(spender)).json()] == [0.0]
+    assert client.get("/accounts/", headers=login(bare)).json() == []
+
+
+def test_rejected_rows_are_reported_and_the_rest_imported(login, register, tmp_path):
+    # Arrange
+    registered, fresh = new_email(), new_email()
+    register("Existing", email=registered)
+    path = tmp_path / "customers.ndjson"
+    path.write_text("\n".join([
+        json.dumps({"name": "Taken", "email": registered, "password": "Secure6!"}),
+        json.dumps({"name": "Fresh", "email": fresh, "password": "Secure6!", "account_type": "savings", "initial_deposit": 10}),
+        json.dumps({"name": "Again", "email": fresh, "password": "Secure6!"}),
+        json.dumps({"name": "Bad", "email": "not-an-email", "password": "short"}),
+        json.dumps({"name": "Broke", "email": new_email(), "password": "Secure6!", "account_type": "gold"}),
+        "{not json",
+    ]) + "\n")
+    report = io.StringIO()
+
+    # Act
+    result = run(str(path), workers=2, chunk_size=2, report=report)
+
+    # Assert
+    errors = {e["line"]: e for e in map(json.loads, report.getvalue().splitlines())}
+    assert (result["users"], result["accounts"], result["errors"]) == (1, 1, 5)
+    assert sorted(errors) == [1, 3, 4, 5, 6]
+    assert errors[1]["error"] == errors[3]["error"] == "Email already registered"
+    assert "email" in errors[4]["error"] and "password" in errors[4]["error"]
+    assert errors[5]["error"].startswith("account_type")
+    assert errors[6]["error"].startswith("Invalid JSON")
+    assert login(fresh) is not None
+
+
+def test_chunk_that_fails_in_the_database_is_replayed_row_by_row(client, login, register):
+    # Arrange: an email registered after the duplicate check ran
+    raced, other = new_email(), new_email()
+    valid, _ = validate_chunk([
+        (1, {"name": "Raced", "email": raced, "password": "Secure6!", "account_type": "savings", "initial_deposit": "5"}),
+        (2, {"name": "Other", "email": other, "password": "Secure6!", "account_type": "savings", "initial_deposit": "5"}),
+    ])
+    register("Racer", email=raced)
+    db = database.SessionLocal()
+
+    # Act
+    try:
+        users, accounts, errors = import_chunk(db, valid, hash_passwords(["Secure6!", "Secure6!"]))
+    finally:
+        db.close()
+
+    # Assert
+    assert (users, accounts) == (1, 1)
+    assert [e["line"] for e in errors] == [1]
+    assert [a["balance"] for a in client.get("/accounts/", headers=login(other)).json()] == [5.0]
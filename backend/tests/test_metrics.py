@@ -0,0 +1,68 @@
+# backend/tests/test_metrics.py
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from app.core import request_metrics
+from app.core.config import settings
+
+
+def server_timing(response):
+    entries = {}
+    for part in response.headers["server-timing"].split(", "):
+        name, *params = part.split(";")
+        entries[name] = dict(p.split("=", 1) for p in params)
+    return entries
+
+
+def test_responses_carry_server_timing_with_query_count_and_phases(client, open_account):
+    # Arrange
+    account, headers = open_account()
+
+    # Act
+    response = client.post("/accounts/withdraw", json={"account_id": account["id"], "amount": 10}, headers=headers)
+
+    # Assert
+    timing = server_timing(response)
+    assert response.status_code == 200
+    assert float(timing["app"]["dur"]) > 0
+    assert int(timing["db"]["desc"].strip('"').split()[0]) > 0
+    assert {"jwt", "limit", "commit"} <= timing.keys()
+
+
+def test_metrics_endpoint_exports_route_histograms_in_prometheus_format(client, open_account, monkeypatch):
+    # Arrange: every request counts as query-heavy
+    monkeypatch.setattr(settings, "METRICS_QUERY_WARN_THRESHOLD", 0)
+    account, headers = open_account()
+    client.get(f"/accounts/{account['id']}/transactions", headers=headers)
+
+    # Act
+    body = client.get("/metrics").text
+
+    # Assert
+    route = 'method="GET",route="/accounts/{account_id}/transactions"'
+    assert f'smartbank_http_request_duration_seconds_count{{{route}}} ' in body
+    assert f'smartbank_http_requests_total{{{route},status="200"}} ' in body
+    assert f'smartbank_query_heavy_requests_total{{{route}}} ' in body
+    assert "# TYPE smartbank_db_queries_per_request histogram" in body
+    assert 'smartbank_phase_seconds_total{method="POST",route="/auth/login",phase="bcrypt"}' in body
+
+
+def test_a_failing_statement_leaves_no_timing_state_on_its_connection():
+    # Arrange
+    engine = request_metrics.instrument_engine(create_engine("sqlite://"))
+    stats = request_metrics.RequestStats()
+    token = request_metrics._current.set(stats)
+
+    # Act
+    with engine.connect() as conn:
+        with pytest.raises(OperationalError):
+            conn.execute(text("SELECT * FROM missing_table"))
+        conn.execute(text("SELECT 1"))
+        info = dict(conn.info)
+    request_metrics._current.reset(token)
+    engine.dispose()
+
+    # Assert: only the statement that ran to completion is counted
+    assert stats.queries == 1
+    assert info == {}
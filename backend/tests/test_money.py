@@ -0,0 +1,66 @@
+# backend/tests/test_money.py
+
+from sqlalchemy import create_engine, inspect
+from app.core.money import to_minor
+from app.jobs.migrate import upgrade
+
+
+def test_amounts_are_exact_across_many_operations(client, open_account):
+    # Arrange
+    account, headers = open_account(0.1)
+
+    # Act: 0.1 + 0.2 * 10 drifts in float arithmetic
+    for _ in range(10):
+        response = client.post("/accounts/deposit", json={"account_id": account["id"], "amount": 0.2}, headers=headers)
+    client.post("/accounts/withdraw", json={"account_id": account["id"], "amount": 0.3}, headers=headers)
+
+    # Assert
+    assert response.json()["balance"] == 2.1
+    balance = client.get("/accounts/", headers=headers).json()[0]["balance"]
+    history = client.get(f"/accounts/{account['id']}/transactions", headers=headers).json()["items"]
+    assert balance == 1.8
+    assert history[0]["amount"] == 0.3
+
+
+def test_sub_paisa_amounts_are_rejected(client, open_account):
+    account, headers = open_account(10)
+
+    response = client.post("/accounts/deposit", json={"account_id": account["id"], "amount": 0.001}, headers=headers)
+
+    assert response.status_code == 422
+
+
+def test_to_minor_accepts_two_decimal_values_only():
+    assert to_minor(0.29) == 29
+    assert to_minor("1234.56") == 123456
+    assert to_minor(7) == 700
+    for bad in (0.295, float("nan"), "abc", True):
+        try:
+            to_minor(bad)
+        except ValueError:
+            continue
+        raise AssertionError(f"{bad!r} was accepted")
+
+
+def test_migration_moves_float_columns_to_minor_units(tmp_path):
+    # Arrange: a database at the last revision that stored floats
+    url = f"sqlite:///{tmp_path / 'legacy.db'}"
+    upgrade("0007", database_url=url)
+    engine = create_engine(url)
+    with engine.begin() as conn:
+        conn.exec_driver_sql("INSERT INTO users VALUES (1, 'Asha', 'asha@example.com', 'x', 0, 0)")
+        conn.exec_driver_sql("INSERT INTO accounts VALUES (1, '1000000001', 'savings', 0.1 + 0.2, 1)")
+        conn.exec_driver_sql("INSERT INTO accounts VALUES (2, '1000000002', 'savings', NULL, 1)")
+        conn.exec_driver_sql("INSERT INTO transactions VALUES (1, 1, 'deposit', 0.29, '2025-01-01 00:00:00')")
+
+    # Act
+    upgrade("0008", database_url=url)
+
+    # Assert
+    with engine.connect() as conn:
+        balances = conn.exec_driver_sql("SELECT balance, typeof(balance) FROM accounts ORDER BY id").all()
+        assert balances == [(30, "integer"), (0, "integer")]
+        assert conn.exec_driver_sql("SELECT amount FROM transactions").scalar_one() == 29
+        foreign_keys = inspect(conn).get_foreign_keys("transactions")
+    engine.dispose()
+    assert foreign_keys[0]["referred_table"] == "accounts"
@@ -0,0 +1,59 @@
+# backend/tests/test_pool_metrics.py
+
+import pytest
+from sqlalchemy import create_engine, exc
+from app.core.config import settings
+from app.db.database import engine_options
+from app.db.pool_metrics import PoolMetrics, TimedAsyncAdaptedQueuePool, TimedQueuePool
+
+
+def test_engine_options_carry_the_pool_settings(monkeypatch):
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 3)
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 2)
+    monkeypatch.setattr(settings, "DB_STATEMENT_TIMEOUT_MS", 1500)
+
+    sync = engine_options("sqlite:////tmp/bank.db")
+    asynchronous = engine_options("sqlite+aiosqlite:////tmp/bank.db", async_=True)
+    postgres = engine_options("postgresql+psycopg://bank@db/bank")
+
+    assert sync["poolclass"] is TimedQueuePool
+    assert (sync["pool_size"], sync["max_overflow"]) == (3, 2)
+    assert "connect_args" not in sync  # statement_timeout is PostgreSQL only
+    assert asynchronous["poolclass"] is TimedAsyncAdaptedQueuePool
+    assert postgres["connect_args"] == {"options": "-c statement_timeout=1500"}
+    # In-memory SQLite keeps its default single-connection pool
+    assert engine_options("sqlite://") == {}
+
+
+def test_pool_metrics_count_in_use_connections_waits_and_timeouts(tmp_path):
+    # Arrange: a pool of one connection that gives up waiting almost at once
+    url = f"sqlite:///{tmp_path / 'pool.db'}"
+    engine = create_engine(url, poolclass=TimedQueuePool, pool_size=1, max_overflow=0, pool_timeout=0.05)
+    metrics = PoolMetrics().attach(engine)
+
+    # Act
+    held = engine.connect()
+    busy = metrics.snapshot()
+    with pytest.raises(exc.TimeoutError):
+        engine.connect()
+    held.close()
+    idle = metrics.snapshot()
+    engine.dispose()
+
+    # Assert
+    assert (busy["pool"], busy["size"], busy["in_use"], busy["checked_in"]) == ("TimedQueuePool", 1, 1, 0)
+    assert (idle["in_use"], idle["checked_in"]) == (0, 1)
+    assert (idle["checkouts"], idle["checkins"], idle["connects"], idle["timeouts"]) == (1, 1, 1, 1)
+    # Both checkouts were timed; the one that timed out waited for pool_timeout
+    assert idle["wait_seconds"]["count"] == 2
+    assert idle["wait_seconds"]["sum"] >= 0.05
+
+
+def test_pool_metrics_endpoint_is_admin_only(client, user_headers, admin_headers):
+    forbidden = client.get("/admin/metrics/pool", headers=user_headers())
+    response = client.get("/admin/metrics/pool", headers=admin_headers())
+
+    assert forbidden.status_code == 403
+    primary = response.json()["primary"]
+    assert primary["checkouts"] >= 1
+    assert {"timeouts", "wait_seconds", "in_use", "size"} <= primary.keys()
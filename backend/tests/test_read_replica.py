@@ -0,0 +1,91 @@
+# backend/tests/test_read_replica.py
+
+import pytest
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import sessionmaker
+from backend.app.main import app
+from app.core.read_routing import HEADER
+from app.db import database, models
+from app.jobs.migrate import upgrade
+
+
+@pytest.fixture
+def replica(tmp_path):
+    """A second SQLite database standing in for the replica, which the test 'replicates' to by hand."""
+    url = f"sqlite:///{tmp_path / 'replica.db'}"
+    upgrade(database_url=url)
+    engine = create_engine(url)
+    ReplicaSession = sessionmaker(bind=engine, expire_on_commit=False)
+
+    def get_replica_db():
+        db = ReplicaSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[database.get_replica_session] = get_replica_db
+    yield engine
+    del app.dependency_overrides[database.get_replica_session]
+    engine.dispose()
+
+
+def replicate(replica, account):
+    """Copy the user and account rows as they are on the primary now."""
+    primary = database.SessionLocal()
+    user = primary.execute(select(models.User.__table__).where(models.User.id == account["user_id"])).mappings().one()
+    row = primary.execute(select(models.Account.__table__).where(models.Account.id == account["id"])).mappings().one()
+    primary.close()
+    with replica.begin() as conn:
+        conn.execute(insert(models.User), [dict(user)])
+        conn.execute(insert(models.Account), [dict(row)])
+
+
+def test_reads_stay_on_the_primary_right_after_a_write(client, open_account, replica):
+    # Arrange: the replica has not seen the new account yet
+    account, headers = open_account()
+
+    # Act
+    response = client.get("/accounts/", headers=headers)
+
+    # Assert: read-your-writes despite the lagging replica
+    assert [a["id"] for a in response.json()] == [account["id"]]
+
+
+def test_reads_move_to_the_replica_once_the_sticky_window_ends(client, open_account, replica):
+    account, headers = open_account()
+    replicate(replica, account)
+    client.post("/accounts/deposit", json={"account_id": account["id"], "amount": 50}, headers=headers)
+
+    sticky = client.get("/accounts/", headers=headers).json()
+    client.cookies.clear()  # as if the cookie had expired
+    from_replica = client.get("/accounts/", headers=headers).json()
+    history = client.get(f"/accounts/{account['id']}/transactions", headers=headers).json()
+
+    assert sticky[0]["balance"] == 150.0
+    # The replica still shows the balance from before the deposit, and no ledger rows were copied
+    assert from_replica[0]["balance"] == 100.0
+    assert history["items"] == []
+
+
+def test_the_sticky_token_is_honoured_by_any_worker_and_only_for_its_user(client, open_account, replica):
+    # Arrange: the write's token, echoed as a header (no shared state, no cookie)
+    account, headers = open_account()
+    other, other_headers = open_account()
+    replicate(replica, account)
+    token = client.post(
+        "/accounts/deposit", json={"account_id": account["id"], "amount": 50}, headers=headers
+    ).headers[HEADER]
+    other_token = client.post(
+        "/accounts/deposit", json={"account_id": other["id"], "amount": 50}, headers=other_headers
+    ).headers[HEADER]
+    client.cookies.clear()
+    user_id, until, signature = token.split(".")
+
+    def balance(token):
+        return client.get("/accounts/", headers={**headers, HEADER: token}).json()[0]["balance"]
+
+    # Act / Assert: the primary for the user's own valid token, the replica otherwise
+    assert balance(token) == 150.0
+    assert balance(other_token) == 100.0
+    assert balance(f"{user_id}.{int(until) + 60_000}.{signature}") == 100.0
@@ -0,0 +1,83 @@
+# backend/tests/test_reconciliation.py
+
+import io
+import json
+from sqlalchemy import update
+from app.db import database, models
+from app.jobs.reconcile_ledger import load_checkpoint, run, save_checkpoint
+
+
+def tamper(account_id, delta):
+    """Change a balance behind the ledger's back."""
+    db = database.SessionLocal()
+    db.execute(update(models.Account).where(models.Account.id == account_id).values(balance=models.Account.balance + delta))
+    db.commit()
+    db.close()
+
+
+def reconcile(checkpoint, **kwargs):
+    report = io.StringIO()
+    result = run(checkpoint_path=str(checkpoint), report=report, **kwargs)
+    drifts = {d["account_id"]: d for d in map(json.loads, report.getvalue().splitlines())}
+    return result, drifts
+
+
+def test_full_run_reports_drifted_accounts_only(client, open_account, tmp_path):
+    # Arrange
+    clean, headers = open_account()
+    for amount in (25, 0.5):
+        client.post("/accounts/deposit", json={"account_id": clean["id"], "amount": amount}, headers=headers)
+    client.post("/accounts/withdraw", json={"account_id": clean["id"], "amount": 10}, headers=headers)
+    drifted, _ = open_account()
+    tamper(drifted["id"], 7)
+
+    # Act
+    result, drifts = reconcile(tmp_path / "checkpoint.json", full=True, partition_size=3, chunk_size=2)
+
+    # Assert
+    assert clean["id"] not in drifts
+    assert drifts[drifted["id"]] == {"account_id": drifted["id"], "balance": 10007, "ledger_balance": 10000, "difference": 7}
+    assert result["checked"] >= 2
+    assert "run" not in load_checkpoint(tmp_path / "checkpoint.json")
+
+
+def test_interrupted_run_resumes_at_the_next_partition(open_account, tmp_path):
+    account, _ = open_account()
+    tamper(account["id"], -1)
+    checkpoint = tmp_path / "checkpoint.json"
+    # A run that stopped after its first partition, which covered this account
+    save_checkpoint(checkpoint, {"run": {
+        "started_at": "2025-01-01T00:00:00", "since": None,
+        "partitions": [[account["id"], account["id"] + 1], [account["id"] + 1, account["id"] + 2]],
+        "done": [[account["id"], account["id"] + 1]], "checked": 1, "ledger_rows": 1, "drifts": 0
+    }})
+
+    result, drifts = reconcile(checkpoint)
+
+    assert result["resumed_partitions"] == 1
+    assert account["id"] not in drifts  # its partition is not checked again
+    assert load_checkpoint(checkpoint) == {"last_completed": "2025-01-01T00:00:00"}
+
+
+def test_incremental_run_checks_only_accounts_touched_since_the_last_run(client, open_account, tmp_path):
+    checkpoint = tmp_path / "checkpoint.json"
+    quiet, _ = open_account()
+    busy, headers = open_account()
+    reconcile(checkpoint, full=True)
+    tamper(quiet["id"], 3)
+    client.post("/accounts/deposit", json={"account_id": busy["id"], "amount": 1}, headers=headers)
+    tamper(busy["id"], 5)
+
+    result, drifts = reconcile(checkpoint, overlap_seconds=0)
+
+    assert result["since"] is not None
+    assert set(drifts) == {busy["id"]}
+
+
+def test_process_pool_finds_the_same_drift(open_account, tmp_path):
+    account, _ = open_account()
+    tamper(account["id"], 11)
+
+    result, drifts = reconcile(tmp_path / "checkpoint.json", full=True, workers=2, partition_size=5)
+
+    assert drifts[account["id"]]["difference"] == 11
@@ -0,0 +1,66 @@
+# backend/tests/test_serialization.py
+
+import pytest
+from app.core.config import settings
+
+
+@pytest.fixture
+def open_accounts(client, register, open_account):
+    """open_accounts() -> (user, headers, [savings, current]) after a deposit and a withdrawal"""
+    def open_accounts():
+        user, headers = register("Serializer User")
+        accounts = [open_account(10.25, headers=headers, account_type=kind)[0] for kind in ("savings", "current")]
+        client.post("/accounts/deposit", json={"account_id": accounts[0]["id"], "amount": 0.1}, headers=headers)
+        client.post("/accounts/withdraw", json={"account_id": accounts[0]["id"], "amount": 3}, headers=headers)
+        return user, headers, accounts
+    return open_accounts
+
+
+def both_paths(client, monkeypatch, path, **kwargs):
+    monkeypatch.setattr(settings, "FAST_SERIALIZATION", False)
+    slow = client.get(path, **kwargs)
+    monkeypatch.setattr(settings, "FAST_SERIALIZATION", True)
+    fast = client.get(path, **kwargs)
+    return slow, fast
+
+
+def test_fast_account_list_matches_the_response_model_path(client, open_accounts, monkeypatch):
+    # Arrange
+    _, headers, accounts = open_accounts()
+
+    # Act
+    slow, fast = both_paths(client, monkeypatch, "/accounts/", headers=headers)
+
+    # Assert
+    assert fast.status_code == 200
+    assert fast.headers["content-type"] == "application/json"
+    assert fast.content == slow.content
+    assert [a["balance"] for a in fast.json()] == [7.35, 10.25]
+    assert [a["id"] for a in fast.json()] == [a["id"] for a in accounts]
+
+
+def test_fast_transaction_page_matches_the_response_model_path(client, open_accounts, monkeypatch):
+    _, headers, accounts = open_accounts()
+
+    slow, fast = both_paths(client, monkeypatch, f"/accounts/{accounts[0]['id']}/transactions", params={"limit": 2}, headers=headers)
+
+    assert fast.content == slow.content
+    page = fast.json()
+    assert [(tx["type"], tx["amount"]) for tx in page["items"]] == [("withdraw", 3.0), ("deposit", 0.1)]
+    assert page["next_cursor"]
+
+
+def test_fast_admin_listing_matches_the_response_model_path(client, admin_headers, open_accounts, monkeypatch):
+    user, _, _ = open_accounts()
+
+    params = {"email_prefix": user["email"], "include_count": True, "include_accounts": True}
+    slow, fast = both_paths(client, monkeypatch, "/admin/users", params=params, headers=admin_headers())
+
+    assert fast.content == slow.content
+    assert fast.json() == {
+        "items": [{
+            "id": user["id"], "name": "Serializer User", "email": user["email"], "is_admin": False,
+            "accounts": {"count": 2, "total_balance": 17.6}
+        }],
+        "total": 1
+    }
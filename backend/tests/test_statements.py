@@ -0,0 +1,72 @@
+# backend/tests/test_statements.py
+
+import csv
+import gzip
+import json
+import os
+import pytest
+from datetime import datetime
+from app.jobs.generate_statements import append_manifest, run
+from app.services.statements import statement_path
+
+MONTH = datetime.utcnow().strftime("%Y-%m")
+
+
+@pytest.fixture
+def statement_account(client, open_account):
+    """statement_account() -> an account with a deposit of 100, a deposit of 20.5 and a withdrawal of 30"""
+    def statement_account():
+        account, headers = open_account(100)
+        client.post("/accounts/deposit", json={"account_id": account["id"], "amount": 20.5}, headers=headers)
+        client.post("/accounts/withdraw", json={"account_id": account["id"], "amount": 30}, headers=headers)
+        return account
+    return statement_account
+
+
+def path_of(directory, account, fmt):
+    return statement_path(str(directory / MONTH), {"account_id": account["id"], "account_number": account["account_number"]}, fmt)
+
+
+def read(directory, account, fmt):
+    path = path_of(directory, account, fmt)
+    with gzip.open(path, "rt", newline="") as f:
+        return list(csv.reader(f)) if fmt == "csv" else json.load(f)
+
+
+def test_statements_carry_opening_and_closing_balances_in_both_formats(statement_account, tmp_path):
+    # Arrange
+    account = statement_account()
+
+    # Act
+    result = run(MONTH, out=str(tmp_path), formats=("csv", "json"), partition_size=4)
+
+    # Assert
+    rows = read(tmp_path, account, "csv")
+    assert rows[1][2:] == ["Opening balance", "", "0.0"]
+    assert [(r[2], r[3], r[4]) for r in rows[2:-1]] == [("deposit", "100.0", "100.0"), ("deposit", "20.5", "120.5"), ("withdraw", "-30.0", "90.5")]
+    assert rows[-1][2:] == ["Closing balance", "", "90.5"]
+    statement = read(tmp_path, account, "json")
+    assert (statement["opening_balance"], statement["closing_balance"]) == (0.0, 90.5)
+    assert [tx["balance"] for tx in statement["transactions"]] == [100.0, 120.5, 90.5]
+    assert result["accounts"] >= 1 and result["partitions"] >= 1
+
+
+def test_rerun_skips_partitions_in_the_manifest(statement_account, tmp_path):
+    account = statement_account()
+    partition = account["id"] // 4 * 4
+    (tmp_path / MONTH).mkdir()
+    append_manifest(str(tmp_path / MONTH / "manifest.jsonl"), {"lo": partition, "hi": partition + 4, "accounts": 0, "transactions": 0})
+
+    result = run(MONTH, out=str(tmp_path), partition_size=4)
+
+    assert result["skipped_partitions"] == 1
+    assert not os.path.exists(path_of(tmp_path, account, "csv"))
+
+
+def test_process_pool_writes_the_same_statements(statement_account, tmp_path):
+    account = statement_account()
+
+    run(MONTH, out=str(tmp_path / "serial"), partition_size=3)
+    run(MONTH, out=str(tmp_path / "pool"), workers=2, partition_size=3)
+
+    assert read(tmp_path / "pool", account, "csv") == read(tmp_path / "serial", account, "csv")
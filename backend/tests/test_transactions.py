@@ -0,0 +1,64 @@
+# backend/tests/test_transactions.py
+
+import csv
+import io
+import json
+import pytest
+
+
+@pytest.fixture
+def setup_account(client, open_account):
+    """setup_account(deposits) -> (account opened with nothing, then given each deposit, headers)"""
+    def setup_account(deposits):
+        account, headers = open_account(0)
+        for amount in deposits:
+            client.post("/accounts/deposit", json={"account_id": account["id"], "amount": amount}, headers=headers)
+        return account, headers
+    return setup_account
+
+
+def test_history_pages_cover_every_transaction_exactly_once(client, setup_account):
+    account, headers = setup_account([float(n) for n in range(1, 8)])
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+        page = client.get(f"/accounts/{account['id']}/transactions", params=params, headers=headers).json()
+        seen.extend(tx["amount"] for tx in page["items"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+
+    # Newest first, no gaps or duplicates across page boundaries
+    assert seen == [7.0, 6.0, 5.0, 4.0, 3.0, 2.0, 1.0]
+
+
+def test_history_filters_by_type(client, setup_account):
+    account, headers = setup_account([10.0, 20.0])
+    client.post("/accounts/withdraw", json={"account_id": account["id"], "amount": 5.0}, headers=headers)
+
+    page = client.get(f"/accounts/{account['id']}/transactions", params={"type": "withdraw"}, headers=headers).json()
+
+    assert [(tx["type"], tx["amount"]) for tx in page["items"]] == [("withdraw", 5.0)]
+
+
+def test_history_of_someone_elses_account_is_not_found(client, setup_account):
+    account, _ = setup_account([])
+    _, other_headers = setup_account([])
+
+    response = client.get(f"/accounts/{account['id']}/transactions", headers=other_headers)
+
+    assert response.status_code == 404
+
+
+def test_export_streams_ndjson_and_csv_oldest_first(client, setup_account):
+    account, headers = setup_account([1.0, 2.0, 3.0])
+
+    ndjson = client.get(f"/accounts/{account['id']}/transactions/export", headers=headers)
+    rows = [json.loads(line) for line in ndjson.text.splitlines()]
+    assert ndjson.headers["content-type"] == "application/x-ndjson"
+    assert [r["amount"] for r in rows] == [1.0, 2.0, 3.0]
+
+    exported = client.get(f"/accounts/{account['id']}/transactions/export", params={"format": "csv"}, headers=headers)
+    records = list(csv.DictReader(io.StringIO(exported.text)))
+    assert [float(r["amount"]) for r in records] == [1.0, 2.0, 3.0]
@@ -0,0 +1,164 @@
+# backend/tests/test_transfers.py
+
+
+def test_transfer_moves_money_between_accounts(client, open_account, balances):
+    # Arrange
+    source, sender = open_account(500.0)
+    target, recipient = open_account(100.0)
+
+    # Act
+    response = client.post("/accounts/transfer", json={
+        "from_account_id": source["id"],
+        "to_account_number": target["account_number"],
+        "amount": 200.0
+    }, headers=sender)
+
+    # Assert: the response is the debited source account
+    assert response.status_code == 200
+    assert response.json()["id"] == source["id"]
+    assert response.json()["balance"] == 300.0
+    assert balances(recipient)[target["id"]] == 300.0
+
+
+def test_transfer_insufficient_balance_changes_nothing(client, open_account, balances, monkeypatch):
+    from app.core.config import settings
+    monkeypatch.setitem(settings.DAILY_LIMITS, "savings", 100.0)
+
+    source, sender = open_account(50.0)
+    target, recipient = open_account(0.0)
+    payload = {"from_account_id": source["id"], "to_account_number": target["account_number"], "amount": 80.0}
+
+    response = client.post("/accounts/transfer", json=payload, headers=sender)
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Insufficient balance"
+    assert balances(sender)[source["id"]] == 50.0
+    assert balances(recipient)[target["id"]] == 0.0
+    # The daily quota consumed before the balance check was rolled back too
+    client.post("/accounts/deposit", json={"account_id": source["id"], "amount": 50.0}, headers=sender)
+    assert client.post("/accounts/transfer", json=payload, headers=sender).status_code == 200
+
+
+def test_transfer_from_someone_elses_account_is_rejected(client, open_account, balances):
+    source, owner = open_account(100.0)
+    target, intruder = open_account(0.0)
+
+    response = client.post("/accounts/transfer", json={
+        "from_account_id": source["id"],
+        "to_account_number": target["account_number"],
+        "amount": 10.0
+    }, headers=intruder)
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Source account not found"
+
+
+def test_daily_transfer_limit_is_enforced_per_account_type(client, open_account, balances, monkeypatch):
+    from app.core.config import settings
+    monkeypatch.setitem(settings.DAILY_LIMITS, "savings", 150.0)
+
+    source, sender = open_account(1000.0)
+    target, recipient = open_account(0.0)
+    payload = {"from_account_id": source["id"], "to_account_number": target["account_number"], "amount": 100.0}
+
+    assert client.post("/accounts/transfer", json=payload, headers=sender).status_code == 200
+    response = client.post("/accounts/transfer", json=payload, headers=sender)
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Daily transfer limit exceeded"
+    # The rejected transfer neither moved money nor counted towards the limit
+    assert balances(sender)[source["id"]] == 900.0
+    payload["amount"] = 50.0
+    assert client.post("/accounts/transfer", json=payload, headers=sender).status_code == 200
+
+
+def test_batch_transfer_pays_every_recipient_in_one_go(client, open_account, balances):
+    source, payer = open_account(1000.0)
+    (first, first_headers), (second, second_headers) = open_account(0.0), open_account(0.0)
+
+    response = client.post("/accounts/transfers/batch", json={
+        "from_account_id": source["id"],
+        "transfers": [
+            {"to_account_number": first["account_number"], "amount": 100.0},
+            {"to_account_number": second["account_number"], "amount": 250.0},
+            {"to_account_number": first["account_number"], "amount": 12.5},
+        ]
+    }, headers=payer)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["applied"] is True
+    assert body["from_account"]["balance"] == 637.5
+    assert [(r["status"], r["amount"]) for r in body["results"]] == [("accepted", 100.0), ("accepted", 250.0), ("accepted", 12.5)]
+    assert body["total_amount"] == 362.5
+    assert balances(first_headers)[first["id"]] == 112.5
+    assert balances(second_headers)[second["id"]] == 250.0
+
+
+def test_batch_transfer_all_or_nothing_rejects_the_whole_batch(client, open_account, balances):
+    source, payer = open_account(1000.0)
+    target, payee = open_account(0.0)
+
+    response = client.post("/accounts/transfers/batch", json={
+        "from_account_id": source["id"],
+        "transfers": [
+            {"to_account_number": target["account_number"], "amount": 100.0},
+            {"to_account_number": "0000000000", "amount": 100.0},
+        ]
+    }, headers=payer)
+
+    assert response.status_code == 400
+    results = response.json()["detail"]["results"]
+    assert [(r["status"], r["amount"]) for r in results] == [("not_applied", 100.0), ("rejected", 100.0)]
+    assert results[1]["error"] == "Recipient account not found"
+    assert balances(payer)[source["id"]] == 1000.0
+
+
+def test_batch_transfer_best_effort_applies_what_funds_allow(client, open_account, balances):
+    source, payer = open_account(300.0)
+    target, payee = open_account(0.0)
+    number = target["account_number"]
+
+    response = client.post("/accounts/transfers/batch", json={
+        "from_account_id": source["id"],
+        "mode": "best_effort",
+        "transfers": [
+            {"to_account_number": number, "amount": 200.0},
+            {"to_account_number": number, "amount": 200.0},
+            {"to_account_number": number, "amount": 100.0},
+        ]
+    }, headers=payer)
+
+    body = response.json()
+    assert response.status_code == 200
+    assert [r["status"] for r in body["results"]] == ["accepted", "rejected", "accepted"]
+    assert body["results"][1]["error"] == "Insufficient balance"
+    assert body["total_amount"] == 300.0
+    assert balances(payee)[target["id"]] == 300.0
+
+
+def test_batch_transfer_best_effort_goes_on_past_an_item_over_the_daily_limit(client, open_account, balances, monkeypatch):
+    from app.core.config import settings
+    monkeypatch.setitem(settings.DAILY_LIMITS, "savings", 150.0)
+
+    source, payer = open_account(1000.0)
+    target, payee = open_account(0.0)
+    number = target["account_number"]
+
+    response = client.post("/accounts/transfers/batch", json={
+        "from_account_id": source["id"],
+        "mode": "best_effort",
+        "transfers": [
+            {"to_account_number": number, "amount": 100.0},
+            {"to_account_number": number, "amount": 100.0},
+            {"to_account_number": number, "amount": 40.0},
+            {"to_account_number": number, "amount": 20.0},
+        ]
+    }, headers=payer)
+
+    # A rejected item does not stop later ones that still fit
+    body = response.json()
+    assert [r["status"] for r in body["results"]] == ["accepted", "rejected", "accepted", "rejected"]
+    assert body["results"][1]["error"] == body["results"][3]["error"] == "Daily transfer limit exceeded"
+    assert body["total_amount"] == 140.0
+    assert balances(payee)[target["id"]] == 140.0
@@ -0,0 +1,57 @@
+# backend/tests/test_user_search.py
+
+import uuid
+from sqlalchemy import update
+from app.db import database, models
+
+
+def test_user_search_ranks_exact_then_prefix_then_word_then_substring_matches(client, register, admin_headers):
+    headers = admin_headers()
+    term = "q" + uuid.uuid4().hex[:8]
+    substring, _ = register("Zed Substring", email=f"x{term}@smartbank.com")
+    word, _ = register(f"Ada {term}")
+    prefix, _ = register(f"{term}son")
+    exact, _ = register(term)
+
+    found = client.get("/admin/users/search", params={"q": term.upper()}, headers=headers).json()
+    top = client.get("/admin/users/search", params={"q": term, "limit": 2}, headers=headers).json()
+
+    assert [u["id"] for u in found] == [exact["id"], prefix["id"], word["id"], substring["id"]]
+    assert all("hashed_password" not in u for u in found)
+    assert [u["id"] for u in top] == [exact["id"], prefix["id"]]
+
+
+def test_user_search_sees_users_created_and_renamed_outside_the_api(client, admin_headers):
+    headers = admin_headers()
+    term = "w" + uuid.uuid4().hex[:8]
+
+    # As another worker or a bulk import would: straight into the table
+    db = database.SessionLocal()
+    user = models.User(name=f"Imported {term}", email=f"{term}@smartbank.com", hashed_password="x")
+    db.add(user)
+    db.commit()
+    found = client.get("/admin/users/search", params={"q": term[:6]}, headers=headers).json()
+    db.execute(update(models.User).where(models.User.id == user.id).values(name="Renamed Customer"))
+    db.commit()
+    db.close()
+    by_old_name = client.get("/admin/users/search", params={"q": f"imported {term}"}, headers=headers).json()
+
+    assert [u["email"] for u in found] == [f"{term}@smartbank.com"]
+    assert by_old_name == []
+
+
+def test_short_queries_match_prefixes_only_and_wildcards_are_literal(client, register, admin_headers):
+    headers = admin_headers()
+    term = uuid.uuid4().hex[:6]
+    word, _ = register(f"Kim Zq{term}")
+    register(f"Lee Xzq{term}")  # "zq" inside a word: not a prefix
+    percent, _ = register(f"Pct 100%{term}")
+
+    short = client.get("/admin/users/search", params={"q": "zq", "limit": 100}, headers=headers).json()
+    literal = client.get("/admin/users/search", params={"q": f"0%{term}"}, headers=headers).json()
+    underscore = client.get("/admin/users/search", params={"q": f"_{term}"}, headers=headers).json()
+
+    assert word["id"] in [u["id"] for u in short]
+    assert all(not u["name"].startswith("Lee Xzq") for u in short)
+    assert [u["id"] for u in literal] == [percent["id"]]
+    assert underscore == []